@@ -0,0 +1,82 @@
+"""
+Shared helpers for the benchmark's stand-ins for mirage's external tools.
+
+Each fake sleeps for a configurable latency, then writes real (small)
+media made with ffmpeg test sources, so mirage's probing, stitching and
+rendering run exactly as they would on generated artifacts:
+
+    MIRAGE_BENCH_LATENCY          seconds every fake sleeps (default 0.2)
+    MIRAGE_BENCH_LATENCY_<TOOL>   per-tool override, e.g. ..._VIDIUS=1.5
+    MIRAGE_BENCH_SIZE             landscape frame size (default 640x360)
+    MIRAGE_BENCH_CLIP_SECONDS     length of a vidius clip (default 2)
+    MIRAGE_BENCH_AUDIO_SECONDS    length of gen-tts/gen-music audio (default 6)
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import List, Optional, Tuple
+
+
+def latency(tool: str) -> None:
+    key = "MIRAGE_BENCH_LATENCY_" + tool.upper().replace("-", "_")
+    time.sleep(float(os.environ.get(key, os.environ.get("MIRAGE_BENCH_LATENCY", 0.2))))
+
+
+def option(argv: List[str], *names: str) -> Optional[str]:
+    """Value following the first of `names` in argv, if present."""
+    for i, arg in enumerate(argv[:-1]):
+        if arg in names:
+            return argv[i + 1]
+    return None
+
+
+def frame_size(aspect_ratio: Optional[str] = None) -> Tuple[int, int]:
+    width, _, height = os.environ.get("MIRAGE_BENCH_SIZE", "640x360").partition("x")
+    w, h = int(width), int(height)
+    if aspect_ratio == "9:16":
+        w, h = h, w
+    return w, h
+
+
+def seconds(name: str, default: float) -> float:
+    return float(os.environ.get(f"MIRAGE_BENCH_{name}_SECONDS", default))
+
+
+def ffmpeg(*args: str) -> None:
+    argv = [os.environ.get("FFMPEG_CMD", "ffmpeg"), "-v", "error", "-y", *args]
+    subprocess.run(argv, check=True, stdin=subprocess.DEVNULL)
+
+
+def png(path: str, size: Tuple[int, int], source: str = "testsrc") -> None:
+    w, h = size
+    ffmpeg("-f", "lavfi", "-i", f"{source}=size={w}x{h}", "-frames:v", "1", path)
+
+
+def mp3(path: str, duration: float, frequency: int = 220) -> None:
+    source = f"sine=frequency={frequency}:duration={duration}"
+    ffmpeg("-f", "lavfi", "-i", source, "-q:a", "9", path)
+
+
+def mp4(path: str, size: Tuple[int, int], duration: float, audio: bool) -> None:
+    w, h = size
+    args = ["-f", "lavfi", "-i", f"testsrc=size={w}x{h}:rate=25"]
+    if audio:
+        args += ["-f", "lavfi", "-i", "sine=frequency=440"]
+    args += ["-t", str(duration), "-c:v", "libx264", "-preset", "ultrafast"]
+    args += ["-pix_fmt", "yuv420p"]
+    args += ["-c:a", "aac", "-shortest"] if audio else ["-an"]
+    ffmpeg(*args, path)
+
+
+def script(sentences: int = 6) -> str:
+    return " ".join(
+        f"This is sentence number {i + 1} of the benchmark script."
+        for i in range(sentences)
+    )
+
+
+def fail(message: str) -> None:
+    print(message, file=sys.stderr)
+    sys.exit(2)
@@ -0,0 +1,363 @@
+"""
+Offline benchmark of mirage's orchestration.
+
+Runs each media subcommand end to end against the fake tools in
+benchmarks/fakes (wired in through the *_CMD settings) and a stub planner
+server (through planner_base_url), so nothing leaves the machine. Each run
+gets fresh output, cache and governor directories; the artifact cache and
+tool rate limits are off so every run does the same work. Timings come
+from the run's own timings.jsonl:
+
+    wall     end-to-end time of the mirage process
+    ffmpeg   summed wall time of ffmpeg calls (assembly, stitching, encoding)
+    tools    summed wall time of the fake generators
+    calls    external processes started
+
+Planned commands (deep-news, story, summary) are run at every segment
+count to show how they scale.
+
+    python benchmarks/run.py                          # everything, 2/4/8 segments
+    python benchmarks/run.py story summary -n 4 16 -r 3
+    python benchmarks/run.py --latency 0 --json base.json
+    python benchmarks/run.py --compare base.json      # exits 1 on a regression
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent
+FAKES = ROOT / "fakes"
+SRC = ROOT.parent / "src"
+sys.path[:0] = [str(SRC), str(FAKES)]
+
+import _fake  # noqa: E402
+from rich.console import Console  # noqa: E402
+from rich.table import Table  # noqa: E402
+
+from mirage.telemetry import TIMINGS_NAME, load_records  # noqa: E402
+
+console = Console()
+
+FAKE_TOOLS = ("atmos", "lumina", "vidius", "gen-tts", "gen-music", "deep-research")
+CHARACTER = "bench"
+
+# name -> (argv, takes a planner segment count)
+COMMANDS: Dict[str, Tuple[List[str], bool]] = {
+    "weather": (["weather", "-l", "Benchtown", "-v"], False),
+    "research": (["research", "tides", "-v"], False),
+    "news-short": (["news-short", "tides"], False),
+    "deep-news": (["deep-news", "tides"], True),
+    "story": (["story", "tides", "-c", CHARACTER], True),
+    "summary": (["summary", "tides", "-c", CHARACTER, "--cinema"], True),
+}
+
+
+class StubPlanner(ThreadingHTTPServer):
+    """Answers Gemini generateContent calls with a plan of `segments` parts."""
+
+    daemon_threads = True
+
+    def __init__(self, latency: float) -> None:
+        super().__init__(("127.0.0.1", 0), _PlannerHandler)
+        self.latency = latency
+        self.segments = 3
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def plan(self) -> List[Dict[str, str]]:
+        return [
+            {
+                "narration": f"Part {i + 1}: {_fake.script(1)}",
+                "visual_prompt": f"benchmark scene {i + 1}",
+                "voice_direction": "calm",
+            }
+            for i in range(self.segments)
+        ]
+
+
+class _PlannerHandler(BaseHTTPRequestHandler):
+    server: StubPlanner
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.requests += 1
+        time.sleep(self.server.latency)
+        text = json.dumps(self.server.plan())
+        body = json.dumps(
+            {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def base_env(
+    args: argparse.Namespace, planner: StubPlanner, work: Path
+) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        {
+            f"{tool.replace('-', '_').upper()}_CMD": str(FAKES / tool)
+            for tool in FAKE_TOOLS + ("convert",)
+        }
+    )
+    width, _, height = args.size.partition("x")
+    env.update(
+        {
+            "PYTHONPATH": os.pathsep.join(
+                filter(None, [str(SRC), env.get("PYTHONPATH")])
+            ),
+            "PLANNER_BASE_URL": planner.url,
+            "GOOGLE_API_KEY": "offline-benchmark",
+            "CHARACTER_LIBRARY_DIR": str(work / "characters"),
+            "CACHE_ENABLED": "false",
+            "TOOL_RATE_LIMITS": "{}",
+            "QUALITY": args.quality,
+            "RENDER_WIDTH": width,
+            "RENDER_HEIGHT": height,
+            "MIRAGE_BENCH_SIZE": args.size,
+            "MIRAGE_BENCH_LATENCY": str(args.latency),
+        }
+    )
+    return env
+
+
+def mirage(argv: List[str], env: Dict[str, str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-m", "mirage.main", *argv],
+        env=env,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+    )
+
+
+def run_once(
+    name: str, segments: Optional[int], env: Dict[str, str], work: Path
+) -> Dict[str, Any]:
+    run_dir = Path(tempfile.mkdtemp(prefix=f"{name}-", dir=work))
+    env = dict(
+        env,
+        OUTPUT_BASE_DIR=str(run_dir / "out"),
+        CACHE_DIR=str(run_dir / "cache"),
+        GOVERNOR_DIR=str(run_dir / "governor"),
+        DAEMON_DIR=str(run_dir / "daemon"),
+        LOG_FILE=str(run_dir / "mirage.log"),
+    )
+    argv = COMMANDS[name][0] + ["-s"]
+    start = time.perf_counter()
+    proc = mirage(argv, env)
+    wall = time.perf_counter() - start
+
+    records = load_records(sorted((run_dir / "out").glob(f"*/{TIMINGS_NAME}")))
+    processes = [r for r in records if r.get("kind") == "process"]
+    run = next((r for r in records if r.get("kind") == "run"), None)
+    ok = proc.returncode == 0 and run is not None and run.get("ok", False)
+    if not ok:
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-10:]
+        console.print(f"[red]{name} ({segments} segments) failed:[/red]")
+        console.print("\n".join(tail), markup=False)
+    shutil.rmtree(run_dir, ignore_errors=True)
+
+    def total(names: Tuple[str, ...]) -> float:
+        return sum(r["wall"] for r in processes if r["name"] in names)
+
+    return {
+        "command": name,
+        "segments": segments,
+        "ok": ok,
+        "wall": wall,
+        "ffmpeg": total(("ffmpeg",)),
+        "ffprobe": total(("ffprobe",)),
+        "tools": total(FAKE_TOOLS),
+        "calls": len(processes),
+    }
+
+
+def summarize(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Medians per (command, segments), in run order."""
+    groups: Dict[Tuple[str, Optional[int]], List[Dict[str, Any]]] = {}
+    for result in results:
+        groups.setdefault((result["command"], result["segments"]), []).append(result)
+    rows = []
+    for (command, segments), group in groups.items():
+        row: Dict[str, Any] = {
+            "command": command,
+            "segments": segments,
+            "runs": len(group),
+            "failed": sum(1 for r in group if not r["ok"]),
+        }
+        for key in ("wall", "ffmpeg", "ffprobe", "tools", "calls"):
+            row[key] = statistics.median(r[key] for r in group)
+        rows.append(row)
+    return rows
+
+
+def scaling(rows: List[Dict[str, Any]]) -> Dict[str, float]:
+    """Extra wall time per segment, between the smallest and largest counts."""
+    slopes = {}
+    for command in dict.fromkeys(r["command"] for r in rows):
+        points = sorted(
+            (r["segments"], r["wall"])
+            for r in rows
+            if r["command"] == command and r["segments"] is not None
+        )
+        if len(points) >= 2 and points[-1][0] > points[0][0]:
+            (n0, w0), (n1, w1) = points[0], points[-1]
+            slopes[command] = (w1 - w0) / (n1 - n0)
+    return slopes
+
+
+def print_report(rows: List[Dict[str, Any]]) -> None:
+    table = Table(title="Mirage Benchmark (medians)", header_style="bold")
+    for column in ("Command", "Segments", "Wall", "ffmpeg", "ffprobe", "Tools"):
+        table.add_column(column, justify="left" if column == "Command" else "right")
+    table.add_column("Calls", justify="right")
+    table.add_column("Failed", justify="right")
+    for row in rows:
+        table.add_row(
+            row["command"],
+            "-" if row["segments"] is None else str(row["segments"]),
+            f"{row['wall']:.2f}s",
+            f"{row['ffmpeg']:.2f}s",
+            f"{row['ffprobe']:.2f}s",
+            f"{row['tools']:.2f}s",
+            f"{row['calls']:g}",
+            f"[red]{row['failed']}[/red]" if row["failed"] else "0",
+        )
+    console.print(table)
+    for command, slope in scaling(rows).items():
+        console.print(f"{command}: {slope:+.2f}s wall per extra segment")
+
+
+def compare(rows: List[Dict[str, Any]], baseline_path: Path, tolerance: float) -> bool:
+    """Prints runs slower than the baseline by more than `tolerance`."""
+    baseline = {
+        (r["command"], r["segments"]): r
+        for r in json.loads(baseline_path.read_text())["summary"]
+    }
+    ok = True
+    for row in rows:
+        base = baseline.get((row["command"], row["segments"]))
+        if base is None:
+            continue
+        change = row["wall"] / base["wall"] - 1 if base["wall"] else 0.0
+        if change > tolerance:
+            ok = False
+            console.print(
+                f"[red]Regression:[/red] {row['command']} ({row['segments']} segments) "
+                f"{base['wall']:.2f}s -> {row['wall']:.2f}s ({change:+.0%})"
+            )
+    if ok:
+        console.print(f"[green]No regressions beyond {tolerance:.0%}.[/green]")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "commands", nargs="*", help=f"Any of {', '.join(COMMANDS)} (default: all)"
+    )
+    parser.add_argument(
+        "-n",
+        "--segments",
+        type=int,
+        nargs="+",
+        default=[2, 4, 8],
+        help="Planner segment counts for deep-news, story and summary",
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="Runs per point")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.2,
+        help="Seconds each fake tool sleeps (per-tool: MIRAGE_BENCH_LATENCY_<TOOL>)",
+    )
+    parser.add_argument(
+        "--planner-latency", type=float, default=0.1, help="Stub planner delay"
+    )
+    parser.add_argument("--size", default="640x360", help="Frame and render size")
+    parser.add_argument("--quality", default="draft", help="Encoder profile")
+    parser.add_argument("--json", type=Path, help="Write results to this file")
+    parser.add_argument("--compare", type=Path, help="Baseline from --json")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed wall-time increase over the baseline (0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+    commands = args.commands or list(COMMANDS)
+    unknown = set(commands) - set(COMMANDS)
+    if unknown:
+        parser.error(f"unknown command: {', '.join(sorted(unknown))}")
+
+    if shutil.which(os.environ.get("FFMPEG_CMD", "ffmpeg")) is None:
+        parser.error("ffmpeg is required")
+
+    planner = StubPlanner(args.planner_latency)
+    threading.Thread(target=planner.serve_forever, daemon=True).start()
+    results: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="mirage-bench-") as tmp:
+        work = Path(tmp)
+        env = base_env(args, planner, work)
+        portrait = work / "bench.png"
+        _fake.png(str(portrait), _fake.frame_size("9:16"))
+        added = mirage(
+            ["character", "add", CHARACTER, "-i", str(portrait), "-d", "A presenter"],
+            dict(env, LOG_FILE=str(work / "mirage.log")),
+        )
+        if added.returncode != 0:
+            sys.exit(f"Could not create the benchmark character:\n{added.stderr}")
+
+        for name in commands:
+            counts: List[Optional[int]] = list(args.segments)
+            if not COMMANDS[name][1]:
+                counts = [None]
+            for segments in counts:
+                planner.segments = segments or 3
+                for _ in range(args.repeat):
+                    with console.status(f"{name} ({segments or '-'} segments)..."):
+                        results.append(run_once(name, segments, env, work))
+    planner.shutdown()
+
+    rows = summarize(results)
+    print_report(rows)
+    if args.json:
+        settings = {
+            key: getattr(args, key)
+            for key in ("latency", "planner_latency", "size", "quality", "repeat")
+        }
+        args.json.write_text(
+            json.dumps(
+                {"settings": settings, "summary": rows, "runs": results}, indent=2
+            )
+        )
+    failed = any(not r["ok"] for r in results)
+    if args.compare and not compare(rows, args.compare, args.tolerance):
+        sys.exit(1)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import json
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from mirage.config import settings
+from mirage.runner import run_command, tool_argv
+
+_SILENCE_START = re.compile(r"silence_start:\s*(-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end:\s*(-?[\d.]+)")
+
+# Shortest segment the aligner will produce, in seconds
+MIN_SEGMENT = 0.5
+
+
+@dataclass
+class SegmentTiming:
+    start: float
+    end: float
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+def parse_silences(log: str) -> List[Tuple[float, float]]:
+    """Extracts (start, end) pairs from ffmpeg silencedetect output."""
+    silences = []
+    start: Optional[float] = None
+    for line in log.splitlines():
+        m = _SILENCE_START.search(line)
+        if m:
+            start = max(0.0, float(m.group(1)))
+            continue
+        m = _SILENCE_END.search(line)
+        if m and start is not None:
+            silences.append((start, float(m.group(1))))
+            start = None
+    return silences
+
+
+def detect_silences(
+    audio: Path,
+    noise_db: Optional[float] = None,
+    min_silence: Optional[float] = None,
+) -> List[Tuple[float, float]]:
+    """Runs ffmpeg silencedetect over an audio file and returns the pauses found."""
+    noise_db = settings.align_noise_db if noise_db is None else noise_db
+    min_silence = settings.align_min_silence if min_silence is None else min_silence
+    argv = tool_argv(settings.ffmpeg_cmd) + ["-hide_banner", "-nostats"]
+    argv += ["-i", audio, "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}"]
+    argv += ["-f", "null", "-"]
+    result = run_command(argv, capture=True, quiet=True)
+    return parse_silences(result.stderr)
+
+
+def align_segments(
+    narrations: List[str],
+    total_duration: float,
+    silences: List[Tuple[float, float]],
+) -> List[SegmentTiming]:
+    """
+    Places segment boundaries on the pauses in the narration audio.
+
+    Each boundary is first estimated from the characters spoken so far, with
+    the speaking rate re-measured from the last placed boundary so errors do
+    not accumulate, then snapped to the middle of the nearest pause within a
+    window around that estimate. Boundaries with no pause nearby keep the
+    estimate.
+    """
+    if not narrations:
+        return []
+
+    lengths = [max(len(n.strip()), 1) for n in narrations]
+    pauses = sorted(
+        (s + e) / 2 for s, e in silences if 0 < (s + e) / 2 < total_duration
+    )
+
+    boundaries = [0.0]
+    for k in range(1, len(narrations)):
+        prev = boundaries[-1]
+        remaining_chars = sum(lengths[k - 1 :])
+        rate = (total_duration - prev) / remaining_chars
+        expected = lengths[k - 1] * rate
+        estimate = prev + expected
+
+        # Leave room for the remaining segments
+        latest = total_duration - MIN_SEGMENT * (len(narrations) - k)
+        window = max(1.0, 0.35 * expected)
+        candidates = [
+            p
+            for p in pauses
+            if prev + MIN_SEGMENT <= p <= latest and abs(p - estimate) <= window
+        ]
+        if candidates:
+            boundary = min(candidates, key=lambda p: abs(p - estimate))
+        else:
+            boundary = min(max(estimate, prev + MIN_SEGMENT), max(latest, prev))
+        boundaries.append(boundary)
+    boundaries.append(total_duration)
+
+    return [
+        SegmentTiming(round(boundaries[i], 3), round(boundaries[i + 1], 3))
+        for i in range(len(narrations))
+    ]
+
+
+def save_timings(path: Path, timings: List[SegmentTiming]) -> None:
+    path.write_text(json.dumps([asdict(t) for t in timings], indent=4))
+
+
+def load_timings(path: Path) -> List[SegmentTiming]:
+    return [SegmentTiming(**t) for t in json.loads(path.read_text())]
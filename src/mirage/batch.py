@@ -0,0 +1,122 @@
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import mirage.telemetry as telemetry
+from mirage.scheduler import run_ordered
+
+# Subcommands that can be queued in a batch file
+BATCH_COMMANDS = ("weather", "research", "news-short", "deep-news", "story", "summary")
+
+
+@dataclass
+class BatchResult:
+    index: int
+    argv: List[str]
+    duration: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return " ".join(self.argv)
+
+
+def load_jobs(path: Path) -> List[Dict[str, Any]]:
+    """
+    Reads a batch file. `.jsonl` files hold one job object per line;
+    `.yaml`/`.yml` files hold a list of jobs (or a mapping with a `jobs` key).
+    """
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yaml", ".yml"):
+        try:
+            import yaml  # type: ignore
+        except ImportError as e:
+            raise RuntimeError(
+                "YAML batch files require PyYAML (pip install pyyaml); use .jsonl instead."
+            ) from e
+        data = yaml.safe_load(text) or []
+        jobs = data.get("jobs", []) if isinstance(data, dict) else data
+    else:
+        jobs = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    if not isinstance(jobs, list) or not all(isinstance(j, dict) for j in jobs):
+        raise ValueError(f"{path}: expected a list of job objects")
+    return jobs
+
+
+def job_argv(job: Dict[str, Any]) -> List[str]:
+    """
+    Converts a job object into CLI arguments, e.g.
+    {"command": "deep-news", "topic": "Fusion", "jobs": 6}
+    -> ["deep-news", "Fusion", "--jobs", "6"].
+    A raw {"argv": [...]} list is passed through unchanged.
+    """
+    if "argv" in job:
+        return [str(a) for a in job["argv"]]
+
+    command = job.get("command")
+    if command not in BATCH_COMMANDS:
+        raise ValueError(f"Unsupported batch command: {command!r}")
+
+    argv = [command]
+    if "topic" in job:
+        argv.append(str(job["topic"]))
+    for key, value in job.items():
+        if key in ("command", "topic") or value is None or value is False:
+            continue
+        flag = "--" + key.replace("_", "-")
+        if value is True:
+            argv.append(flag)
+        else:
+            argv.extend([flag, str(value)])
+    return argv
+
+
+def run_batch(
+    jobs: List[Dict[str, Any]],
+    parser: argparse.ArgumentParser,
+    max_parallel: int,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[BatchResult]:
+    """
+    Runs every job in this process through one worker pool. Jobs run silent
+    (no spinners), so tool caches, the planner connection pool and the
+    per-tool concurrency limits are shared across all of them.
+    """
+    prepared = []
+    for index, job in enumerate(jobs):
+        result = BatchResult(index=index, argv=[str(job.get("command", "?"))])
+        try:
+            result.argv = job_argv(job)
+            args = parser.parse_args(result.argv)
+            if result.argv[0] not in BATCH_COMMANDS:
+                raise ValueError(f"Unsupported batch command: {result.argv[0]!r}")
+            args.silent = True
+            args.background = False
+        except ValueError as e:
+            result.error = f"Invalid job: {e}"
+            args = None
+        except SystemExit:
+            # argparse already printed the usage error
+            result.error = "Invalid job: bad arguments"
+            args = None
+        prepared.append((result, args))
+
+    def execute(item: Any) -> BatchResult:
+        result, args = item
+        if args is None:
+            return result
+        start = time.perf_counter()
+        try:
+            with telemetry.run(args.command):
+                args.func(args)
+        except Exception as e:
+            result.error = str(e) or type(e).__name__
+        finally:
+            result.duration = time.perf_counter() - start
+        return result
+
+    return run_ordered(execute, prepared, max_parallel, on_progress)
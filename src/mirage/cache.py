@@ -0,0 +1,204 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from mirage.config import settings
+
+
+@dataclass
+class CacheStats:
+    entries: int
+    total_bytes: int
+    max_bytes: int
+
+
+_digest_lock = threading.Lock()
+_digest_memo: Dict[Tuple[str, int, int], str] = {}
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's content, memoized on (path, mtime, size)."""
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    with _digest_lock:
+        if memo_key in _digest_memo:
+            return _digest_memo[memo_key]
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+
+    with _digest_lock:
+        _digest_memo[memo_key] = digest
+    return digest
+
+
+def detach(path: Path) -> None:
+    """
+    Unlinks `path` if it is hardlinked to a cached object, so whatever writes
+    there next gets its own file instead of failing on the read-only object
+    (or, running as root, rewriting it under every run that shares it).
+    """
+    try:
+        if path.stat().st_nlink > 1:
+            path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class ArtifactCache:
+    """
+    Content-addressed store for generated media.
+    Entries are keyed by tool name, tool arguments and input file digests,
+    and evicted least-recently-used first once the store exceeds max_bytes.
+    """
+
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+
+    @property
+    def objects_dir(self) -> Path:
+        return self.root / "objects"
+
+    def key(self, tool: str, args: Sequence[str], inputs: Sequence[Path] = ()) -> str:
+        material = {
+            "tool": tool,
+            "args": [str(a) for a in args],
+            "inputs": [file_digest(Path(p)) for p in inputs],
+        }
+        blob = json.dumps(material, sort_keys=True).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.objects_dir / key[:2] / key
+
+    @contextmanager
+    def _locked(self, shared: bool = False) -> Iterator[None]:
+        """
+        flock on the store, held shared while restoring or adding entries
+        and exclusive while evicting, so a prune in one thread or process
+        never removes an entry another is linking or staging.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def fetch(self, key: str, outputs: Sequence[Path]) -> bool:
+        """
+        Restores every output from the cache (hardlink, falling back to copy).
+        Returns False without touching outputs unless the entry is complete.
+        """
+        entry = self._entry_dir(key)
+        stored = [entry / str(i) for i in range(len(outputs))]
+        with self._locked(shared=True):
+            if not (entry / "meta.json").exists() or not all(
+                p.exists() for p in stored
+            ):
+                return False
+
+            for src, dest in zip(stored, outputs):
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                if dest.exists() or dest.is_symlink():
+                    dest.unlink()
+                try:
+                    os.link(src, dest)
+                except OSError:
+                    shutil.copyfile(src, dest)
+
+            # Mark as recently used for LRU eviction
+            os.utime(entry / "meta.json")
+        return True
+
+    def store(self, key: str, outputs: Sequence[Path]) -> None:
+        """Copies outputs into the cache under key, then enforces the size cap."""
+        entry = self._entry_dir(key)
+        if (entry / "meta.json").exists():
+            return
+
+        with self._locked(shared=True):
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=entry.parent))
+            try:
+                total = 0
+                for i, src in enumerate(outputs):
+                    dest = staging / str(i)
+                    shutil.copyfile(src, dest)
+                    # Read-only so a hardlinked output cannot be rewritten in
+                    # place; writers detach() it first
+                    dest.chmod(0o444)
+                    total += dest.stat().st_size
+                meta = {
+                    "names": [Path(p).name for p in outputs],
+                    "bytes": total,
+                    "created": time.time(),
+                }
+                (staging / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+                try:
+                    staging.rename(entry)
+                except OSError:
+                    # Another process stored the same key first
+                    pass
+            finally:
+                if staging.exists():
+                    shutil.rmtree(staging, ignore_errors=True)
+
+        self.prune()
+
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        """Returns (last_used, bytes, entry_dir) for every complete entry."""
+        entries = []
+        if not self.objects_dir.exists():
+            return entries
+        for meta_file in self.objects_dir.glob("*/*/meta.json"):
+            try:
+                meta = json.loads(meta_file.read_text(encoding="utf-8"))
+                entries.append(
+                    (meta_file.stat().st_mtime, int(meta["bytes"]), meta_file.parent)
+                )
+            except (OSError, ValueError, KeyError):
+                continue
+        return entries
+
+    def stats(self) -> CacheStats:
+        entries = self._entries()
+        return CacheStats(
+            entries=len(entries),
+            total_bytes=sum(size for _, size, _ in entries),
+            max_bytes=self.max_bytes,
+        )
+
+    def prune(self, max_bytes: Optional[int] = None) -> int:
+        """Evicts least-recently-used entries until under max_bytes. Returns count removed."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        removed = 0
+        with self._locked():
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry in entries:
+                if total <= limit:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+                removed += 1
+        return removed
+
+
+artifact_cache = ArtifactCache(
+    settings.cache_dir, settings.cache_max_size_mb * 1024 * 1024
+)
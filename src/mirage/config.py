@@ -1,4 +1,6 @@
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -16,13 +18,100 @@ class Settings(BaseSettings):
     ffmpeg_cmd: str = "ffmpeg"
     ffprobe_cmd: str = "ffprobe"
 
+    # Concurrency
+    max_jobs: int = 4  # Worker pool size for per-segment media generation
+    vidius_concurrency: int = 3  # Concurrent Vidius (Veo) renders per run
+    batch_concurrency: int = 2  # Jobs run at the same time by `mirage batch`
+    daemon_workers: int = 2  # Jobs run at the same time by `mirage daemon`
+    daemon_poll_interval: float = 0.5  # Seconds between job queue checks
+    # Cap on simultaneous invocations across all mirage processes, keyed by
+    # tool name (e.g. "lumina", even when lumina_cmd is "uv run lumina")
+    tool_concurrency: Dict[str, int] = {
+        "lumina": 4,
+        "vidius": 3,
+        "gen-tts": 2,
+        "gen-music": 2,
+        "deep-research": 2,
+    }
+    # Calls per minute allowed across all mirage processes (shared API quotas)
+    tool_rate_limits: Dict[str, float] = {
+        "lumina": 60,
+        "vidius": 10,
+        "gen-tts": 30,
+        "gen-music": 10,
+    }
+
+    # Planner HTTP client (Gemini API)
+    planner_base_url: str = "https://generativelanguage.googleapis.com/v1beta"
+    planner_connect_timeout: float = 10.0
+    planner_read_timeout: float = 300.0
+    planner_max_retries: int = 4
+    planner_backoff_base: float = 1.0
+    planner_backoff_max: float = 30.0
+    planner_pool_size: int = 8
+    planner_concurrency: int = 4  # Concurrent plan requests in batch mode
+    planner_requests_per_minute: float = 30.0
+
+    # Video encoding: `quality` picks one of encoder_profiles (--quality flag)
+    quality: str = "standard"
+    encoder_profiles: Dict[str, Dict[str, Any]] = {
+        "draft": {"preset": "ultrafast", "crf": 32},
+        "standard": {"preset": "medium", "crf": 23},
+        "publish": {"preset": "slow", "crf": 18, "faststart": True},
+        "vaapi": {"codec": "h264_vaapi", "qp": 23},
+        "qsv": {"codec": "h264_qsv", "preset": "medium", "global_quality": 23},
+    }
+    vaapi_device: str = "/dev/dri/renderD128"
+
+    # Slideshow rendering (deep-news)
+    render_width: int = 1920
+    render_height: int = 1080
+    render_fps: int = 25
+    render_fade: float = 0.5  # Seconds of fade in/out per slide
+    render_max_inputs: int = 64  # Images per ffmpeg graph before chunking
+
+    # Seconds news.txt must stay unchanged before deep-news plans from it
+    # while gen-tts is still synthesizing the audio
+    tts_script_settle: float = 0.5
+
+    # Segment alignment (silence detection on the narration track)
+    align_noise_db: float = -35.0  # Level below which audio counts as a pause
+    align_min_silence: float = 0.25  # Shortest pause considered, in seconds
+
+    # Clips one ffmpeg process may decode at once when re-encoding a stitch
+    stitch_max_inputs: int = 16
+
+    # Character library: pre-framed copies made on add/create, keyed by the
+    # aspect ratio story/summary render at, and the planner's thumbnail size
+    character_variants: Dict[str, Tuple[int, int]] = {
+        "9:16": (1080, 1920),
+        "16:9": (1920, 1080),
+    }
+    character_thumbnail_size: int = 512  # Longest edge, in pixels
+
+    # Run traces: each command writes trace.json (OTLP/JSON) and
+    # trace.perfetto.json to its output directory, and optionally sends the
+    # trace to an OTLP/HTTP collector, e.g. http://localhost:4318/v1/traces
+    trace_enabled: bool = True
+    trace_otlp_endpoint: Optional[str] = None
+    trace_export_timeout: float = 5.0
+
     # Default Location
     default_location: str = "home"
 
     # Paths
     output_base_dir: Path = Path.home() / "Documents" / "Mirage"
     log_file: Path = Path.home() / ".config" / "mirage" / "mirage.log"
+    daemon_dir: Path = (
+        Path.home() / ".config" / "mirage" / "daemon"
+    )  # Queue and job logs
     character_library_dir: Path = Path.home() / ".config" / "mirage" / "characters"
+    cache_dir: Path = Path.home() / ".cache" / "mirage"
+    governor_dir: Path = Path.home() / ".cache" / "mirage" / "governor"
+
+    # Artifact Cache (reuses lumina/vidius/gen-tts/gen-music outputs)
+    cache_enabled: bool = True
+    cache_max_size_mb: int = 20480
 
     model_config = SettingsConfigDict(
         env_file=str(Path.home() / ".config" / "mirage" / ".env"),
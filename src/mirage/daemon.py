@@ -0,0 +1,351 @@
+import fcntl
+import json
+import os
+import signal
+import sqlite3
+import sys
+import time
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterator, List, Optional, Set
+
+from rich.console import Console
+
+from mirage.config import settings
+
+console = Console()
+
+# Job states. A running job whose cancellation was requested stays
+# "cancelling" until the daemon has stopped its process group.
+QUEUED = "queued"
+RUNNING = "running"
+CANCELLING = "cancelling"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    argv TEXT NOT NULL,
+    state TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    pid INTEGER,
+    exit_code INTEGER
+)
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    argv: List[str]
+    state: str
+    submitted_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    pid: Optional[int] = None
+    exit_code: Optional[int] = None
+
+    @property
+    def label(self) -> str:
+        return " ".join(self.argv)
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobStore:
+    """The daemon's job queue, a SQLite database shared by all mirage processes."""
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self.root = root or settings.daemon_dir
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / "logs").mkdir(exist_ok=True)
+        self.path = self.root / "jobs.db"
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # Short-lived connections, so a forked job never shares one with the daemon
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Job:
+        fields = dict(row)
+        fields["argv"] = json.loads(fields["argv"])
+        return Job(**fields)
+
+    def log_path(self, job_id: int) -> Path:
+        return self.root / "logs" / f"{job_id}.log"
+
+    def submit(self, argv: List[str]) -> int:
+        with self._connect() as db:
+            cur = db.execute(
+                "INSERT INTO jobs (argv, state, submitted_at) VALUES (?, ?, ?)",
+                (json.dumps(argv), QUEUED, time.time()),
+            )
+            return int(cur.lastrowid)
+
+    def get(self, job_id: int) -> Optional[Job]:
+        with self._connect() as db:
+            row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def jobs(self, states: Optional[List[str]] = None, limit: int = 20) -> List[Job]:
+        """Most recent jobs first, optionally filtered by state."""
+        query = "SELECT * FROM jobs"
+        params: List[object] = []
+        if states:
+            query += f" WHERE state IN ({','.join('?' * len(states))})"
+            params += states
+        query += " ORDER BY id DESC LIMIT ?"
+        with self._connect() as db:
+            rows = db.execute(query, params + [limit]).fetchall()
+        return [self._job(r) for r in rows]
+
+    def claim(self) -> Optional[Job]:
+        """Atomically moves the oldest queued job to running."""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                "SELECT * FROM jobs WHERE state = ? ORDER BY id LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+            db.execute(
+                "UPDATE jobs SET state = ?, started_at = ? WHERE id = ?",
+                (RUNNING, time.time(), row["id"]),
+            )
+            db.execute("COMMIT")
+        return self.get(row["id"])
+
+    def set_pid(self, job_id: int, pid: int) -> None:
+        with self._connect() as db:
+            db.execute("UPDATE jobs SET pid = ? WHERE id = ?", (pid, job_id))
+
+    def finish(self, job_id: int, state: str, exit_code: Optional[int]) -> None:
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET state = ?, exit_code = ?, finished_at = ? WHERE id = ?",
+                (state, exit_code, time.time(), job_id),
+            )
+
+    def cancel(self, job_id: int) -> Optional[str]:
+        """
+        Cancels a queued job outright, or asks the daemon to stop a running
+        one. Returns the job's new state, or None if there is no such job.
+        """
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            row = db.execute(
+                "SELECT state FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                db.execute("COMMIT")
+                return None
+            state = row["state"]
+            if state == QUEUED:
+                state = CANCELLED
+                db.execute(
+                    "UPDATE jobs SET state = ?, finished_at = ? WHERE id = ?",
+                    (state, time.time(), job_id),
+                )
+            elif state == RUNNING:
+                state = CANCELLING
+                db.execute("UPDATE jobs SET state = ? WHERE id = ?", (state, job_id))
+            db.execute("COMMIT")
+        return state
+
+    def fail_orphans(self) -> None:
+        """Marks jobs left running by a daemon that died as failed."""
+        with self._connect() as db:
+            db.execute(
+                "UPDATE jobs SET state = ?, finished_at = ? WHERE state IN (?, ?)",
+                (FAILED, time.time(), RUNNING, CANCELLING),
+            )
+
+
+def _lock_file(root: Path) -> Path:
+    return root / "daemon.lock"
+
+
+def is_running(root: Optional[Path] = None) -> bool:
+    """True if a daemon currently holds the lock for the queue at `root`."""
+    path = _lock_file(root or settings.daemon_dir)
+    if not path.exists():
+        return False
+    with open(path, "a") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        fcntl.flock(f, fcntl.LOCK_UN)
+    return False
+
+
+def _run_child(job: Job, log_path: Path, run_job: Callable[[List[str]], None]) -> None:
+    """Body of a forked job process. Never returns."""
+    code = 1
+    try:
+        # Own process group, so cancel can stop the job's tools along with it
+        os.setpgrp()
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        # Unwind (releasing tool slots) when cancelled
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(143))
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        log_fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        os.dup2(log_fd, 1)
+        os.dup2(log_fd, 2)
+        sys.stdout = open(1, "w", buffering=1, closefd=False)
+        sys.stderr = open(2, "w", buffering=1, closefd=False)
+        print(f"$ mirage {job.label}", flush=True)
+        run_job(job.argv)
+        code = 0
+    except SystemExit as e:
+        # A bare sys.exit() is success
+        code = 0 if e.code is None else e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+class Daemon:
+    """
+    Runs queued jobs in forked copies of this already-initialised process, so
+    a job starts without interpreter or import overhead. Each job gets its
+    own log and process group; per-tool concurrency limits are shared by
+    all of them.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        run_job: Callable[[List[str]], None],
+        workers: Optional[int] = None,
+    ) -> None:
+        self.store = store
+        self.run_job = run_job
+        self.workers = workers or settings.daemon_workers
+        self.children: Dict[int, int] = {}  # pid -> job id
+        self.signalled: Set[int] = set()
+        self._lock: Optional[IO[str]] = None
+        self.stopping = False
+
+    def _spawn(self, job: Job) -> None:
+        log_path = self.store.log_path(job.id)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            if self._lock is not None:
+                self._lock.close()
+            _run_child(job, log_path, self.run_job)
+        self.children[pid] = job.id
+        self.store.set_pid(job.id, pid)
+        console.print(f"[cyan]Started job {job.id}:[/cyan] {job.label}")
+
+    def _reap(self) -> None:
+        for pid in list(self.children):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, 1 << 8
+            if not done:
+                continue
+            job_id = self.children.pop(pid)
+            self.signalled.discard(pid)
+            job = self.store.get(job_id)
+            code = os.waitstatus_to_exitcode(status)
+            if job is not None and job.state == CANCELLING:
+                state = CANCELLED
+            else:
+                state = DONE if code == 0 else FAILED
+            self.store.finish(job_id, state, code)
+            console.print(f"[cyan]Job {job_id} {state}[/cyan] (exit {code})")
+
+    def _signal_cancelled(self) -> None:
+        for job in self.store.jobs([CANCELLING], limit=self.workers * 4):
+            if job.pid in self.children and job.pid not in self.signalled:
+                self.signalled.add(job.pid)
+                try:
+                    os.killpg(job.pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+    def tick(self) -> None:
+        """One scheduling round: reap, deliver cancellations, start jobs."""
+        self._reap()
+        self._signal_cancelled()
+        while not self.stopping and len(self.children) < self.workers:
+            job = self.store.claim()
+            if job is None:
+                break
+            self._spawn(job)
+
+    def shutdown(self, grace: float = 10.0) -> None:
+        """Stops running jobs (TERM, then KILL after `grace` seconds)."""
+        for pid in self.children:
+            try:
+                os.killpg(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + grace
+        while self.children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in self.children:
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        while self.children:
+            self._reap()
+            time.sleep(0.05)
+
+    def serve(self) -> None:
+        """Runs until SIGINT/SIGTERM. Only one daemon may use a queue at a time."""
+        self._lock = open(_lock_file(self.store.root), "a")
+        try:
+            fcntl.flock(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock.close()
+            raise RuntimeError("A mirage daemon is already running.") from None
+
+        def stop(*_: object) -> None:
+            self.stopping = True
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+        self.store.fail_orphans()
+        console.print(
+            f"[bold green]Mirage daemon ready[/bold green] ({self.workers} workers, pid {os.getpid()})"
+        )
+        try:
+            while not self.stopping:
+                self.tick()
+                time.sleep(settings.daemon_poll_interval)
+        finally:
+            self.shutdown()
+            self._lock.close()
+            console.print("[yellow]Mirage daemon stopped.[/yellow]")
@@ -0,0 +1,108 @@
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Optional
+
+from rich.console import Console
+
+from mirage.config import settings
+from mirage.runner import run_command, tool_argv
+
+console = Console()
+
+# Encoders that run on a GPU and need a device to be present
+HARDWARE_CODECS = ("h264_vaapi", "h264_qsv")
+
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    name: str
+    codec: str = "libx264"
+    preset: Optional[str] = None
+    crf: Optional[int] = None
+    qp: Optional[int] = None  # VAAPI constant quantizer
+    global_quality: Optional[int] = None  # QSV ICQ level
+    faststart: bool = False
+
+    @property
+    def is_hardware(self) -> bool:
+        return self.codec in HARDWARE_CODECS
+
+    def input_args(self) -> List[str]:
+        """Global options that must precede the inputs (hardware device setup)."""
+        if self.codec == "h264_vaapi":
+            return ["-vaapi_device", settings.vaapi_device]
+        return []
+
+    def upload_filter(self) -> Optional[str]:
+        """Filter that moves frames to the GPU, appended to the video graph."""
+        if self.codec == "h264_vaapi":
+            return "format=nv12,hwupload"
+        return None
+
+    def output_args(self, tune: Optional[str] = None) -> List[str]:
+        """Video codec options. `tune` applies to libx264 only."""
+        args = ["-c:v", self.codec]
+        if self.preset:
+            args += ["-preset", self.preset]
+        if self.crf is not None:
+            args += ["-crf", str(self.crf)]
+        if self.qp is not None:
+            args += ["-qp", str(self.qp)]
+        if self.global_quality is not None:
+            args += ["-global_quality", str(self.global_quality)]
+        if tune and self.codec == "libx264":
+            args += ["-tune", tune]
+        if self.codec == "h264_qsv":
+            args += ["-pix_fmt", "nv12"]
+        elif self.codec != "h264_vaapi":
+            args += ["-pix_fmt", "yuv420p"]
+        if self.faststart:
+            args += ["-movflags", "+faststart"]
+        return args
+
+
+@lru_cache(maxsize=None)
+def _available_encoders() -> str:
+    try:
+        result = run_command(
+            tool_argv(settings.ffmpeg_cmd) + ["-hide_banner", "-encoders"],
+            capture=True,
+            quiet=True,
+            check=False,
+        )
+    except OSError:
+        return ""
+    return result.stdout
+
+
+def hardware_available(codec: str) -> bool:
+    """True if ffmpeg was built with the encoder and its device is present."""
+    if codec not in _available_encoders():
+        return False
+    if codec == "h264_vaapi":
+        return os.path.exists(settings.vaapi_device)
+    if codec == "h264_qsv":
+        return os.path.isdir("/dev/dri")
+    return True
+
+
+def get_profile(name: Optional[str] = None) -> EncoderProfile:
+    """
+    Looks up a named profile from settings.encoder_profiles (default:
+    settings.quality). Hardware profiles fall back to `standard` when the
+    encoder or device is missing.
+    """
+    name = name or settings.quality
+    if name not in settings.encoder_profiles:
+        raise ValueError(
+            f"Unknown quality profile {name!r} "
+            f"(choose from {', '.join(settings.encoder_profiles)})"
+        )
+    profile = EncoderProfile(name=name, **settings.encoder_profiles[name])
+    if profile.is_hardware and not hardware_available(profile.codec):
+        console.print(
+            f"[yellow]Warning: {profile.codec} is not available; using the standard profile.[/yellow]"
+        )
+        return get_profile("standard")
+    return profile
@@ -0,0 +1,125 @@
+import fcntl
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from mirage.config import settings
+
+
+class Governor:
+    """
+    Coordinates external tool calls across every mirage process on the
+    machine, using lock files under `root`:
+
+    - concurrency: a tool limited to N calls holds one of N slot files,
+      flock'd for the duration of the call. The kernel drops the lock if
+      the process dies, so a crashed run never leaks a slot.
+    - rate: a token bucket per tool, kept in a small state file that is
+      updated under flock. It refills at the configured calls per minute
+      and holds at most as many tokens as the tool has slots.
+
+    Tools with no configured limits are not restricted.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        concurrency: Dict[str, int],
+        rates: Dict[str, float],
+        poll: float = 0.05,
+    ) -> None:
+        self.root = root
+        self.concurrency = {t: n for t, n in concurrency.items() if n > 0}
+        self.rates = {t: r for t, r in rates.items() if r > 0}
+        self.poll = poll
+
+    def _open(self, name: str) -> int:
+        self.root.mkdir(parents=True, exist_ok=True)
+        return os.open(self.root / name, os.O_RDWR | os.O_CREAT, 0o644)
+
+    @contextmanager
+    def _slot(self, tool: str) -> Iterator[None]:
+        limit = self.concurrency.get(tool)
+        if limit is None:
+            yield
+            return
+        fds = [self._open(f"{tool}.slot{i}") for i in range(limit)]
+        held: Optional[int] = None
+        try:
+            while held is None:
+                # Start at a random slot so waiters don't all contend for slot 0
+                offset = random.randrange(limit)
+                for i in range(limit):
+                    fd = fds[(offset + i) % limit]
+                    try:
+                        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue
+                    held = fd
+                    break
+                else:
+                    time.sleep(self.poll * random.uniform(0.5, 1.5))
+            yield
+        finally:
+            # Closing the descriptors also releases the held lock
+            for fd in fds:
+                os.close(fd)
+
+    def _reserve(self, tool: str) -> float:
+        """
+        Takes a token from the tool's bucket. Returns 0 on success, or how
+        many seconds to wait before a token becomes available.
+        """
+        per_second = self.rates[tool] / 60.0
+        capacity = float(self.concurrency.get(tool, 1))
+        fd = self._open(f"{tool}.bucket")
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.read(fd, 4096)
+            now = time.time()
+            try:
+                state = json.loads(raw)
+                tokens, updated = float(state["tokens"]), float(state["updated"])
+            except (ValueError, KeyError, TypeError):
+                tokens, updated = capacity, now
+            tokens = min(capacity, tokens + max(0.0, now - updated) * per_second)
+
+            wait = 0.0
+            if tokens >= 1.0:
+                tokens -= 1.0
+            else:
+                wait = (1.0 - tokens) / per_second
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps({"tokens": tokens, "updated": now}).encode())
+            return wait
+        finally:
+            os.close(fd)
+
+    def _throttle(self, tool: str) -> None:
+        if tool not in self.rates:
+            return
+        while True:
+            wait = self._reserve(tool)
+            if wait <= 0:
+                return
+            time.sleep(min(wait, 5.0) + random.uniform(0, self.poll))
+
+    @contextmanager
+    def slot(self, tool: str) -> Iterator[None]:
+        """
+        Waits for a free concurrency slot, then for a rate-limit token, and
+        holds the slot until the block exits.
+        """
+        with self._slot(tool):
+            self._throttle(tool)
+            yield
+
+
+governor = Governor(
+    settings.governor_dir, settings.tool_concurrency, settings.tool_rate_limits
+)
@@ -4,18 +4,47 @@ import os
 import sys
 import argparse
 import datetime
-import shutil
 import re
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait as futures_wait
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from rich.console import Console
 from rich.panel import Panel
+from rich.table import Table
 from rich.traceback import install
 from jinja2 import Environment, FileSystemLoader
 
+from mirage.align import align_segments, detect_silences, load_timings, save_timings
+from mirage.cache import artifact_cache
 from mirage.config import settings
+from mirage.encoders import get_profile
+from mirage.manifest import StageManifest, hash_inputs
+from mirage.media import (
+    DEFAULT_VOICE_PROMPT,
+    CharacterRepository,
+    SegmentRenderer,
+    Stitcher,
+    run_cached,
+)
+import mirage.batch as batch
+import mirage.daemon as daemon
+import mirage.telemetry as telemetry
 import mirage.planner as planner
+from mirage.probe import ProbeError, probe
+from mirage.render import Slide, render_slideshow
+from mirage.runner import run_command, tool_argv
+from mirage.scheduler import (
+    Stage,
+    StagePipeline,
+    run_ordered,
+    wait_for_stable_file,
+)
 
 # Install rich traceback handler
 install(show_locals=True)
@@ -23,60 +52,124 @@ install(show_locals=True)
 console = Console()
 
 DEFAULT_NEGATIVE_PROMPT = "text, watermark, copyright, signature, news anchor, news studio, television screen, chyron, split screen, ugly, deformed, blurry, low quality, cartoon, illustration, drawing, anime, studio lighting, microphone, suit, tie, breaking news graphic, lower third, teleprompter, cameraman, tv set, newscaster, talking head, interview, desk, broadcast overlay"
+VIDIUS_STATIC_NEGATIVE = (
+    "zooming, camera movement, blur, dolly, pan, tilt, dynamic camera"
+)
 
 
-def run_command(command: str, shell: bool = True, quiet: bool = False) -> None:
-    """Runs a shell command and raises an exception on failure."""
-    try:
-        if quiet:
-            subprocess.run(
-                command,
-                shell=shell,
-                check=True,
-                executable="/bin/bash",
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
-        else:
-            subprocess.run(command, shell=shell, check=True, executable="/bin/bash")
-
-    except subprocess.CalledProcessError as e:
-        console.print(f"[bold red]Error running command:[/bold red] {command}")
-        if quiet:
-            console.print("[red]Captured Stderr:[/red]")
-            console.print(e.stderr)
-            console.print("[red]Captured Stdout:[/red]")
-            console.print(e.stdout)
-        else:
-            console.print(e)
-        raise
+class CommandError(Exception):
+    """
+    A subcommand failed to produce its output. main() reports it and exits
+    non-zero; batch and daemon jobs record it as a failure.
+    """
 
 
-def get_audio_duration(file_path: Path) -> float:
-    """Gets the duration of a media file in seconds using ffprobe."""
-    try:
-        cmd = [
-            settings.ffprobe_cmd,
-            "-v",
-            "error",
-            "-show_entries",
-            "format=duration",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
-            str(file_path),
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        return float(result.stdout.strip())
-    except (subprocess.CalledProcessError, ValueError):
-        console.print(
-            f"[yellow]Warning: Could not determine duration of {file_path}. Defaulting to 60s.[/yellow]"
-        )
-        return 60.0
+class _NullStatus:
+    """Stand-in for a rich Status when running silently (e.g. inside a batch)."""
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        pass
 
 
-# Helper alias for video duration probing logic (can reuse get_audio_duration for video files too)
-get_duration = get_audio_duration
+@contextmanager
+def progress_status(message: str, spinner: str, silent: bool) -> Iterator[Any]:
+    """
+    A console spinner, or a no-op in silent mode. Rich allows only one live
+    display at a time, so concurrently running commands must stay silent.
+    """
+    if silent:
+        yield _NullStatus()
+    else:
+        with console.status(message, spinner=spinner) as status:
+            yield status
+
+
+@lru_cache(maxsize=1)
+def template_env() -> Environment:
+    """Shared Jinja environment, so templates are only compiled once per process."""
+    return Environment(loader=FileSystemLoader(Path(__file__).parent / "templates"))
+
+
+def resolve_output_dir(prefix: str, name: str, resume: Optional[str]) -> Path:
+    """
+    Returns the resumed run directory, or a fresh timestamped one, and
+    directs the run's timings there.
+    """
+    if resume:
+        output_dir = Path(resume).expanduser()
+        if not output_dir.is_dir():
+            raise FileNotFoundError(
+                f"Cannot resume, no such run directory: {output_dir}"
+            )
+        telemetry.attach(output_dir)
+        return output_dir
+
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    output_dir = settings.output_base_dir / f"{prefix}_{name}_{timestamp}"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    telemetry.attach(output_dir)
+    return output_dir
+
+
+def load_segments(segments_file: Path) -> List[Dict[str, str]]:
+    """Loads a planner result persisted by an earlier (possibly interrupted) run."""
+    with open(segments_file, "r") as f:
+        return json.load(f)
+
+
+def gather_atmos(location: str, context_file: Path) -> None:
+    """
+    Runs the atmos queries concurrently and writes their stdout to
+    context_file in a fixed order. A failed query contributes nothing
+    instead of aborting the run.
+    """
+    atmos = tool_argv(settings.atmos_cmd)
+    queries = [
+        ["alert", location],
+        [location],
+        ["stars", location],
+        ["forecast", location],
+        ["forecast", location, "--hourly"],
+    ]
+
+    def query(query_args: List[str]) -> Optional[bytes]:
+        try:
+            result = run_command(
+                atmos + query_args, capture=True, quiet=True, tool="atmos"
+            )
+        except (subprocess.CalledProcessError, OSError) as e:
+            console.print(
+                f"[yellow]Warning: atmos query failed ({' '.join(query_args)}): {e}[/yellow]"
+            )
+            return None
+        return result.stdout.encode("utf-8")
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        outputs = list(pool.map(telemetry.in_context(query), queries))
+
+    if all(out is None for out in outputs):
+        raise RuntimeError(f"All atmos queries failed for {location}.")
+
+    with open(context_file, "wb") as f:
+        for out in outputs:
+            if out:
+                f.write(out)
+
+
+def print_stage_timings(stages: List[Stage]) -> None:
+    """Prints a per-stage wall-clock summary for a pipeline run."""
+    table = Table(title="Stage Timings", show_header=True, header_style="bold")
+    table.add_column("Stage")
+    table.add_column("Time", justify="right")
+    for stage in stages:
+        if stage.skipped:
+            elapsed = "skipped"
+        elif stage.duration is None:
+            elapsed = "-"
+        else:
+            elapsed = f"{stage.duration:.1f}s"
+        table.add_row(stage.name, elapsed)
+    console.print(table)
 
 
 def cmd_weather(args: argparse.Namespace) -> None:
@@ -89,6 +182,7 @@ def cmd_weather(args: argparse.Namespace) -> None:
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     output_dir = settings.output_base_dir / f"Weather_{sanitized_loc}_{timestamp}"
     output_dir.mkdir(parents=True, exist_ok=True)
+    telemetry.attach(output_dir)
 
     if not silent:
         console.print(
@@ -104,76 +198,103 @@ def cmd_weather(args: argparse.Namespace) -> None:
     video_file = output_dir / "background_video.mp4"
     html_file = output_dir / "index.html"
 
-    with console.status(
+    with progress_status(
         f"[bold green]Gathering atmospheric data for {location}...[/bold green]",
         spinner="earth",
+        silent=silent,
     ) as status:
         if not silent:
             status.update(
                 f"[bold green]Gathering atmospheric data for {location}...[/bold green]"
             )
 
-        cmd_gather = (
-            f'{settings.atmos_cmd} alert "{location}" > "{context_file}" && '
-            f'{settings.atmos_cmd} "{location}" >> "{context_file}" && '
-            f'{settings.atmos_cmd} stars "{location}" >> "{context_file}" && '
-            f'{settings.atmos_cmd} forecast "{location}" >> "{context_file}" && '
-            f'{settings.atmos_cmd} forecast "{location}" --hourly >> "{context_file}"'
-        )
-        run_command(cmd_gather, quiet=True)
-
-        context_text = context_file.read_text(encoding="utf-8")
-
-        if not silent:
-            status.update(
-                "[bold blue]Synthesizing immersive audio podcast...[/bold blue]"
-            )
-        run_command(
-            f'cat "{context_file}" | {settings.gen_tts_cmd} --podcast --no-play --audio-format MP3 --output-file "{podcast_file}"',
-            quiet=silent,
-        )
+        def stage_gather() -> None:
+            gather_atmos(location, context_file)
 
-        if not silent:
-            status.update(
-                "[bold magenta]Dreaming up background visual...[/bold magenta]"
+        # The podcast and the image both only read context.txt, so they run
+        # side by side; the video starts as soon as the image exists.
+        def stage_podcast() -> None:
+            if not silent:
+                status.update(
+                    "[bold blue]Synthesizing immersive audio podcast...[/bold blue]"
+                )
+            run_cached(
+                tool_argv(settings.gen_tts_cmd)
+                + [
+                    "--podcast",
+                    "--no-play",
+                    "--audio-format",
+                    "MP3",
+                    "--output-file",
+                    podcast_file,
+                ],
+                stdin_file=context_file,
+                tool="gen-tts",
+                inputs=[context_file],
+                outputs=[podcast_file],
+                quiet=silent,
             )
-        run_command(
-            f'cat "{context_file}" | {settings.lumina_cmd} --opt --output-dir "{output_dir}" -f background_art.png',
-            quiet=silent,
-        )
 
-        if not image_file.exists():
-            console.print(
-                "[yellow]Warning: Lumina failed to generate an image. Creating placeholder.[/yellow]"
-            )
-            run_command(
-                f'{settings.convert_cmd} -size 1024x1024 xc:black "{image_file}"',
+        def stage_image() -> None:
+            if not silent:
+                status.update(
+                    "[bold magenta]Dreaming up background visual...[/bold magenta]"
+                )
+            run_cached(
+                tool_argv(settings.lumina_cmd)
+                + ["--opt", "--output-dir", output_dir, "-f", "background_art.png"],
+                stdin_file=context_file,
+                tool="lumina",
+                inputs=[context_file],
+                outputs=[image_file],
                 quiet=silent,
             )
 
-        has_video = False
-        if generate_video:
-            if image_file.exists():
-                if not silent:
-                    status.update(
-                        "[bold cyan]Animating scene with Vidius...[/bold cyan]"
-                    )
-                vid_prompt = f"Cinematic slow motion animation of {location}, realistic weather, highly detailed"
+            if not image_file.exists():
+                console.print(
+                    "[yellow]Warning: Lumina failed to generate an image. Creating placeholder.[/yellow]"
+                )
                 run_command(
-                    f'{settings.vidius_cmd} "{vid_prompt}" -i "{image_file}" -o "{video_file}" -na',
+                    tool_argv(settings.convert_cmd)
+                    + ["-size", "1024x1024", "xc:black", image_file],
                     quiet=silent,
+                    tool="convert",
                 )
-                has_video = video_file.exists()
-            else:
+
+        def stage_video() -> None:
+            if not image_file.exists():
                 console.print(
                     "[yellow]Skipping video generation: No source image.[/yellow]"
                 )
+                return
+            if not silent:
+                status.update("[bold cyan]Animating scene with Vidius...[/bold cyan]")
+            vid_prompt = f"Cinematic slow motion animation of {location}, realistic weather, highly detailed"
+            run_cached(
+                tool_argv(settings.vidius_cmd)
+                + [vid_prompt, "-i", image_file, "-o", video_file, "-na"],
+                tool="vidius",
+                inputs=[image_file],
+                outputs=[video_file],
+                quiet=silent,
+                prompt=vid_prompt,
+            )
+
+        pipeline = StagePipeline()
+        pipeline.add("gather", stage_gather)
+        pipeline.add("podcast", stage_podcast, deps=["gather"])
+        pipeline.add("image", stage_image, deps=["gather"])
+        if generate_video:
+            pipeline.add("video", stage_video, deps=["image"])
+        stages = pipeline.run()
+
+        context_text = context_file.read_text(encoding="utf-8")
+        has_video = generate_video and video_file.exists()
 
         if not silent:
             status.update("[bold white]Assembling final experience...[/bold white]")
 
-        env = Environment(loader=FileSystemLoader(Path(__file__).parent / "templates"))
-        template = env.get_template("index.html.j2")
+        template = template_env().get_template("index.html.j2")
 
         html_content = template.render(
             location=location,
@@ -185,6 +306,7 @@ def cmd_weather(args: argparse.Namespace) -> None:
         html_file.write_text(html_content, encoding="utf-8")
 
     if not silent:
+        print_stage_timings(stages)
         console.print(
             Panel(
                 f"[bold green]Experience Ready![/bold green]\nOpen: [link=file://{html_file.absolute()}]{html_file}[/link]",
@@ -203,6 +325,8 @@ def cmd_research(args: argparse.Namespace) -> None:
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     output_dir = settings.output_base_dir / f"Research_{sanitized_topic}_{timestamp}"
     output_dir.mkdir(parents=True, exist_ok=True)
+    telemetry.attach(output_dir)
+    renderer = SegmentRenderer(quiet=silent)
 
     if not silent:
         console.print(
@@ -219,9 +343,10 @@ def cmd_research(args: argparse.Namespace) -> None:
     video_file = output_dir / "background_video.mp4"
     html_file = output_dir / "index.html"
 
-    with console.status(
+    with progress_status(
         f"[bold green]Conducting deep research on: {topic}...[/bold green]",
         spinner="dots",
+        silent=silent,
     ) as status:
         if not silent:
             status.update(
@@ -229,13 +354,14 @@ def cmd_research(args: argparse.Namespace) -> None:
             )
 
         run_command(
-            f'{settings.deep_research_cmd} research "{topic}" --output "{context_file}"',
+            tool_argv(settings.deep_research_cmd)
+            + ["research", topic, "--output", context_file],
             quiet=silent,
+            tool="deep-research",
         )
 
         if not context_file.exists():
-            console.print("[red]Deep Research failed to produce output.[/red]")
-            return
+            raise CommandError("Deep Research failed to produce output.")
 
         context_text = context_file.read_text(encoding="utf-8")
 
@@ -243,14 +369,28 @@ def cmd_research(args: argparse.Namespace) -> None:
             status.update(
                 "[bold blue]Scripting and recording documentary...[/bold blue]"
             )
-        tts_cmd = f'cat "{context_file}" | {settings.gen_tts_cmd} --podcast --no-play --audio-format MP3 --output-file "{podcast_file}"'
-        result = subprocess.run(tts_cmd, shell=True, capture_output=True, text=True)
+        result = run_command(
+            tool_argv(settings.gen_tts_cmd)
+            + [
+                "--podcast",
+                "--no-play",
+                "--audio-format",
+                "MP3",
+                "--output-file",
+                podcast_file,
+            ],
+            stdin_file=context_file,
+            capture=True,
+            quiet=True,
+            check=False,
+            tool="gen-tts",
+        )
         if result.returncode != 0:
+            if not podcast_file.exists():
+                raise CommandError(f"Error generating audio: {result.stderr}")
             console.print(
                 f"[bold red]Error generating audio:[/bold red] {result.stderr}"
             )
-            if not podcast_file.exists():
-                return
 
         if not silent:
             console.print(result.stdout)
@@ -270,9 +410,14 @@ def cmd_research(args: argparse.Namespace) -> None:
         if not silent:
             status.update("[bold yellow]Composing original score...[/bold yellow]")
         music_prompt = f"Ambient documentary background music, {topic}, cinematic score"
-        run_command(
-            f'{settings.gen_music_cmd} "{music_prompt}" --output "{music_file}" --format mp3 --duration 30',
+        run_cached(
+            tool_argv(settings.gen_music_cmd)
+            + [music_prompt, "--output", music_file, "--format", "mp3"]
+            + ["--duration", "30"],
+            tool="gen-music",
+            outputs=[music_file],
             quiet=silent,
+            prompt=music_prompt,
         )
 
         if not silent:
@@ -280,10 +425,7 @@ def cmd_research(args: argparse.Namespace) -> None:
         img_prompt = (
             f"Editorial photography of {topic}, cinematic lighting, highly detailed, 8k"
         )
-        run_command(
-            f'{settings.lumina_cmd} --prompt "{img_prompt}" --output-dir "{output_dir}" --filename background_art.png',
-            quiet=silent,
-        )
+        renderer.image(image_file, img_prompt)
 
         has_video = False
         if generate_video:
@@ -293,16 +435,12 @@ def cmd_research(args: argparse.Namespace) -> None:
                 vid_prompt = (
                     f"Cinematic slow motion animation of {topic}, documentary style"
                 )
-                run_command(
-                    f'{settings.vidius_cmd} "{vid_prompt}" -i "{image_file}" -o "{video_file}" -na',
-                    quiet=silent,
-                )
+                renderer.animate(video_file, vid_prompt, image_file, extra_args=["-na"])
                 has_video = video_file.exists()
 
         if not silent:
             status.update("[bold white]Publishing documentary...[/bold white]")
-        env = Environment(loader=FileSystemLoader(Path(__file__).parent / "templates"))
-        template = env.get_template("research.html.j2")
+        template = template_env().get_template("research.html.j2")
         html_content = template.render(
             topic=topic,
             context_text=script_display_text,
@@ -331,6 +469,8 @@ def cmd_news_short(args: argparse.Namespace) -> None:
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     output_dir = settings.output_base_dir / f"Short_{sanitized_topic}_{timestamp}"
     output_dir.mkdir(parents=True, exist_ok=True)
+    telemetry.attach(output_dir)
+    renderer = SegmentRenderer(quiet=silent)
 
     if not silent:
         console.print(
@@ -346,29 +486,36 @@ def cmd_news_short(args: argparse.Namespace) -> None:
     video_file = output_dir / "visual.mp4"
     final_file = output_dir / f"Mirage_Short_{sanitized_topic}.mp4"
 
-    with console.status(
-        f"[bold green]Producing News Short for: {topic}...[/bold green]", spinner="dots"
+    with progress_status(
+        f"[bold green]Producing News Short for: {topic}...[/bold green]",
+        spinner="dots",
+        silent=silent,
     ) as status:
         # 1. Script & Voice
         if not silent:
             status.update("[bold blue]Writing and recording news brief...[/bold blue]")
         # Use pipe pattern with --mode news. Just pass the topic, let the mode handle framing.
+        # Not cached: news mode fetches today's news, which the topic alone
+        # doesn't capture.
         run_command(
-            f'echo "{topic}" | {settings.gen_tts_cmd} --mode news --no-play --audio-format MP3 --output-file "{podcast_file}"',
+            tool_argv(settings.gen_tts_cmd)
+            + ["--mode", "news", "--no-play", "--audio-format", "MP3"]
+            + ["--output-file", podcast_file],
+            input_bytes=f"{topic}\n".encode("utf-8"),
             quiet=silent,
+            outputs=[podcast_file],
+            tool="gen-tts",
         )
 
         if not podcast_file.exists():
-            console.print("[red]Failed to generate voice track.[/red]")
-            return
+            raise CommandError("Failed to generate voice track.")
 
         # 2. Visuals (9:16)
         if not silent:
             status.update("[bold magenta]Capturing vertical visuals...[/bold magenta]")
         img_prompt = f"Vertical 9:16 cinematic b-roll shot of {topic}, atmospheric, hyper-realistic, 8k. No people, no text, no news anchor."
-        run_command(
-            f'{settings.lumina_cmd} --prompt "{img_prompt}" --aspect-ratio 9:16 --negative-prompt "{DEFAULT_NEGATIVE_PROMPT}" --output-dir "{output_dir}" --filename visual.png',
-            quiet=silent,
+        renderer.image(
+            image_file, img_prompt, "9:16", negative_prompt=DEFAULT_NEGATIVE_PROMPT
         )
 
         if not image_file.exists():
@@ -376,26 +523,32 @@ def cmd_news_short(args: argparse.Namespace) -> None:
                 "[yellow]Visual generation failed. creating placeholder.[/yellow]"
             )
             run_command(
-                f'{settings.convert_cmd} -size 1080x1920 xc:darkblue "{image_file}"',
+                tool_argv(settings.convert_cmd)
+                + ["-size", "1080x1920", "xc:darkblue", image_file],
                 quiet=silent,
+                tool="convert",
             )
 
         # 3. Video Animation
         if not silent:
             status.update("[bold cyan]Animating background...[/bold cyan]")
         vid_prompt = f"Cinematic b-roll of {topic}, vertical 9:16, seamless loop, continuous motion"
-        run_command(
-            f'{settings.vidius_cmd} "{vid_prompt}" -i "{image_file}" -o "{video_file}" -ar 9:16 -na',
-            quiet=silent,
+        renderer.animate(
+            video_file, vid_prompt, image_file, aspect_ratio="9:16", extra_args=["-na"]
         )
 
         # 4. Music
         if not silent:
             status.update("[bold yellow]Composing background beat...[/bold yellow]")
         music_prompt = f"Breaking news intro music, high energy, electronic, background for {topic}"
-        run_command(
-            f'{settings.gen_music_cmd} "{music_prompt}" --output "{music_file}" --format mp3 --duration 60',
+        run_cached(
+            tool_argv(settings.gen_music_cmd)
+            + [music_prompt, "--output", music_file, "--format", "mp3"]
+            + ["--duration", "60"],
+            tool="gen-music",
+            outputs=[music_file],
             quiet=silent,
+            prompt=music_prompt,
         )
 
         # 5. Assembly (FFmpeg)
@@ -403,17 +556,45 @@ def cmd_news_short(args: argparse.Namespace) -> None:
             status.update("[bold white]Assembling final video...[/bold white]")
 
         # Get duration of voice to know when to stop
-        duration = get_audio_duration(podcast_file)
+        try:
+            duration = probe(podcast_file).duration
+        except ProbeError as e:
+            raise CommandError(f"Cannot assemble video: {e}") from e
+
+        profile = get_profile(getattr(args, "quality", None))
+        audio_graph = (
+            "[2:a]volume=0.2[music];[1:a][music]amix=inputs=2:duration=first[audio]"
+        )
+        upload = profile.upload_filter()
+        if upload:
+            audio_graph += f";[0:v]{upload}[video]"
 
         cmd_ffmpeg_safe = (
-            f"{settings.ffmpeg_cmd} -y "
-            f'-stream_loop -1 -i "{video_file}" '
-            f'-i "{podcast_file}" '
-            f'-stream_loop -1 -i "{music_file}" '
-            f'-filter_complex "[2:a]volume=0.2[music];[1:a][music]amix=inputs=2:duration=first[audio]" '
-            f'-map 0:v -map "[audio]" '
-            f"-t {duration} "
-            f'-c:v libx264 -pix_fmt yuv420p "{final_file}"'
+            tool_argv(settings.ffmpeg_cmd)
+            + ["-y"]
+            + profile.input_args()
+            + [
+                "-stream_loop",
+                "-1",
+                "-i",
+                video_file,
+                "-i",
+                podcast_file,
+                "-stream_loop",
+                "-1",
+                "-i",
+                music_file,
+                "-filter_complex",
+                audio_graph,
+                "-map",
+                "[video]" if upload else "0:v",
+                "-map",
+                "[audio]",
+                "-t",
+                duration,
+            ]
+            + profile.output_args()
+            + [final_file]
         )
 
         run_command(cmd_ffmpeg_safe, quiet=silent)
@@ -432,11 +613,15 @@ def cmd_deep_news(args: argparse.Namespace) -> None:
     topic = args.topic
     upload_file = args.upload
     silent = args.silent
+    if upload_file and not Path(upload_file).exists():
+        raise CommandError(f"Upload file not found: {upload_file}")
 
     sanitized_topic = topic.replace(" ", "_").replace("/", "-")[:50]
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    output_dir = settings.output_base_dir / f"DeepNews_{sanitized_topic}_{timestamp}"
-    output_dir.mkdir(parents=True, exist_ok=True)
+    output_dir = resolve_output_dir(
+        "DeepNews", sanitized_topic, getattr(args, "resume", None)
+    )
+    manifest = StageManifest(output_dir)
+    renderer = SegmentRenderer(manifest, quiet=silent)
 
     if not silent:
         console.print(
@@ -450,6 +635,8 @@ def cmd_deep_news(args: argparse.Namespace) -> None:
     news_md = output_dir / "news.md"
     news_mp3 = output_dir / "news.mp3"
     news_txt = output_dir / "news.txt"
+    segments_file = output_dir / "segments.json"
+    alignment_file = output_dir / "alignment.json"
     merged_video = output_dir / "Mirage_DeepNews_Final.mp4"
 
     # Default upload logic
@@ -457,157 +644,222 @@ def cmd_deep_news(args: argparse.Namespace) -> None:
         upload_file = "prp.txt"
 
     # 1. Deep Research
-    with console.status(
-        f"[bold green]Researching: {topic}...[/bold green]", spinner="dots"
+    with progress_status(
+        f"[bold green]Researching: {topic}...[/bold green]",
+        spinner="dots",
+        silent=silent,
     ) as status:
         if not silent:
             status.update(f"[bold green]Researching: {topic}...[/bold green]")
 
-        research_cmd = f'{settings.deep_research_cmd} research "Deep Research this:" --output "{news_md}"'
+        research_cmd = tool_argv(settings.deep_research_cmd) + [
+            "research",
+            "Deep Research this:",
+            "--output",
+            news_md,
+        ]
+        upload_path = None
         if upload_file and Path(upload_file).exists():
-            research_cmd += f' --upload "{upload_file}"'
-
-        run_command(research_cmd, quiet=silent)
+            research_cmd += ["--upload", upload_file]
+            upload_path = Path(upload_file)
+
+        skipped = manifest.ensure(
+            "research",
+            hash_inputs(topic, upload_path),
+            [news_md],
+            lambda: run_command(research_cmd, quiet=silent, tool="deep-research"),
+        )
+        if skipped and not silent:
+            console.print("[dim]Resumed: research already complete.[/dim]")
 
         if not news_md.exists():
-            console.print("[red]Deep Research failed to produce output.[/red]")
-            return
+            raise CommandError("Deep Research failed to produce output.")
 
         # 2. Generate Audio & Transcript (gen-tts)
+        # Synthesis runs in the background: planning and the segment visuals
+        # only need the script, which gen-tts writes before the audio is done.
         if not silent:
             status.update("[bold blue]Recording news broadcast...[/bold blue]")
 
+        tts_hash = hash_inputs(news_md)
+        if not manifest.is_complete("tts", tts_hash):
+            # Don't plan from a script left behind by an interrupted run
+            news_txt.unlink(missing_ok=True)
+
         # gen-tts --mode news --input-file news.md --output-file news.mp3 --script-txt-out news.txt
-        run_command(
-            f"{settings.gen_tts_cmd} --mode news "
-            f'--input-file "{news_md}" '
-            f'--output-file "{news_mp3}" '
-            f'--script-txt-out "{news_txt}"',
-            quiet=silent,
+        tts_cancel = threading.Event()
+        tts_pool = ThreadPoolExecutor(max_workers=1)
+        tts_future = tts_pool.submit(
+            telemetry.in_context(manifest.ensure),
+            "tts",
+            tts_hash,
+            [news_mp3, news_txt],
+            lambda: run_cached(
+                tool_argv(settings.gen_tts_cmd)
+                + ["--mode", "news", "--input-file", news_md]
+                + ["--output-file", news_mp3, "--script-txt-out", news_txt],
+                tool="gen-tts",
+                inputs=[news_md],
+                outputs=[news_mp3, news_txt],
+                quiet=silent,
+                cancel=tts_cancel,
+            ),
         )
+        tts_pool.shutdown(wait=False)
 
-        if not news_mp3.exists() or not news_txt.exists():
-            console.print("[red]TTS generation failed (missing mp3 or script).[/red]")
-            return
+        jobs = getattr(args, "jobs", None) or settings.max_jobs
 
-        # 3. Planning (Break script into visual segments)
-        if not silent:
-            status.update("[bold blue]Planning visual segments...[/bold blue]")
+        def plan_and_render() -> Tuple[List[Dict[str, str]], List[Optional[Path]]]:
+            # 3. Planning (Break script into visual segments)
+            if not silent:
+                status.update("[bold blue]Planning visual segments...[/bold blue]")
 
-        script_content = news_txt.read_text(encoding="utf-8")
+            script_content = news_txt.read_text(encoding="utf-8")
+            plan_hash = hash_inputs(news_txt)
 
-        try:
-            segments = planner.generate_news_plan(script_content)
-        except Exception as e:
-            console.print(f"[red]Planning failed: {e}[/red]")
-            return
-
-        if not segments:
-            console.print("[red]No news segments generated.[/red]")
-            return
+            if manifest.is_complete("plan", plan_hash):
+                segments = load_segments(segments_file)
+            else:
+                try:
+                    segments = planner.generate_news_plan(script_content)
+                except Exception as e:
+                    raise CommandError(f"Planning failed: {e}") from e
+                if segments:
+                    segments_file.write_text(json.dumps(segments, indent=4))
+                    manifest.record("plan", plan_hash, [segments_file])
 
-        if not silent:
-            console.print(f"[cyan]Generated {len(segments)} news segments.[/cyan]")
+            if not segments:
+                return [], []
 
-        # 4. Calculate Timings
-        total_audio_duration = get_duration(news_mp3)
-        total_chars = len(script_content)
-        # Avoid division by zero
-        if total_chars == 0:
-            total_chars = 1
+            if not silent:
+                console.print(f"[cyan]Generated {len(segments)} news segments.[/cyan]")
+
+            # 4. Generate Visuals per Segment (bounded worker pool)
+            def render_segment(item: Tuple[int, Dict[str, str]]) -> Optional[Path]:
+                i, segment = item
+                part_num = i + 1
+                vis_prompt = segment.get("visual_prompt", f"News visual for {topic}")
+
+                # Enhance & Sanitize Prompt
+                vis_prompt += ", 8k resolution, photorealistic, cinematic lighting"
+                vis_prompt = vis_prompt.replace('"', "'")
+
+                return renderer.image(
+                    output_dir / f"seg_{part_num}.png",
+                    vis_prompt,
+                    "16:9",
+                    negative_prompt=DEFAULT_NEGATIVE_PROMPT,
+                    stage=f"segment_{part_num}",
+                    placeholder="1920x1080",
+                )
 
-        time_per_char = total_audio_duration / total_chars
+            def report_progress(completed: int, total: int) -> None:
+                if not silent:
+                    status.update(
+                        f"[bold cyan]Rendered Segment {completed}/{total} ({jobs} workers)...[/bold cyan]"
+                    )
 
-        if not silent:
-            console.print(
-                f"[green]Audio: {total_audio_duration:.2f}s, Script: {total_chars} chars[/green]"
+            if not silent:
+                status.update(
+                    f"[bold cyan]Rendering {len(segments)} segments ({jobs} workers)...[/bold cyan]"
+                )
+            images = run_ordered(
+                render_segment, list(enumerate(segments)), jobs, report_progress
             )
+            return segments, images
 
-        video_parts = []
-
-        # 5. Generate Media per Segment
-        for i, segment in enumerate(segments):
-            part_num = i + 1
-            narration = segment.get("narration", "")
-            vis_prompt = segment.get("visual_prompt", f"News visual for {topic}")
-
-            # Enhance & Sanitize Prompt
-            vis_prompt += ", 8k resolution, photorealistic, cinematic lighting"
-            vis_prompt = vis_prompt.replace('"', "'")
-
-            # Calculate duration for this segment
-            seg_len = len(narration)
-            seg_duration = seg_len * time_per_char
-
-            # Minimum duration safety (0.5s)
-            if seg_duration < 0.5:
-                seg_duration = 0.5
-
+        try:
+            wait_for_stable_file(news_txt, tts_future.done, settings.tts_script_settle)
+            if not news_txt.exists():
+                tts_future.result()
+                raise CommandError("TTS generation failed (missing script).")
+
+            segments, images = plan_and_render()
+        except BaseException:
+            # Stop the recording rather than leave it running behind the
+            # error (and into the next job under `mirage batch`)
+            tts_cancel.set()
+            futures_wait([tts_future])
+            raise
+
+        # 5. Wait for the broadcast audio
+        if not tts_future.done() and not silent:
+            status.update("[bold blue]Waiting for broadcast audio...[/bold blue]")
+        skipped = tts_future.result()
+        if skipped and not silent:
+            console.print("[dim]Resumed: broadcast audio already recorded.[/dim]")
+
+        # The script we planned from must be the one that was voiced
+        if segments and not manifest.is_complete("plan", hash_inputs(news_txt)):
             if not silent:
-                status.update(
-                    f"[bold cyan]Processing Segment {part_num}/{len(segments)}...[/bold cyan]"
+                console.print(
+                    "[yellow]Script changed while recording; re-planning.[/yellow]"
                 )
+            segments, images = plan_and_render()
 
-            seg_image = output_dir / f"seg_{part_num}.png"
-            seg_video = output_dir / f"seg_{part_num}.mp4"
+        if not news_mp3.exists() or not news_txt.exists():
+            raise CommandError("TTS generation failed (missing mp3 or script).")
 
-            # A. Visual
-            run_command(
-                f'{settings.lumina_cmd} --prompt "{vis_prompt}" --aspect-ratio 16:9 --negative-prompt "{DEFAULT_NEGATIVE_PROMPT}" --output-dir "{output_dir}" --filename "seg_{part_num}.png"',
-                quiet=silent,
-            )
+        if not segments:
+            raise CommandError("No news segments generated.")
 
-            if not seg_image.exists():
-                run_command(
-                    f'{settings.convert_cmd} -size 1920x1080 xc:black "{seg_image}"',
-                    quiet=True,
-                )
+        # 6. Align segments to the pauses in the narration
+        if not silent:
+            status.update("[bold blue]Aligning segments to narration...[/bold blue]")
 
-            # B. Create Silent Clip with Fade
-            fade_len = 0.5
-            # Ensure fade out doesn't start before fade in ends if clip is very short
-            start_fade_out = max(0, seg_duration - fade_len)
+        try:
+            total_audio_duration = probe(news_mp3).duration
+        except ProbeError as e:
+            raise CommandError(f"Cannot read broadcast audio: {e}") from e
+        align_hash = hash_inputs(news_mp3, segments_file)
+        if manifest.is_complete("align", align_hash):
+            timings = load_timings(alignment_file)
+        else:
+            try:
+                silences = detect_silences(news_mp3)
+            except subprocess.CalledProcessError:
+                silences = []
+            timings = align_segments(
+                [s.get("narration", "") for s in segments],
+                total_audio_duration,
+                silences,
+            )
+            save_timings(alignment_file, timings)
+            manifest.record("align", align_hash, [alignment_file])
 
-            cmd_clip = (
-                f'{settings.ffmpeg_cmd} -y -loop 1 -i "{seg_image}" '
-                f'-vf "fade=t=in:st=0:d={fade_len},fade=t=out:st={start_fade_out}:d={fade_len}" '
-                f"-c:v libx264 -tune stillimage -pix_fmt yuv420p "
-                f'-t {seg_duration} "{seg_video}"'
+        if not silent:
+            console.print(
+                f"[green]Audio: {total_audio_duration:.2f}s, aligned {len(timings)} segments[/green]"
             )
-            run_command(cmd_clip, quiet=silent)
 
-            if seg_video.exists():
-                video_parts.append(seg_video)
+        # Minimum duration safety (0.5s)
+        slides = [
+            Slide(image, max(timing.duration, 0.5))
+            for image, timing in zip(images, timings)
+            if image is not None
+        ]
 
-        # 6. Concatenate & Merge
-        if not video_parts:
-            console.print("[red]No video parts generated.[/red]")
-            return
+        # 7. Render slideshow & mux audio in one encode
+        if not slides:
+            raise CommandError("No video parts generated.")
 
         if not silent:
             status.update("[bold white]Assembling final broadcast...[/bold white]")
 
-        concat_list_file = output_dir / "concat_list.txt"
-        silent_concat_mp4 = output_dir / "silent_concat.mp4"
-
-        with open(concat_list_file, "w") as f:
-            for p in video_parts:
-                f.write(f"file '{p.name}'\n")
-
-        # Concat Silent Video
-        run_command(
-            f'{settings.ffmpeg_cmd} -y -f concat -safe 0 -i "{concat_list_file}" -c copy "{silent_concat_mp4}"',
-            quiet=silent,
+        profile = get_profile(getattr(args, "quality", None))
+        assemble_hash = hash_inputs(
+            profile.name,
+            news_mp3,
+            *[x for s in slides for x in (s.image, round(s.duration, 3))],
         )
-
-        # Merge with Audio (Shortest wins to prevent silence at end or cutoff)
-        # Usually audio is master, so we might loop last frame if video is too short,
-        # but 'heuristic' timing should be close. '-shortest' is safe.
-        cmd_merge = (
-            f'{settings.ffmpeg_cmd} -y -i "{silent_concat_mp4}" -i "{news_mp3}" '
-            f'-c:v copy -c:a copy -shortest "{merged_video}"'
+        manifest.ensure(
+            "assemble",
+            assemble_hash,
+            [merged_video],
+            lambda: render_slideshow(
+                slides, merged_video, audio=news_mp3, quiet=silent, profile=profile
+            ),
         )
-        run_command(cmd_merge, quiet=silent)
 
     if not silent:
         console.print(
@@ -621,17 +873,25 @@ def cmd_deep_news(args: argparse.Namespace) -> None:
 def cmd_character(args: argparse.Namespace) -> None:
     """Manages the Character Library."""
     action = args.action
-    lib_dir = settings.character_library_dir
+    characters = CharacterRepository()
+    lib_dir = characters.library_dir
     lib_dir.mkdir(parents=True, exist_ok=True)
 
+    if args.name and characters.is_reserved(args.name):
+        console.print(f"[red]Error: '{args.name}' is a reserved name.[/red]")
+        return
+
     if action == "list":
-        chars = sorted(lib_dir.glob("*.png"))
-        if not chars:
+        names = characters.names()
+        if not names:
             console.print("[yellow]Library is empty.[/yellow]")
         else:
             console.print("[bold green]Character Library:[/bold green]")
-            for c in chars:
-                console.print(f"  - {c.stem}")
+            index = characters.index()
+            for name in names:
+                c = index[name]
+                size = f" [dim]({c.width}x{c.height})[/dim]" if c.width else ""
+                console.print(f"  - {name}{size}")
 
     elif action == "add":
         if not args.name or not args.image:
@@ -641,32 +901,31 @@ def cmd_character(args: argparse.Namespace) -> None:
         if not src.exists():
             console.print(f"[red]Error: Image not found: {src}[/red]")
             return
-        dest = lib_dir / f"{args.name}.png"
-        shutil.copy(src, dest)
 
-        # Save Metadata
         meta = {
             "description": args.description
             if args.description
             else f"Character: {args.name}",
-            "voice_prompt": args.voice if args.voice else "Neutral narrator voice",
+            "voice_prompt": args.voice if args.voice else DEFAULT_VOICE_PROMPT,
         }
-        meta_file = lib_dir / f"{args.name}.json"
-        with open(meta_file, "w") as f:
-            json.dump(meta, f, indent=4)
+        characters.add(args.name, src, meta)
 
         console.print(f"[green]Added character '{args.name}' to library.[/green]")
 
+    elif action == "reindex":
+        names = characters.reindex([args.name] if args.name else None)
+        if args.name and not names:
+            console.print(f"[yellow]Character '{args.name}' not found.[/yellow]")
+        else:
+            console.print(
+                f"[green]Re-rendered images for {len(names)} character(s).[/green]"
+            )
+
     elif action == "remove":
         if not args.name:
             console.print("[red]Error: --name required for remove.[/red]")
             return
-        dest = lib_dir / f"{args.name}.png"
-        meta_file = lib_dir / f"{args.name}.json"
-        if dest.exists():
-            dest.unlink()
-            if meta_file.exists():
-                meta_file.unlink()
+        if characters.remove(args.name):
             console.print(f"[green]Removed character '{args.name}'.[/green]")
         else:
             console.print(f"[yellow]Character '{args.name}' not found.[/yellow]")
@@ -676,7 +935,7 @@ def cmd_character(args: argparse.Namespace) -> None:
             console.print("[red]Error: --name and --prompt required for create.[/red]")
             return
 
-        dest = lib_dir / f"{args.name}.png"
+        dest = characters.image_path(args.name)
         if dest.exists():
             console.print(
                 f"[yellow]Character '{args.name}' already exists. Overwriting...[/yellow]"
@@ -689,19 +948,19 @@ def cmd_character(args: argparse.Namespace) -> None:
 
         # Run lumina
         run_command(
-            f'{settings.lumina_cmd} --prompt "{lumina_prompt}" --aspect-ratio 9:16 --output-dir "{lib_dir}" --filename "{args.name}.png"'
+            tool_argv(settings.lumina_cmd)
+            + ["--prompt", lumina_prompt, "--aspect-ratio", "9:16"]
+            + ["--output-dir", lib_dir, "--filename", dest.name],
+            tool="lumina",
         )
 
         # Save Metadata
         meta = {
             "description": args.prompt,
-            "voice_prompt": args.voice if args.voice else "Neutral narrator voice",
+            "voice_prompt": args.voice if args.voice else DEFAULT_VOICE_PROMPT,
         }
-        meta_file = lib_dir / f"{args.name}.json"
-        with open(meta_file, "w") as f:
-            json.dump(meta, f, indent=4)
-
         if dest.exists():
+            characters.register(args.name, meta)
             console.print(
                 f"[green]Character '{args.name}' created successfully.[/green]"
             )
@@ -709,6 +968,182 @@ def cmd_character(args: argparse.Namespace) -> None:
             console.print("[red]Failed to create character.[/red]")
 
 
+def cmd_cache(args: argparse.Namespace) -> None:
+    """Inspects or prunes the artifact cache."""
+    if args.action == "stats":
+        stats = artifact_cache.stats()
+        console.print("[bold green]Artifact Cache:[/bold green]")
+        console.print(f"  Location: {artifact_cache.root}")
+        console.print(f"  Entries:  {stats.entries}")
+        console.print(
+            f"  Size:     {stats.total_bytes / 1024 / 1024:.1f} MB / {stats.max_bytes / 1024 / 1024:.0f} MB"
+        )
+
+    elif args.action == "prune":
+        limit = None if args.max_size is None else args.max_size * 1024 * 1024
+        removed = artifact_cache.prune(limit)
+        console.print(f"[green]Pruned {removed} cache entries.[/green]")
+
+
+def cmd_stats(args: argparse.Namespace) -> None:
+    """Aggregates the timings.jsonl of past runs into per-stage percentiles."""
+    root = Path(args.dir).expanduser() if args.dir else settings.output_base_dir
+    records = telemetry.load_records(sorted(root.glob(f"*/{telemetry.TIMINGS_NAME}")))
+    if args.command_filter:
+        records = [r for r in records if r.get("command") == args.command_filter]
+    if args.kind:
+        records = [r for r in records if r.get("kind") == args.kind]
+    if not records:
+        console.print(f"[yellow]No timings found under {root}.[/yellow]")
+        return
+
+    runs = len({r.get("run") for r in records})
+    table = Table(title=f"Mirage Timings ({runs} runs)", header_style="bold")
+    table.add_column("Kind")
+    table.add_column("Name")
+    table.add_column("Count", justify="right")
+    table.add_column("p50", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("CPU p50", justify="right")
+    table.add_column("Peak RSS", justify="right")
+    table.add_column("Failed", justify="right")
+    for row in telemetry.aggregate(records):
+        cpu = f"{row['cpu_p50']:.2f}s" if row["cpu_p50"] is not None else "-"
+        rss = f"{row['max_rss_kb'] / 1024:.0f} MB" if row["max_rss_kb"] else "-"
+        failed = f"[red]{row['failures']}[/red]" if row["failures"] else "0"
+        table.add_row(
+            row["kind"],
+            row["name"],
+            str(row["count"]),
+            f"{row['p50']:.2f}s",
+            f"{row['p95']:.2f}s",
+            cpu,
+            rss,
+            failed,
+        )
+    console.print(table)
+
+
+def run_job_argv(argv: List[str]) -> None:
+    """Runs one queued job inside a daemon worker."""
+    args = build_parser().parse_args(argv)
+    args.background = False
+    try:
+        with telemetry.run(args.command):
+            args.func(args)
+    except CommandError as e:
+        console.print(f"[bold red]Error:[/bold red] {e}")
+        sys.exit(1)
+
+
+def submit_job(argv: List[str]) -> Optional[int]:
+    """Validates a job's arguments and queues it. Returns the job id."""
+    if not argv or argv[0] not in batch.BATCH_COMMANDS:
+        console.print(
+            f"[red]Error: Jobs must be one of: {', '.join(batch.BATCH_COMMANDS)}[/red]"
+        )
+        return None
+    try:
+        build_parser().parse_args(argv)
+    except SystemExit:
+        # argparse already printed the usage error
+        return None
+    job_id = daemon.JobStore().submit(argv)
+    console.print(f"[green]Submitted job {job_id}:[/green] {' '.join(argv)}")
+    if not daemon.is_running():
+        console.print(
+            "[yellow]No daemon is running; start one with 'mirage daemon'.[/yellow]"
+        )
+    return job_id
+
+
+def cmd_daemon(args: argparse.Namespace) -> None:
+    """Runs the job daemon (foreground unless --detach)."""
+    store = daemon.JobStore()
+    if daemon.is_running(store.root):
+        console.print("[yellow]A mirage daemon is already running.[/yellow]")
+        return
+    if args.detach:
+        log_path = settings.daemon_dir / "daemon.log"
+        pid = os.fork()
+        if pid > 0:
+            console.print(f"[green]Mirage daemon started (pid {pid}).[/green]")
+            console.print(f"Logs: [bold]{log_path}[/bold]")
+            return
+        os.setsid()
+        log_fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+        os.dup2(log_fd, 1)
+        os.dup2(log_fd, 2)
+    try:
+        daemon.Daemon(store, run_job_argv, args.workers).serve()
+    except RuntimeError as e:
+        console.print(f"[red]{e}[/red]")
+
+
+def cmd_submit(args: argparse.Namespace) -> None:
+    """Queues a job for the daemon and returns immediately."""
+    argv = [a for a in args.job if a not in ("-b", "--background")]
+    if submit_job(argv) is None:
+        sys.exit(2)
+
+
+def cmd_status(args: argparse.Namespace) -> None:
+    """Shows daemon jobs."""
+    store = daemon.JobStore()
+    jobs = [store.get(args.job)] if args.job else store.jobs(limit=args.limit)
+    jobs = [j for j in jobs if j is not None]
+    if not jobs:
+        console.print("[yellow]No jobs found.[/yellow]")
+        return
+
+    running = "running" if daemon.is_running(store.root) else "not running"
+    table = Table(title=f"Mirage Jobs (daemon {running})", header_style="bold")
+    table.add_column("#", justify="right")
+    table.add_column("Job")
+    table.add_column("State")
+    table.add_column("Time", justify="right")
+    colors = {"done": "green", "failed": "red", "running": "cyan"}
+    for job in jobs:
+        state = f"[{colors.get(job.state, 'yellow')}]{job.state}[/]"
+        duration = f"{job.duration:.1f}s" if job.duration is not None else "-"
+        table.add_row(str(job.id), job.label, state, duration)
+    console.print(table)
+
+
+def cmd_cancel(args: argparse.Namespace) -> None:
+    """Cancels a queued or running daemon job."""
+    state = daemon.JobStore().cancel(args.job)
+    if state is None:
+        console.print(f"[red]Job {args.job} not found.[/red]")
+    elif state in (daemon.CANCELLED, daemon.CANCELLING):
+        console.print(f"[green]Job {args.job} {state}.[/green]")
+    else:
+        console.print(f"[yellow]Job {args.job} already {state}.[/yellow]")
+
+
+def cmd_logs(args: argparse.Namespace) -> None:
+    """Prints (or follows) a daemon job's log."""
+    store = daemon.JobStore()
+    if store.get(args.job) is None:
+        console.print(f"[red]Job {args.job} not found.[/red]")
+        return
+    log_path = store.log_path(args.job)
+    offset = 0
+    while True:
+        if log_path.exists():
+            with open(log_path, "r", errors="replace") as f:
+                f.seek(offset)
+                chunk = f.read()
+                offset = f.tell()
+            sys.stdout.write(chunk)
+            sys.stdout.flush()
+        job = store.get(args.job)
+        if not args.follow or job is None or job.state in daemon.FINISHED:
+            break
+        time.sleep(settings.daemon_poll_interval)
+
+
 def cmd_story(args: argparse.Namespace) -> None:
     """Generates a Multi-Part Story Video for Shorts."""
     topic = args.topic
@@ -725,9 +1160,10 @@ def cmd_story(args: argparse.Namespace) -> None:
     ar_prefix = "Story_Cinema" if is_cinema else "Story"
 
     sanitized_topic = topic.replace(" ", "_").replace("/", "-")[:50]
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    output_dir = settings.output_base_dir / f"{ar_prefix}_{sanitized_topic}_{timestamp}"
-    output_dir.mkdir(parents=True, exist_ok=True)
+    output_dir = resolve_output_dir(
+        ar_prefix, sanitized_topic, getattr(args, "resume", None)
+    )
+    manifest = StageManifest(output_dir)
 
     if not silent:
         mode_str = "Cinema Mode (16:9)" if is_cinema else "Portrait Mode (9:16)"
@@ -741,42 +1177,21 @@ def cmd_story(args: argparse.Namespace) -> None:
     # Files
     script_file = output_dir / "script.txt"
     base_image = output_dir / "base_char.png"
+    segments_file = output_dir / "segments.json"
     merged_video = output_dir / "Mirage_Story_Final.mp4"
 
-    # Character Metadata Loading
-    character_meta = {
-        "description": character_name if character_name else "The character",
-        "voice_prompt": "Neutral narrator voice",
-    }
-
-    if character_name:
-        lib_dir = settings.character_library_dir
-        meta_file = lib_dir / f"{character_name}.json"
-        if meta_file.exists():
-            try:
-                with open(meta_file, "r") as f:
-                    meta = json.load(f)
-                    character_meta.update(meta)
-                if not silent:
-                    console.print(
-                        f"[green]Loaded metadata for {character_name}[/green]"
-                    )
-            except Exception:
-                console.print(
-                    "[yellow]Warning: Failed to load character metadata.[/yellow]"
-                )
+    characters = CharacterRepository()
+    renderer = SegmentRenderer(manifest, quiet=silent)
+    character_meta = characters.metadata(character_name, quiet=silent)
 
     # 1. Casting Character (Move to Start)
     if not silent:
         console.print("[bold magenta]Casting character...[/bold magenta]")
 
-    char_lib_path = settings.character_library_dir / f"{character_name}.png"
-
-    # Note: If library image exists, we use it regardless of AR.
-    # User is responsible for providing 16:9 image for cinema mode if they want perfect fit,
-    # otherwise Vidius might crop or pad.
-    if character_name and char_lib_path.exists():
-        shutil.copy(char_lib_path, base_image)
+    # Library characters come pre-framed for each aspect ratio (see
+    # settings.character_variants), so Vidius never has to crop or pad.
+    cast = characters.cast(character_name, base_image, ar_val)
+    if cast is not None:
         if not silent:
             console.print(
                 f"[green]Using character from library: {character_name}[/green]"
@@ -787,29 +1202,38 @@ def cmd_story(args: argparse.Namespace) -> None:
         char_prompt = (
             f"{ar_lumina_desc} of {char_desc}, highly detailed, cinematic lighting, 8k"
         )
-        run_command(
-            f'{settings.lumina_cmd} --prompt "{char_prompt}" --aspect-ratio {ar_val} --output-dir "{output_dir}" --filename base_char.png',
-            quiet=silent,
-        )
+        renderer.image(base_image, char_prompt, ar_val, stage="cast")
 
-    with console.status(
-        "[bold green]Dreaming story with Gemini 3.0...[/bold green]", spinner="dots"
+    with progress_status(
+        "[bold green]Dreaming story with Gemini 3.0...[/bold green]",
+        spinner="dots",
+        silent=silent,
     ) as status:
         # 2. Generate Story Plan via Planner (Pass Image)
         if not silent:
             status.update("[bold blue]Consulting the Planner...[/bold blue]")
 
-        try:
-            segments = planner.generate_story_plan(
-                topic, character_meta, image_path=base_image
-            )
-        except Exception as e:
-            console.print(f"[red]Planning failed: {e}[/red]")
-            return
+        plan_hash = hash_inputs(
+            topic, json.dumps(character_meta, sort_keys=True), base_image
+        )
+        if manifest.is_complete("plan", plan_hash):
+            segments = load_segments(segments_file)
+        else:
+            try:
+                segments = planner.generate_story_plan(
+                    topic,
+                    character_meta,
+                    image_path=base_image,
+                    image=(cast.mime_type, cast.image_b64) if cast else None,
+                )
+            except Exception as e:
+                raise CommandError(f"Planning failed: {e}") from e
+            if segments:
+                segments_file.write_text(json.dumps(segments, indent=4))
+                manifest.record("plan", plan_hash, [segments_file])
 
         if not segments:
-            console.print("[red]No story segments generated.[/red]")
-            return
+            raise CommandError("No story segments generated.")
 
         # Save script for reference
         full_script = "\n\n".join([s.get("narration", "") for s in segments])
@@ -818,19 +1242,16 @@ def cmd_story(args: argparse.Namespace) -> None:
         if not silent:
             console.print(f"[cyan]Generated {len(segments)} story segments.[/cyan]")
 
-        video_parts = []
+        # 3. Animate segments concurrently. Every part renders from base_image,
+        # so the Vidius jobs are independent of each other.
+        jobs = getattr(args, "jobs", None) or settings.vidius_concurrency
 
-        # 3. Loop Generation (Iterate through segments)
-        for i, segment in enumerate(segments):
+        def animate_part(item: Tuple[int, Dict[str, str]]) -> Tuple[int, Path]:
+            i, segment = item
             part_num = i + 1
             narration = segment.get("narration", "")
             voice_dir = segment.get("voice_direction", character_meta["voice_prompt"])
 
-            if not silent:
-                status.update(
-                    f"[bold cyan]Animating Part {part_num}/{len(segments)}...[/bold cyan]"
-                )
-
             part_video = output_dir / f"part{part_num}.mp4"
             clean_text = narration.replace("'", "").replace('"', "")
 
@@ -838,63 +1259,45 @@ def cmd_story(args: argparse.Namespace) -> None:
             vid_prompt = f"Static camera, fixed shot. Seamless loop. The character is speaking the following line with {voice_dir} tone: '{clean_text}'. {ar_vidius_suffix}"
 
             # Always use base_image to prevent drift and safety violations
-            run_command(
-                f'{settings.vidius_cmd} "{vid_prompt}" -i "{base_image}" -o "{part_video}" -ar {ar_val} -np "zooming, camera movement, blur, dolly, pan, tilt, dynamic camera"',
-                quiet=silent,
+            renderer.animate(
+                part_video,
+                vid_prompt,
+                base_image,
+                aspect_ratio=ar_val,
+                negative_prompt=VIDIUS_STATIC_NEGATIVE,
+                stage=f"part_{part_num}",
             )
-            video_parts.append(part_video)
+            return part_num, part_video
+
+        def report_progress(completed: int, total: int) -> None:
+            if not silent:
+                status.update(
+                    f"[bold cyan]Animated Part {completed}/{total} ({jobs} concurrent)...[/bold cyan]"
+                )
 
-        # 4. Stitch Videos (XFade Filtergraph)
         if not silent:
             status.update(
-                "[bold white]Stitching video segments with crossfade...[/bold white]"
+                f"[bold cyan]Animating {len(segments)} parts ({jobs} concurrent)...[/bold cyan]"
             )
+        parts = run_ordered(
+            animate_part, list(enumerate(segments)), jobs, report_progress
+        )
+        video_parts = [video for _, video in sorted(parts)]
 
-        durations = [get_duration(v) for v in video_parts]
-        fade_duration = 0.1
-
-        inputs = ""
-        for v in video_parts:
-            inputs += f'-i "{v}" '
-
-        v_accum = "0:v"
-        a_accum = "0:a"
-        offset = 0.0
-
-        video_filters = []
-        audio_filters = []
-
-        for i in range(1, len(video_parts)):
-            prev_dur = durations[i - 1]
-            offset += prev_dur - fade_duration
-
-            v_next = f"{i}:v"
-            v_out = f"v{i}"
-            video_filters.append(
-                f"[{v_accum}][{v_next}]xfade=transition=fade:duration={fade_duration}:offset={offset}[{v_out}]"
-            )
-            v_accum = v_out
-
-            a_next = f"{i}:a"
-            a_out = f"a{i}"
-            audio_filters.append(
-                f"[{a_accum}][{a_next}]acrossfade=d={fade_duration}:c1=tri:c2=tri[{a_out}]"
-            )
-            a_accum = a_out
-
-        filter_complex = ";".join(video_filters + audio_filters)
-
-        if len(video_parts) == 1:
-            cmd_stitch = f'{settings.ffmpeg_cmd} -y -i "{video_parts[0]}" -c copy "{merged_video}"'
-        else:
-            cmd_stitch = (
-                f"{settings.ffmpeg_cmd} -y {inputs} "
-                f'-filter_complex "{filter_complex}" '
-                f'-map "[{v_accum}]" -map "[{a_accum}]" '
-                f'-c:v libx264 -pix_fmt yuv420p "{merged_video}"'
-            )
+        # 4. Stitch Videos (stream copy where possible)
+        crossfade = not getattr(args, "no_crossfade", False)
+        if not silent:
+            status.update("[bold white]Stitching video segments...[/bold white]")
 
-        run_command(cmd_stitch, quiet=silent)
+        stitcher = Stitcher(
+            get_profile(getattr(args, "quality", None)),
+            crossfade=crossfade,
+            quiet=silent,
+        )
+        try:
+            stitcher.stitch(video_parts, merged_video, manifest)
+        except ProbeError as e:
+            raise CommandError(f"Cannot stitch video parts: {e}") from e
 
     if not silent:
         console.print(
@@ -921,6 +1324,7 @@ def cmd_summary(args: argparse.Namespace) -> None:
     timestamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     output_dir = settings.output_base_dir / f"{ar_prefix}_{sanitized_topic}_{timestamp}"
     output_dir.mkdir(parents=True, exist_ok=True)
+    telemetry.attach(output_dir)
 
     if not silent:
         mode_str = "Cinema Mode (16:9)" if is_cinema else "Portrait Mode (9:16)"
@@ -937,63 +1341,49 @@ def cmd_summary(args: argparse.Namespace) -> None:
     base_image = output_dir / "base_char.png"
     merged_video = output_dir / "Mirage_Summary_Final.mp4"
 
-    # Character Metadata Loading
-    character_meta = {
-        "description": character_name if character_name else "The character",
-        "voice_prompt": "Neutral narrator voice",
-    }
-
-    if character_name:
-        lib_dir = settings.character_library_dir
-        meta_file = lib_dir / f"{character_name}.json"
-        if meta_file.exists():
-            try:
-                with open(meta_file, "r") as f:
-                    meta = json.load(f)
-                    character_meta.update(meta)
-                if not silent:
-                    console.print(
-                        f"[green]Loaded metadata for {character_name}[/green]"
-                    )
-            except Exception:
-                console.print(
-                    "[yellow]Warning: Failed to load character metadata.[/yellow]"
-                )
+    characters = CharacterRepository()
+    renderer = SegmentRenderer(quiet=silent)
+    character_meta = characters.metadata(character_name, quiet=silent)
 
     # Casting Character
     if not silent:
         console.print("[bold magenta]Casting character...[/bold magenta]")
 
-    char_lib_path = settings.character_library_dir / f"{character_name}.png"
-
-    if character_name and char_lib_path.exists():
-        shutil.copy(char_lib_path, base_image)
+    if characters.cast(character_name, base_image, ar_val) is not None:
         if not silent:
             console.print(
                 f"[green]Using character from library: {character_name}[/green]"
             )
     else:
-        console.print(
-            "[red]Character not found in library. Please use 'mirage character add' first.[/red]"
+        raise CommandError(
+            "Character not found in library. Please use 'mirage character add' first."
         )
-        return
 
     # 1. Research
-    with console.status(
-        f"[bold green]Researching: {topic}...[/bold green]", spinner="dots"
+    with progress_status(
+        f"[bold green]Researching: {topic}...[/bold green]",
+        spinner="dots",
+        silent=silent,
     ) as status:
         if not silent:
             status.update(f"[bold green]Researching: {topic}...[/bold green]")
         run_command(
-            f'{settings.deep_research_cmd} research "{topic}" --output "{context_file}"',
+            tool_argv(settings.deep_research_cmd)
+            + ["research", topic, "--output", context_file],
             quiet=silent,
+            tool="deep-research",
         )
 
         # 2. Summary
         if not silent:
             status.update("[bold blue]Generating summary script...[/bold blue]")
-        run_command(
-            f'cat "{context_file}" | {settings.gen_tts_cmd} --mode summary --script-txt-out "{script_file}" --no-play',
+        run_cached(
+            tool_argv(settings.gen_tts_cmd)
+            + ["--mode", "summary", "--script-txt-out", script_file, "--no-play"],
+            stdin_file=context_file,
+            tool="gen-tts",
+            inputs=[context_file],
+            outputs=[script_file],
             quiet=silent,
         )
 
@@ -1024,14 +1414,16 @@ def cmd_summary(args: argparse.Namespace) -> None:
         if not silent:
             console.print(f"[cyan]Generated {len(segments)} segments.[/cyan]")
 
-        # 4. Animation Loop
-        video_parts = []
+        # 4. Animation (concurrent). A-roll renders from base_image and B-roll
+        # from its own image, so parts never depend on each other.
+        jobs = getattr(args, "jobs", None) or settings.vidius_concurrency
+        voice_dir = character_meta["voice_prompt"]
 
-        for i, segment in enumerate(segments):
+        def animate_part(item: Tuple[int, Dict[str, str]]) -> Tuple[int, Path]:
+            i, segment = item
             part_num = i + 1
             narration = segment.get("narration", "")
             visual_desc = segment.get("visual_prompt", "")
-            voice_dir = character_meta["voice_prompt"]
 
             # Determine A/B Roll: Even=A (Character), Odd=B (Visual)
             # Only do B-roll if we are in Cinema mode
@@ -1040,90 +1432,63 @@ def cmd_summary(args: argparse.Namespace) -> None:
             part_video = output_dir / f"part{part_num}.mp4"
             clean_text = narration.replace("'", "").replace('"', "")
 
-            if not silent:
-                mode_label = "B-Roll" if is_b_roll else "A-Roll"
-                status.update(
-                    f"[bold cyan]Animating Part {part_num}/{len(segments)} ({mode_label})...[/bold cyan]"
-                )
-
             if is_b_roll:
                 # B-Roll: Generate Image -> Video with VO
-                b_roll_img = output_dir / f"b_roll_{part_num}.png"
-                run_command(
-                    f'{settings.lumina_cmd} --prompt "Cinematic 16:9 shot of {visual_desc}, photorealistic, 8k" --aspect-ratio 16:9 --output-dir "{output_dir}" --filename "b_roll_{part_num}.png"',
-                    quiet=silent,
+                b_roll_prompt = (
+                    f"Cinematic 16:9 shot of {visual_desc}, photorealistic, 8k"
                 )
-
-                input_img = b_roll_img if b_roll_img.exists() else base_image
+                b_roll_img = renderer.image(
+                    output_dir / f"b_roll_{part_num}.png", b_roll_prompt, "16:9"
+                )
+                input_img = b_roll_img or base_image
 
                 # Vidius VO Prompt
                 vid_prompt = f"Cinematic shot of {visual_desc}. Voiceover ({voice_dir}): '{clean_text}'. Slow pan."
-                run_command(
-                    f'{settings.vidius_cmd} "{vid_prompt}" -i "{input_img}" -o "{part_video}" -ar 16:9',
-                    quiet=silent,
-                )
+                renderer.animate(part_video, vid_prompt, input_img, aspect_ratio="16:9")
 
             else:
                 # A-Roll: Character
                 vid_prompt = f"Static camera, fixed shot. Seamless loop. The character is speaking the following line with {voice_dir} tone: '{clean_text}'. {ar_vidius_suffix}"
 
                 # Always use base_image to prevent drift
-                run_command(
-                    f'{settings.vidius_cmd} "{vid_prompt}" -i "{base_image}" -o "{part_video}" -ar {ar_val} -np "zooming, camera movement, blur, dolly, pan, tilt, dynamic camera"',
-                    quiet=silent,
+                renderer.animate(
+                    part_video,
+                    vid_prompt,
+                    base_image,
+                    aspect_ratio=ar_val,
+                    negative_prompt=VIDIUS_STATIC_NEGATIVE,
                 )
 
-            video_parts.append(part_video)
-
-        # 5. Stitch
-        if not silent:
-            status.update("[bold white]Stitching video...[/bold white]")
-
-        durations = [get_duration(v) for v in video_parts]
-        fade_duration = 0.1
-
-        inputs = ""
-        for v in video_parts:
-            inputs += f'-i "{v}" '
-
-        v_accum = "0:v"
-        a_accum = "0:a"
-        offset = 0.0
-
-        video_filters = []
-        audio_filters = []
-
-        for i in range(1, len(video_parts)):
-            prev_dur = durations[i - 1]
-            offset += prev_dur - fade_duration
+            return part_num, part_video
 
-            v_next = f"{i}:v"
-            v_out = f"v{i}"
-            video_filters.append(
-                f"[{v_accum}][{v_next}]xfade=transition=fade:duration={fade_duration}:offset={offset}[{v_out}]"
-            )
-            v_accum = v_out
+        def report_progress(completed: int, total: int) -> None:
+            if not silent:
+                status.update(
+                    f"[bold cyan]Animated Part {completed}/{total} ({jobs} concurrent)...[/bold cyan]"
+                )
 
-            a_next = f"{i}:a"
-            a_out = f"a{i}"
-            audio_filters.append(
-                f"[{a_accum}][{a_next}]acrossfade=d={fade_duration}:c1=tri:c2=tri[{a_out}]"
+        if not silent:
+            status.update(
+                f"[bold cyan]Animating {len(segments)} parts ({jobs} concurrent)...[/bold cyan]"
             )
-            a_accum = a_out
-
-        filter_complex = ";".join(video_filters + audio_filters)
+        parts = run_ordered(
+            animate_part, list(enumerate(segments)), jobs, report_progress
+        )
+        video_parts = [video for _, video in sorted(parts)]
 
-        if len(video_parts) == 1:
-            cmd_stitch = f'{settings.ffmpeg_cmd} -y -i "{video_parts[0]}" -c copy "{merged_video}"'
-        else:
-            cmd_stitch = (
-                f"{settings.ffmpeg_cmd} -y {inputs} "
-                f'-filter_complex "{filter_complex}" '
-                f'-map "[{v_accum}]" -map "[{a_accum}]" '
-                f'-c:v libx264 -pix_fmt yuv420p "{merged_video}"'
-            )
+        # 5. Stitch (stream copy where possible)
+        if not silent:
+            status.update("[bold white]Stitching video...[/bold white]")
 
-        run_command(cmd_stitch, quiet=silent)
+        stitcher = Stitcher(
+            get_profile(getattr(args, "quality", None)),
+            crossfade=not getattr(args, "no_crossfade", False),
+            quiet=silent,
+        )
+        try:
+            stitcher.stitch(video_parts, merged_video)
+        except ProbeError as e:
+            raise CommandError(f"Cannot stitch video parts: {e}") from e
 
     if not silent:
         console.print(
@@ -1134,7 +1499,57 @@ def cmd_summary(args: argparse.Namespace) -> None:
         )
 
 
-def main() -> None:
+def cmd_batch(args: argparse.Namespace) -> None:
+    """Runs a queue of jobs of mixed subcommands in one process."""
+    jobs_file = Path(args.jobs_file)
+    if not jobs_file.exists():
+        raise CommandError(f"Batch file not found: {jobs_file}")
+
+    jobs = batch.load_jobs(jobs_file)
+    if not jobs:
+        console.print("[yellow]Batch file contains no jobs.[/yellow]")
+        return
+
+    parallel = args.parallel or settings.batch_concurrency
+    console.print(
+        f"[bold green]Running {len(jobs)} jobs ({parallel} at a time)...[/bold green]"
+    )
+
+    with console.status("[bold green]Batch running...[/bold green]") as status:
+
+        def report_progress(completed: int, total: int) -> None:
+            status.update(
+                f"[bold green]Batch: {completed}/{total} jobs done[/bold green]"
+            )
+
+        results = batch.run_batch(jobs, build_parser(), parallel, report_progress)
+
+    table = Table(title="Batch Summary", show_header=True, header_style="bold")
+    table.add_column("#", justify="right")
+    table.add_column("Job")
+    table.add_column("Time", justify="right")
+    table.add_column("Result")
+    for r in results:
+        outcome = f"[red]{r.error}[/red]" if r.error else "[green]ok[/green]"
+        table.add_row(str(r.index + 1), r.label, f"{r.duration:.1f}s", outcome)
+    console.print(table)
+
+    failures = sum(1 for r in results if r.error)
+    if failures:
+        raise CommandError(f"{failures} of {len(results)} jobs failed.")
+
+
+def add_quality_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "-q",
+        "--quality",
+        choices=list(settings.encoder_profiles),
+        default=None,
+        help=f"Encoder profile (default: {settings.quality})",
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Mirage: AI Experience Generator")
     subparsers = parser.add_subparsers(dest="command", help="Available subcommands")
 
@@ -1171,6 +1586,7 @@ def main() -> None:
     news.add_argument("topic", help="News Topic")
     news.add_argument("-s", "--silent", action="store_true", help="Silent mode")
     news.add_argument("-b", "--background", action="store_true", help="Background mode")
+    add_quality_argument(news)
     news.set_defaults(func=cmd_news_short)
 
     # --- Deep News ---
@@ -1179,10 +1595,23 @@ def main() -> None:
     )
     deep_news.add_argument("topic", help="Research Topic")
     deep_news.add_argument("-u", "--upload", help="Optional context file to upload")
+    deep_news.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=settings.max_jobs,
+        help="Segments to render concurrently",
+    )
+    deep_news.add_argument(
+        "--resume",
+        metavar="OUTPUT_DIR",
+        help="Resume an interrupted run, skipping completed stages",
+    )
     deep_news.add_argument("-s", "--silent", action="store_true", help="Silent mode")
     deep_news.add_argument(
         "-b", "--background", action="store_true", help="Background mode"
     )
+    add_quality_argument(deep_news)
     deep_news.set_defaults(func=cmd_deep_news)
 
     # --- Story Mode ---
@@ -1194,10 +1623,28 @@ def main() -> None:
         "-c", "--character", help="Character Description (e.g. 'Cyberpunk Wizard')"
     )
     story.add_argument("--cinema", action="store_true", help="Cinema mode (16:9)")
+    story.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=settings.vidius_concurrency,
+        help="Vidius renders to run concurrently",
+    )
+    story.add_argument(
+        "--resume",
+        metavar="OUTPUT_DIR",
+        help="Resume an interrupted run, skipping completed stages",
+    )
     story.add_argument("-s", "--silent", action="store_true", help="Silent mode")
     story.add_argument(
         "-b", "--background", action="store_true", help="Background mode"
     )
+    add_quality_argument(story)
+    story.add_argument(
+        "--no-crossfade",
+        action="store_true",
+        help="Join clips with hard cuts (no re-encoding when clips match)",
+    )
     story.set_defaults(func=cmd_story)
 
     # --- Summary Mode ---
@@ -1207,16 +1654,31 @@ def main() -> None:
     summary.add_argument("topic", help="Topic to summarize")
     summary.add_argument("-c", "--character", help="Character Name", required=True)
     summary.add_argument("--cinema", action="store_true", help="Cinema mode (16:9)")
+    summary.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=settings.vidius_concurrency,
+        help="Vidius renders to run concurrently",
+    )
     summary.add_argument("-s", "--silent", action="store_true", help="Silent mode")
     summary.add_argument(
         "-b", "--background", action="store_true", help="Background mode"
     )
+    add_quality_argument(summary)
+    summary.add_argument(
+        "--no-crossfade",
+        action="store_true",
+        help="Join clips with hard cuts (no re-encoding when clips match)",
+    )
     summary.set_defaults(func=cmd_summary)
 
     # --- Character Library ---
     char_parser = subparsers.add_parser("character", help="Manage Character Library")
     char_parser.add_argument(
-        "action", choices=["list", "add", "remove", "create"], help="Action"
+        "action",
+        choices=["list", "add", "remove", "create", "reindex"],
+        help="Action",
     )
     char_parser.add_argument(
         "name", nargs="?", help="Character Name"
@@ -1229,11 +1691,102 @@ def main() -> None:
     char_parser.add_argument("--voice", help="Voice Description (metadata)")
     char_parser.set_defaults(func=cmd_character)
 
+    # --- Artifact Cache ---
+    cache_parser = subparsers.add_parser("cache", help="Manage the artifact cache")
+    cache_parser.add_argument("action", choices=["stats", "prune"], help="Action")
+    cache_parser.add_argument(
+        "--max-size",
+        type=int,
+        help="Prune down to this size in MB (0 empties the cache)",
+    )
+    cache_parser.set_defaults(func=cmd_cache)
+
+    # --- Stats ---
+    stats_parser = subparsers.add_parser(
+        "stats", help="Summarize stage and tool timings across runs"
+    )
+    stats_parser.add_argument(
+        "--command",
+        dest="command_filter",
+        help="Only runs of this subcommand (e.g. story)",
+    )
+    stats_parser.add_argument(
+        "--kind", choices=["run", "stage", "process"], help="Only this record kind"
+    )
+    stats_parser.add_argument(
+        "--dir", help="Directory of run folders (default: output_base_dir)"
+    )
+    stats_parser.set_defaults(func=cmd_stats)
+
+    # --- Batch ---
+    batch_parser = subparsers.add_parser(
+        "batch", help="Run a queue of jobs from a .jsonl or .yaml file"
+    )
+    batch_parser.add_argument("jobs_file", help="Path to jobs.jsonl or jobs.yaml")
+    batch_parser.add_argument(
+        "-p",
+        "--parallel",
+        type=int,
+        default=settings.batch_concurrency,
+        help="Jobs to run at the same time",
+    )
+    batch_parser.set_defaults(func=cmd_batch)
+
+    # --- Daemon ---
+    daemon_parser = subparsers.add_parser(
+        "daemon", help="Run queued jobs in a warm background worker"
+    )
+    daemon_parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=settings.daemon_workers,
+        help="Jobs to run at the same time",
+    )
+    daemon_parser.add_argument(
+        "-d", "--detach", action="store_true", help="Run in the background"
+    )
+    daemon_parser.set_defaults(func=cmd_daemon)
+
+    submit_parser = subparsers.add_parser("submit", help="Queue a job for the daemon")
+    submit_parser.add_argument(
+        "job", nargs=argparse.REMAINDER, help="Command and arguments to run"
+    )
+    submit_parser.set_defaults(func=cmd_submit)
+
+    status_parser = subparsers.add_parser("status", help="Show daemon jobs")
+    status_parser.add_argument("job", type=int, nargs="?", help="Job id")
+    status_parser.add_argument(
+        "-n", "--limit", type=int, default=20, help="Number of recent jobs to show"
+    )
+    status_parser.set_defaults(func=cmd_status)
+
+    cancel_parser = subparsers.add_parser("cancel", help="Cancel a daemon job")
+    cancel_parser.add_argument("job", type=int, help="Job id")
+    cancel_parser.set_defaults(func=cmd_cancel)
+
+    logs_parser = subparsers.add_parser("logs", help="Show a daemon job's log")
+    logs_parser.add_argument("job", type=int, help="Job id")
+    logs_parser.add_argument(
+        "-f", "--follow", action="store_true", help="Keep printing until the job ends"
+    )
+    logs_parser.set_defaults(func=cmd_logs)
+
+    return parser
+
+
+def main() -> None:
+    parser = build_parser()
     args = parser.parse_args()
 
     # Handle Background Mode
     if hasattr(args, "background") and args.background:
         clean_args = [arg for arg in sys.argv[1:] if arg not in ["-b", "--background"]]
+
+        # A running daemon starts the job from a warm process with its own log
+        if daemon.is_running():
+            sys.exit(0 if submit_job(clean_args) is not None else 2)
+
         cmd = [sys.argv[0]] + clean_args
 
         console.print("[yellow]Respawning in background...[/yellow]")
@@ -1254,12 +1807,16 @@ def main() -> None:
 
     try:
         if hasattr(args, "func"):
-            args.func(args)
+            with telemetry.run(args.command):
+                args.func(args)
         else:
             parser.print_help()
     except KeyboardInterrupt:
         console.print("\n[bold red]Operation cancelled by user.[/bold red]")
         sys.exit(130)
+    except CommandError as e:
+        console.print(f"\n[bold red]Error:[/bold red] {e}")
+        sys.exit(1)
     except Exception as e:
         console.print(f"\n[bold red]Fatal Error:[/bold red] {e}")
         console.print_exception()
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Union
+
+import mirage.telemetry as telemetry
+from mirage.cache import file_digest
+
+MANIFEST_NAME = "manifest.json"
+
+
+def hash_inputs(*items: Union[str, Path, float, int, None]) -> str:
+    """
+    Hashes the inputs of a stage. Paths contribute their content digest
+    (or a 'missing' marker), everything else its string form.
+    """
+    h = hashlib.sha256()
+    for item in items:
+        if isinstance(item, Path):
+            token = file_digest(item) if item.exists() else f"missing:{item.name}"
+        else:
+            token = repr(item)
+        h.update(token.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class StageManifest:
+    """
+    Records completed pipeline stages in <output_dir>/manifest.json so an
+    interrupted run can be resumed. A stage counts as done only if its input
+    hash matches and every artifact it produced still exists.
+    """
+
+    def __init__(self, output_dir: Path) -> None:
+        self.output_dir = output_dir
+        self.path = output_dir / MANIFEST_NAME
+        self._lock = threading.Lock()
+        self.data: Dict[str, Any] = {"stages": {}}
+        if self.path.exists():
+            try:
+                self.data = json.loads(self.path.read_text(encoding="utf-8"))
+                self.data.setdefault("stages", {})
+            except (OSError, ValueError):
+                self.data = {"stages": {}}
+
+    def is_complete(self, stage: str, input_hash: str) -> bool:
+        with self._lock:
+            entry = self.data["stages"].get(stage)
+        if not entry or entry.get("input_hash") != input_hash:
+            return False
+        return all((self.output_dir / name).exists() for name in entry["artifacts"])
+
+    def record(self, stage: str, input_hash: str, artifacts: List[Path]) -> None:
+        with self._lock:
+            self.data["stages"][stage] = {
+                "input_hash": input_hash,
+                "artifacts": [
+                    str(Path(a).relative_to(self.output_dir)) for a in artifacts
+                ],
+                "completed_at": time.time(),
+            }
+            self._save()
+
+    def _save(self) -> None:
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.data, indent=4), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def ensure(
+        self,
+        stage: str,
+        input_hash: str,
+        artifacts: List[Path],
+        produce: Callable[[], None],
+    ) -> bool:
+        """
+        Runs produce() unless the stage is already complete, then records it
+        if all artifacts exist. Returns True when the stage was skipped.
+        """
+        with telemetry.stage(stage, skipped=False) as span:
+            if self.is_complete(stage, input_hash):
+                span["skipped"] = True
+                return True
+            produce()
+            if all(a.exists() for a in artifacts):
+                self.record(stage, input_hash, artifacts)
+            return False
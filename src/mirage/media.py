@@ -0,0 +1,660 @@
+import base64
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from rich.console import Console
+
+import mirage.telemetry as telemetry
+from mirage.cache import artifact_cache, detach
+from mirage.config import settings
+from mirage.encoders import EncoderProfile, get_profile
+from mirage.manifest import StageManifest, hash_inputs
+from mirage.runner import Arg, run_command, tool_argv
+from mirage.scheduler import run_ordered
+from mirage.stitch import DEFAULT_FADE, stitch_clips
+
+console = Console()
+
+DEFAULT_VOICE_PROMPT = "Neutral narrator voice"
+
+# Character library catalogue, kept next to the images
+INDEX_NAME = "index.json"
+# Subdirectory of the library holding per-aspect variants and thumbnails
+VARIANTS_DIR = "variants"
+
+
+def cache_key_args(
+    argv: Sequence[Arg],
+    outputs: Sequence[Path],
+    inputs: Sequence[Path] = (),
+    input_bytes: Optional[bytes] = None,
+) -> List[str]:
+    """
+    The argv a cache key is built from: the whole command, configured flags
+    included, with this run's output and input paths (and the output
+    directories and file names) replaced by their role. Input contents are
+    keyed by digest instead; piped input bytes are keyed by their hash.
+    """
+    roles: Dict[str, str] = {}
+    for i, path in enumerate(inputs):
+        roles[str(path)] = f"<input {i}>"
+    for i, path in enumerate(outputs):
+        roles[str(path)] = f"<output {i}>"
+        roles[path.name] = f"<output {i} name>"
+        roles.setdefault(str(path.parent), f"<output {i} dir>")
+    args = [roles.get(str(a), str(a)) for a in argv]
+    if input_bytes is not None:
+        args.append(f"<stdin {hashlib.sha256(input_bytes).hexdigest()}>")
+    return args
+
+
+def run_cached(
+    argv: List[Arg],
+    tool: str,
+    outputs: List[Path],
+    inputs: Optional[List[Path]] = None,
+    quiet: bool = False,
+    stdin_file: Optional[Path] = None,
+    input_bytes: Optional[bytes] = None,
+    prompt: Optional[str] = None,
+    cancel: Optional[threading.Event] = None,
+) -> bool:
+    """
+    Runs a generator command unless the artifact cache already holds its
+    outputs for the same tool, arguments and input files (see
+    cache_key_args). `inputs` lists every file the command reads, stdin_file
+    included. Returns True on a cache hit. `prompt`, if given, is traced by
+    its hash; `cancel` is passed on to run_command.
+    """
+    attrs: Dict[str, object] = {"tool": tool, "cache_hit": False}
+    if prompt is not None:
+        attrs["prompt_hash"] = telemetry.prompt_hash(prompt)
+    with telemetry.stage(tool, **attrs) as span:
+        # An output restored from the cache by an earlier run is a read-only
+        # hardlink; the tool must write a file of its own
+        for output in outputs:
+            detach(output)
+        if not settings.cache_enabled:
+            run_command(
+                argv,
+                quiet=quiet,
+                stdin_file=stdin_file,
+                input_bytes=input_bytes,
+                outputs=outputs,
+                tool=tool,
+                cancel=cancel,
+            )
+            return False
+
+        inputs = list(inputs or [])
+        if stdin_file is not None and stdin_file not in inputs:
+            inputs.append(stdin_file)
+        key_args = cache_key_args(argv, outputs, inputs, input_bytes)
+        key = artifact_cache.key(tool, key_args, inputs)
+        if artifact_cache.fetch(key, outputs):
+            span["cache_hit"] = True
+            if not quiet:
+                names = ", ".join(o.name for o in outputs)
+                console.print(f"[dim]Cache hit ({tool}): reused {names}[/dim]")
+            return True
+
+        run_command(
+            argv,
+            quiet=quiet,
+            stdin_file=stdin_file,
+            input_bytes=input_bytes,
+            outputs=outputs,
+            tool=tool,
+            cancel=cancel,
+        )
+        if all(o.exists() for o in outputs):
+            artifact_cache.store(key, outputs)
+        return False
+
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _image_mime(head: bytes) -> str:
+    if head.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/png"
+
+
+def _image_size(path: Path, head: bytes) -> Tuple[Optional[int], Optional[int]]:
+    """Reads dimensions from the PNG header, falling back to ffprobe."""
+    if head.startswith(_PNG_SIGNATURE) and head[12:16] == b"IHDR":
+        width, height = struct.unpack(">II", head[16:24])
+        return width, height
+    argv = tool_argv(settings.ffprobe_cmd) + ["-v", "error", "-select_streams", "v:0"]
+    argv += ["-show_entries", "stream=width,height", "-of", "csv=p=0", path]
+    try:
+        result = run_command(argv, capture=True, quiet=True)
+        width, height = result.stdout.strip().split(",")[:2]
+        return int(width), int(height)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return None, None
+
+
+def _ratio(aspect_ratio: str) -> float:
+    w, _, h = aspect_ratio.partition(":")
+    return float(w) / float(h)
+
+
+def variant_argv(image: Path, output: Path, width: int, height: int) -> List[Arg]:
+    """
+    ffmpeg arguments that fit an image into width x height, padding the
+    borders with a blurred, zoomed copy of itself rather than black bars.
+    """
+    graph = (
+        f"[0:v]split=2[bg][fg];"
+        f"[bg]scale={width}:{height}:force_original_aspect_ratio=increase,"
+        f"crop={width}:{height},boxblur=lr='min(w,h)/20':lp=2[bg];"
+        f"[fg]scale={width}:{height}:force_original_aspect_ratio=decrease[fg];"
+        f"[bg][fg]overlay=(W-w)/2:(H-h)/2,setsar=1"
+    )
+    argv: List[Arg] = tool_argv(settings.ffmpeg_cmd) + ["-y", "-i", image]
+    argv += ["-filter_complex", graph, "-frames:v", "1", output]
+    return argv
+
+
+def thumbnail_argv(image: Path, output: Path, size: int) -> List[Arg]:
+    """ffmpeg arguments for a JPEG no larger than size x size (never upscaled)."""
+    scale = (
+        f"scale='min({size},iw)':'min({size},ih)':force_original_aspect_ratio=decrease"
+    )
+    argv: List[Arg] = tool_argv(settings.ffmpeg_cmd) + ["-y", "-i", image]
+    argv += ["-vf", scale, "-frames:v", "1", "-q:v", "3", output]
+    return argv
+
+
+@dataclass(frozen=True)
+class Character:
+    name: str
+    image: Path
+    metadata: Dict[str, str]
+    sha256: str
+    width: Optional[int]
+    height: Optional[int]
+    mime_type: str  # Of the planner payload (the thumbnail when there is one)
+    image_b64: str
+    mtime_ns: int
+    size: int
+    # Aspect ratio -> file (relative to the library) framed for it
+    variants: Dict[str, str] = field(default_factory=dict)
+    thumbnail: Optional[str] = None
+    # False for entries indexed by a directory scan, until first use renders
+    # the variants and thumbnail
+    derived: bool = True
+
+    @property
+    def aspect(self) -> Optional[float]:
+        if not self.width or not self.height:
+            return None
+        return self.width / self.height
+
+    def image_for(self, aspect_ratio: Optional[str]) -> Path:
+        """The library image framed for aspect_ratio, or the original."""
+        variant = self.variants.get(aspect_ratio or "")
+        if variant and (self.image.parent / variant).exists():
+            return self.image.parent / variant
+        return self.image
+
+
+class CharacterRepository:
+    """
+    The character library: <name>.png plus a single index.json holding each
+    character's metadata, image digest, dimensions, pre-framed variants per
+    aspect ratio and a base64 thumbnail for the planner. Lookups and
+    listings read the index only; it is rewritten atomically (under a lock)
+    on every add/create/remove.
+
+    A missing index is rebuilt from the directory without rendering
+    anything; each character's variants and thumbnail are made the first
+    time it is looked up, or for all of them by reindex().
+
+    <name>.json sidecars are still written for older versions of the tool.
+    """
+
+    def __init__(self, library_dir: Optional[Path] = None) -> None:
+        self.library_dir = library_dir or settings.character_library_dir
+        self.index_path = self.library_dir / INDEX_NAME
+        self._index: Optional[Dict[str, Character]] = None
+        self._index_stamp: Optional[Tuple[int, int]] = None
+
+    def image_path(self, name: str) -> Path:
+        return self.library_dir / f"{name}.png"
+
+    def meta_path(self, name: str) -> Path:
+        return self.library_dir / f"{name}.json"
+
+    # --- Index ---
+
+    def _render_derivatives(
+        self, name: str, image: Path, aspect: Optional[float]
+    ) -> Tuple[Dict[str, str], Optional[str]]:
+        """
+        Renders the per-aspect variants and the planner thumbnail in
+        parallel. Images that already have a variant's aspect ratio are used
+        as-is. Failures are reported and leave that derivative out.
+        """
+        out_dir = self.library_dir / VARIANTS_DIR
+        out_dir.mkdir(parents=True, exist_ok=True)
+        variants: Dict[str, str] = {}
+        jobs: List[Tuple[str, List[Arg]]] = []
+        for ratio, (width, height) in settings.character_variants.items():
+            if aspect and abs(aspect - _ratio(ratio)) / _ratio(ratio) < 0.01:
+                variants[ratio] = image.name
+                continue
+            output = out_dir / f"{name}_{ratio.replace(':', 'x')}.png"
+            variants[ratio] = str(output.relative_to(self.library_dir))
+            jobs.append((ratio, variant_argv(image, output, width, height)))
+        thumb = out_dir / f"{name}_thumb.jpg"
+        size = settings.character_thumbnail_size
+        jobs.append(("thumbnail", thumbnail_argv(image, thumb, size)))
+
+        def render(job: Tuple[str, List[Arg]]) -> Optional[str]:
+            label, argv = job
+            try:
+                run_command(argv, quiet=True)
+                return None
+            except (OSError, subprocess.CalledProcessError):
+                console.print(
+                    f"[yellow]Warning: Could not render {label} image for {name}.[/yellow]"
+                )
+                return label
+
+        failed = set(run_ordered(render, jobs, len(jobs))) - {None}
+        for ratio in failed & set(variants):
+            del variants[ratio]
+        thumbnail = None
+        if "thumbnail" not in failed:
+            thumbnail = str(thumb.relative_to(self.library_dir))
+        return variants, thumbnail
+
+    def _entry(self, name: str, meta: Dict[str, str], derive: bool = True) -> Character:
+        image = self.image_path(name)
+        data = image.read_bytes()
+        stat = image.stat()
+        width, height = _image_size(image, data[:32])
+        aspect = width / height if width and height else None
+        variants: Dict[str, str] = {}
+        thumbnail = None
+        if derive:
+            variants, thumbnail = self._render_derivatives(name, image, aspect)
+
+        # The planner gets whichever is smaller (tiny PNGs beat their JPEG)
+        payload = data
+        if thumbnail:
+            payload = min(payload, (self.library_dir / thumbnail).read_bytes(), key=len)
+        return Character(
+            name=name,
+            image=image,
+            metadata=meta,
+            sha256=hashlib.sha256(data).hexdigest(),
+            width=width,
+            height=height,
+            mime_type=_image_mime(payload[:16]),
+            image_b64=base64.b64encode(payload).decode("ascii"),
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            variants=variants,
+            thumbnail=thumbnail,
+            derived=derive,
+        )
+
+    def _read_sidecar(self, name: str) -> Dict[str, str]:
+        try:
+            with open(self.meta_path(name), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self.library_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.library_dir / f"{INDEX_NAME}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _write_index(self, index: Dict[str, Character]) -> None:
+        entries = {}
+        for name, c in sorted(index.items()):
+            entry = asdict(c)
+            entry["image"] = c.image.name
+            entries[name] = entry
+        fd, tmp = tempfile.mkstemp(dir=self.library_dir, prefix=".index-")
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": 1, "characters": entries}, f, indent=4)
+        os.replace(tmp, self.index_path)
+        stat = self.index_path.stat()
+        self._index, self._index_stamp = index, (stat.st_mtime_ns, stat.st_size)
+
+    def _scan(self) -> Dict[str, Character]:
+        """Indexes every image in the library, leaving derivatives for later."""
+        return {
+            image.stem: self._entry(
+                image.stem, self._read_sidecar(image.stem), derive=False
+            )
+            for image in sorted(self.library_dir.glob("*.png"))
+        }
+
+    def _load(self) -> Optional[Dict[str, Character]]:
+        """Parses index.json (if changed since last read); None if missing or unreadable."""
+        try:
+            stat = self.index_path.stat()
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if self._index is not None and stamp == self._index_stamp:
+                return self._index
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+            index = {}
+            for name, entry in data["characters"].items():
+                entry["image"] = self.library_dir / entry["image"]
+                index[name] = Character(**entry)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        self._index, self._index_stamp = index, stamp
+        return index
+
+    def index(self) -> Dict[str, Character]:
+        """All indexed characters, rebuilding the index from disk if needed."""
+        index = self._load()
+        if index is not None:
+            return index
+        if not self.library_dir.is_dir():
+            return {}
+        with self._locked():
+            # Another process may have rebuilt it while we waited
+            index = self._load()
+            if index is None:
+                index = self._scan()
+                self._write_index(index)
+        return index
+
+    def _update(self, name: str, entry: Optional[Character]) -> None:
+        with self._locked():
+            index = dict(self._load() or self._scan())
+            if entry is None:
+                index.pop(name, None)
+            else:
+                index[name] = entry
+            self._write_index(index)
+
+    # --- Queries ---
+
+    def names(self) -> List[str]:
+        return sorted(self.index())
+
+    def get(self, name: Optional[str]) -> Optional[Character]:
+        """
+        Returns the indexed character, re-indexing it if its image was
+        replaced behind the library's back or its derivatives were never
+        rendered.
+        """
+        if not name:
+            return None
+        character = self.index().get(name)
+        if character is None:
+            return None
+        try:
+            stat = character.image.stat()
+        except FileNotFoundError:
+            return None
+        stale = (stat.st_mtime_ns, stat.st_size) != (character.mtime_ns, character.size)
+        if stale or not character.derived:
+            character = self._entry(name, character.metadata)
+            self._update(name, character)
+        return character
+
+    def exists(self, name: Optional[str]) -> bool:
+        return self.get(name) is not None
+
+    def metadata(self, name: Optional[str], quiet: bool = False) -> Dict[str, str]:
+        """
+        Returns the character's metadata over defaults, so callers can always
+        rely on `description` and `voice_prompt`.
+        """
+        meta = {
+            "description": name if name else "The character",
+            "voice_prompt": DEFAULT_VOICE_PROMPT,
+        }
+        character = self.get(name)
+        if character is not None and character.metadata:
+            meta.update(character.metadata)
+            if not quiet:
+                console.print(f"[green]Loaded metadata for {name}[/green]")
+        return meta
+
+    # --- Mutations ---
+
+    def is_reserved(self, name: str) -> bool:
+        # <name>.json would overwrite the index itself
+        return self.meta_path(name) == self.index_path
+
+    def register(self, name: str, meta: Dict[str, str]) -> Character:
+        """Indexes an image already placed at image_path(name)."""
+        if self.is_reserved(name):
+            raise ValueError(f"'{name}' is reserved by the character library")
+        with open(self.meta_path(name), "w") as f:
+            json.dump(meta, f, indent=4)
+        character = self._entry(name, meta)
+        self._update(name, character)
+        return character
+
+    def add(self, name: str, image: Path, meta: Dict[str, str]) -> Character:
+        self.library_dir.mkdir(parents=True, exist_ok=True)
+        shutil.copy(image, self.image_path(name))
+        return self.register(name, meta)
+
+    def reindex(self, names: Optional[Sequence[str]] = None) -> List[str]:
+        """
+        Re-renders the variants and thumbnail of the named characters (all
+        by default), e.g. after changing settings.character_variants.
+        Returns the characters that were re-indexed.
+        """
+        index = self.index()
+        done = []
+        for name in names if names is not None else sorted(index):
+            character = index.get(name)
+            if character is None or not character.image.exists():
+                continue
+            self._update(name, self._entry(name, character.metadata))
+            done.append(name)
+        return done
+
+    def remove(self, name: str) -> bool:
+        """
+        Deletes a character with its metadata and derived images. Returns
+        False if it was not found.
+        """
+        if not self.image_path(name).exists():
+            return False
+        self.image_path(name).unlink()
+        if self.meta_path(name).exists():
+            self.meta_path(name).unlink()
+        for derived in (self.library_dir / VARIANTS_DIR).glob(f"{name}_*"):
+            derived.unlink()
+        self._update(name, None)
+        return True
+
+    def cast(
+        self, name: Optional[str], dest: Path, aspect_ratio: Optional[str] = None
+    ) -> Optional[Character]:
+        """
+        Copies the library image framed for aspect_ratio (when a variant was
+        made) to dest. Returns None if there is no such character.
+        """
+        character = self.get(name)
+        if character is None:
+            return None
+        # dest may be a Lumina render the cache restored into this run
+        detach(dest)
+        shutil.copy(character.image_for(aspect_ratio), dest)
+        return character
+
+
+class SegmentRenderer:
+    """
+    Generates per-segment stills (Lumina) and clips (Vidius) for a run. Each
+    call goes through the artifact cache and, when a stage name and manifest
+    are given, is skipped on resume once it has completed.
+    """
+
+    def __init__(
+        self,
+        manifest: Optional[StageManifest] = None,
+        quiet: bool = False,
+    ) -> None:
+        self.manifest = manifest
+        self.quiet = quiet
+
+    def _ensure(
+        self,
+        stage: Optional[str],
+        input_hash: str,
+        output: Path,
+        produce: Callable[[], None],
+    ) -> None:
+        if self.manifest is not None and stage:
+            self.manifest.ensure(stage, input_hash, [output], produce)
+        else:
+            produce()
+
+    def image(
+        self,
+        output: Path,
+        prompt: str,
+        aspect_ratio: Optional[str] = None,
+        negative_prompt: Optional[str] = None,
+        stage: Optional[str] = None,
+        placeholder: Optional[str] = None,
+    ) -> Optional[Path]:
+        """
+        Renders a still to `output`. If Lumina produces nothing and a
+        placeholder size (e.g. "1920x1080") is given, a black frame is used.
+        Returns the image, or None if there is none.
+        """
+        argv: List[Arg] = tool_argv(settings.lumina_cmd) + ["--prompt", prompt]
+        if aspect_ratio:
+            argv += ["--aspect-ratio", aspect_ratio]
+        if negative_prompt:
+            argv += ["--negative-prompt", negative_prompt]
+        argv += ["--output-dir", output.parent, "--filename", output.name]
+
+        def produce() -> None:
+            run_cached(
+                argv,
+                tool="lumina",
+                outputs=[output],
+                quiet=self.quiet,
+                prompt=prompt,
+            )
+            if not output.exists() and placeholder:
+                run_command(
+                    tool_argv(settings.convert_cmd)
+                    + ["-size", placeholder, "xc:black", output],
+                    quiet=True,
+                    tool="convert",
+                )
+
+        self._ensure(
+            stage, hash_inputs(prompt, aspect_ratio, negative_prompt), output, produce
+        )
+        return output if output.exists() else None
+
+    def animate(
+        self,
+        output: Path,
+        prompt: str,
+        image: Path,
+        aspect_ratio: Optional[str] = None,
+        negative_prompt: Optional[str] = None,
+        extra_args: Sequence[str] = (),
+        stage: Optional[str] = None,
+    ) -> Path:
+        """Animates `image` into a clip at `output` with Vidius."""
+        options: List[str] = []
+        if aspect_ratio:
+            options += ["-ar", aspect_ratio]
+        if negative_prompt:
+            options += ["-np", negative_prompt]
+        options += list(extra_args)
+        argv = tool_argv(settings.vidius_cmd) + [prompt, "-i", image, "-o", output]
+        argv += options
+
+        self._ensure(
+            stage,
+            hash_inputs(prompt, *options, image),
+            output,
+            lambda: run_cached(
+                argv,
+                tool="vidius",
+                inputs=[image],
+                outputs=[output],
+                quiet=self.quiet,
+                prompt=prompt,
+            ),
+        )
+        return output
+
+
+class Stitcher:
+    """Joins rendered parts into the final video with one encoder profile."""
+
+    def __init__(
+        self,
+        profile: Optional[EncoderProfile] = None,
+        crossfade: bool = True,
+        fade: float = DEFAULT_FADE,
+        quiet: bool = False,
+    ) -> None:
+        self.profile = profile or get_profile()
+        self.crossfade = crossfade
+        self.fade = fade
+        self.quiet = quiet
+
+    def stitch(
+        self,
+        parts: Sequence[Path],
+        output: Path,
+        manifest: Optional[StageManifest] = None,
+        stage: str = "stitch",
+    ) -> None:
+        """
+        Stitches `parts` into `output`, recorded as `stage` in the manifest
+        when one is given. Raises ProbeError if a part cannot be read.
+        """
+
+        def produce() -> None:
+            stitch_clips(
+                parts,
+                output,
+                fade=self.fade,
+                crossfade=self.crossfade,
+                profile=self.profile,
+                quiet=self.quiet,
+            )
+
+        if manifest is None:
+            with telemetry.stage(stage):
+                produce()
+            return
+        input_hash = hash_inputs(self.profile.name, self.crossfade, *parts)
+        manifest.ensure(stage, input_hash, [output], produce)
@@ -1,22 +1,89 @@
+import asyncio
 import base64
 import json
 import os
+import random
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests  # type: ignore
+from requests.adapters import HTTPAdapter  # type: ignore
 from rich.console import Console
 
+import mirage.telemetry as telemetry
+from mirage.config import settings
+
 console = Console()
 
+# HTTP status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
 
-def generate_story_plan(
-    topic: str, character_meta: Dict[str, str], image_path: Optional[Path] = None
-) -> List[Dict[str, str]]:
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Returns the shared keep-alive session used for all planner requests."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4, pool_maxsize=settings.planner_pool_size
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Exponential backoff with full jitter, honouring Retry-After when given."""
+    if retry_after:
+        try:
+            return min(float(retry_after), settings.planner_backoff_max)
+        except ValueError:
+            pass
+    ceiling = min(
+        settings.planner_backoff_max, settings.planner_backoff_base * (2**attempt)
+    )
+    return random.uniform(0, ceiling)
+
+
+def post_json(url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Calls Gemini 3.0 Pro Preview to generate a structured story plan.
-    Supports multimodal input (Text + Image).
+    POSTs a JSON payload through the pooled session with explicit timeouts,
+    retrying connection errors, timeouts, 429 and 5xx responses.
     """
+    session = get_session()
+    timeout = (settings.planner_connect_timeout, settings.planner_read_timeout)
+    attempts = settings.planner_max_retries + 1
+
+    with telemetry.stage("planner", attempts=0) as span:
+        for attempt in range(attempts):
+            span["attempts"] = attempt + 1
+            last_try = attempt == attempts - 1
+            try:
+                response = session.post(url, json=payload, timeout=timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if last_try:
+                    raise
+                time.sleep(_backoff_delay(attempt))
+                continue
+
+            if response.status_code in RETRY_STATUS_CODES and not last_try:
+                time.sleep(_backoff_delay(attempt, response.headers.get("Retry-After")))
+                continue
+
+            response.raise_for_status()
+            return response.json()
+
+    raise RuntimeError("unreachable")
+
+
+def _get_api_key() -> Optional[str]:
     api_key = os.environ.get("GOOGLE_API_KEY")
     if not api_key:
         # Try loading from standard env file location if not in env
@@ -27,7 +94,35 @@ def generate_story_plan(
                     if line.startswith("GOOGLE_API_KEY="):
                         api_key = line.split("=")[1].strip().strip('"')
                         break
+    return api_key
+
+
+def _extract_plan(result: Dict[str, Any]) -> List[Dict[str, str]]:
+    # Candidates -> Content -> Parts -> Text
+    text_content = result["candidates"][0]["content"]["parts"][0]["text"]
+    # Clean potential markdown
+    text_content = text_content.replace("```json", "").replace("```", "").strip()
+    return json.loads(text_content)
+
+
+def _model_url(model_name: str, api_key: str) -> str:
+    return (
+        f"{settings.planner_base_url}/models/{model_name}:generateContent?key={api_key}"
+    )
 
+
+def _story_request(
+    topic: str,
+    character_meta: Dict[str, str],
+    image_path: Optional[Path] = None,
+    image: Optional[Tuple[str, str]] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Builds the Gemini URL and payload for a story plan. `image` is an
+    already encoded (mime_type, base64 data) pair, e.g. from the character
+    library index, and takes precedence over reading image_path.
+    """
+    api_key = _get_api_key()
     if not api_key:
         raise ValueError("GOOGLE_API_KEY not found in environment or config.")
 
@@ -38,7 +133,7 @@ def generate_story_plan(
     char_desc = character_meta.get("description", "A generic character")
     voice_desc = character_meta.get("voice_prompt", "Neutral voice")
 
-    if image_path:
+    if image_path or image:
         prompt_text = f"""
         You are an expert cinematographic storyteller and director.
         
@@ -89,25 +184,20 @@ def generate_story_plan(
     parts: List[Dict[str, Any]] = [{"text": prompt_text}]
 
     # Add Image Part if exists
-    if image_path and image_path.exists():
+    if image is None and image_path and image_path.exists():
         try:
             with open(image_path, "rb") as img_f:
                 img_data = base64.b64encode(img_f.read()).decode("utf-8")
-
-            parts.append(
-                {
-                    "inline_data": {
-                        "mime_type": "image/png",  # Assuming PNG, logic could be smarter
-                        "data": img_data,
-                    }
-                }
-            )
+            image = ("image/png", img_data)  # Assuming PNG, logic could be smarter
         except Exception as e:
             console.print(
                 f"[yellow]Warning: Failed to load character image for planner: {e}[/yellow]"
             )
+    if image is not None:
+        mime_type, img_data = image
+        parts.append({"inline_data": {"mime_type": mime_type, "data": img_data}})
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent?key={api_key}"
+    url = _model_url(model_name, api_key)
 
     payload = {
         "contents": [{"parts": parts}],
@@ -116,25 +206,28 @@ def generate_story_plan(
             "responseMimeType": "application/json",  # Enforce JSON output
         },
     }
+    return url, payload
 
-    try:
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        result = response.json()
 
-        # Parse JSON from the response text
-        # Candidates -> Content -> Parts -> Text
-        text_content = result["candidates"][0]["content"]["parts"][0]["text"]
-        # Clean potential markdown
-        text_content = text_content.replace("```json", "").replace("```", "").strip()
+async def agenerate_story_plan(
+    topic: str,
+    character_meta: Dict[str, str],
+    image_path: Optional[Path] = None,
+    image: Optional[Tuple[str, str]] = None,
+) -> List[Dict[str, str]]:
+    """
+    Calls Gemini 3.0 Pro Preview to generate a structured story plan.
+    Supports multimodal input (Text + Image).
+    """
+    url, payload = _story_request(topic, character_meta, image_path, image)
 
-        plan = json.loads(text_content)
-        return plan
+    try:
+        return _extract_plan(await asyncio.to_thread(post_json, url, payload))
 
     except Exception as e:
         console.print(f"[red]Story Planning Failed:[/red] {e}")
-        if "response" in locals():
-            console.print(f"Response: {response.text}")
+        if isinstance(e, requests.HTTPError) and e.response is not None:
+            console.print(f"Response: {e.response.text}")
         # Fallback plan
         return [
             {
@@ -145,20 +238,19 @@ def generate_story_plan(
         ]
 
 
-def generate_news_plan(news_text: str) -> List[Dict[str, str]]:
-    """
-    Calls Gemini to break down a long news report into visual B-roll segments.
-    """
-    api_key = os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        env_path = os.path.expanduser("~/.config/mirage/.env")
-        if os.path.exists(env_path):
-            with open(env_path, "r") as f:
-                for line in f:
-                    if line.startswith("GOOGLE_API_KEY="):
-                        api_key = line.split("=")[1].strip().strip('"')
-                        break
+def generate_story_plan(
+    topic: str,
+    character_meta: Dict[str, str],
+    image_path: Optional[Path] = None,
+    image: Optional[Tuple[str, str]] = None,
+) -> List[Dict[str, str]]:
+    """Synchronous wrapper around agenerate_story_plan."""
+    return asyncio.run(agenerate_story_plan(topic, character_meta, image_path, image))
 
+
+def _news_request(news_text: str) -> Tuple[str, Dict[str, Any]]:
+    """Builds the Gemini URL and payload for a news segment plan."""
+    api_key = _get_api_key()
     if not api_key:
         raise ValueError("GOOGLE_API_KEY not found.")
 
@@ -191,7 +283,7 @@ def generate_news_plan(news_text: str) -> List[Dict[str, str]]:
     ]
     """
 
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent?key={api_key}"
+    url = _model_url(model_name, api_key)
 
     payload = {
         "contents": [{"parts": [{"text": prompt_text}]}],
@@ -200,16 +292,17 @@ def generate_news_plan(news_text: str) -> List[Dict[str, str]]:
             "responseMimeType": "application/json",
         },
     }
+    return url, payload
 
-    try:
-        response = requests.post(url, json=payload)
-        response.raise_for_status()
-        result = response.json()
 
-        text_content = result["candidates"][0]["content"]["parts"][0]["text"]
-        text_content = text_content.replace("```json", "").replace("```", "").strip()
-        plan = json.loads(text_content)
-        return plan
+async def agenerate_news_plan(news_text: str) -> List[Dict[str, str]]:
+    """
+    Calls Gemini to break down a long news report into visual B-roll segments.
+    """
+    url, payload = _news_request(news_text)
+
+    try:
+        return _extract_plan(await asyncio.to_thread(post_json, url, payload))
 
     except Exception as e:
         console.print(f"[red]News Planning Failed:[/red] {e}")
@@ -219,3 +312,56 @@ def generate_news_plan(news_text: str) -> List[Dict[str, str]]:
                 "visual_prompt": "TV static and color bars, retro style",
             }
         ]
+
+
+def generate_news_plan(news_text: str) -> List[Dict[str, str]]:
+    """Synchronous wrapper around agenerate_news_plan."""
+    return asyncio.run(agenerate_news_plan(news_text))
+
+
+class RateLimiter:
+    """Spaces request starts so no more than `per_minute` begin each minute."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def agenerate_news_plans(
+    news_texts: List[str],
+    concurrency: Optional[int] = None,
+    requests_per_minute: Optional[float] = None,
+) -> List[List[Dict[str, str]]]:
+    """
+    Plans many news reports concurrently, at most `concurrency` in flight and
+    rate limited to `requests_per_minute`. Results are in input order.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.planner_concurrency)
+    limiter = RateLimiter(requests_per_minute or settings.planner_requests_per_minute)
+
+    async def plan_one(text: str) -> List[Dict[str, str]]:
+        async with semaphore:
+            await limiter.wait()
+            return await agenerate_news_plan(text)
+
+    return list(await asyncio.gather(*(plan_one(t) for t in news_texts)))
+
+
+def generate_news_plans(
+    news_texts: List[str],
+    concurrency: Optional[int] = None,
+    requests_per_minute: Optional[float] = None,
+) -> List[List[Dict[str, str]]]:
+    """Synchronous wrapper around agenerate_news_plans."""
+    return asyncio.run(
+        agenerate_news_plans(news_texts, concurrency, requests_per_minute)
+    )
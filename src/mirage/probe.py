@@ -0,0 +1,167 @@
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from mirage.config import settings
+from mirage.runner import run_command, tool_argv
+from mirage.scheduler import run_ordered
+
+
+# A video packet's (pts, dts, keyframe), times in seconds
+Packet = Tuple[float, float, bool]
+
+
+class ProbeError(RuntimeError):
+    """Raised when ffprobe cannot read a media file."""
+
+
+@dataclass(frozen=True)
+class MediaInfo:
+    path: Path
+    duration: float
+    format_name: str = ""
+    video_codec: Optional[str] = None
+    audio_codec: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    pix_fmt: Optional[str] = None
+    sample_rate: Optional[int] = None
+
+    @property
+    def has_video(self) -> bool:
+        return self.video_codec is not None
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio_codec is not None
+
+
+_probe_lock = threading.Lock()
+_probe_memo: Dict[Tuple[str, int, int], MediaInfo] = {}
+_packet_memo: Dict[Tuple[str, int, int], List[Packet]] = {}
+
+
+def _memo_key(path: Path) -> Tuple[str, int, int]:
+    try:
+        stat = path.stat()
+    except OSError as e:
+        raise ProbeError(f"{path}: {e.strerror or e}") from e
+    return (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def _parse_rate(rate: Optional[str]) -> Optional[float]:
+    """Converts an ffprobe rational like '30000/1001' to a float."""
+    if not rate:
+        return None
+    num, _, den = rate.partition("/")
+    try:
+        value = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return value or None
+
+
+def parse_probe(path: Path, data: Dict[str, Any]) -> MediaInfo:
+    """Builds a MediaInfo from ffprobe's -show_format -show_streams JSON."""
+    fmt = data.get("format", {})
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+
+    duration = fmt.get("duration") or video.get("duration") or audio.get("duration")
+    try:
+        duration = float(duration)
+    except (TypeError, ValueError):
+        raise ProbeError(f"{path}: no duration reported by ffprobe") from None
+
+    return MediaInfo(
+        path=path,
+        duration=duration,
+        format_name=fmt.get("format_name", ""),
+        video_codec=video.get("codec_name"),
+        audio_codec=audio.get("codec_name"),
+        width=video.get("width"),
+        height=video.get("height"),
+        fps=_parse_rate(video.get("avg_frame_rate"))
+        or _parse_rate(video.get("r_frame_rate")),
+        pix_fmt=video.get("pix_fmt"),
+        sample_rate=int(audio["sample_rate"]) if audio.get("sample_rate") else None,
+    )
+
+
+def probe(path: Path) -> MediaInfo:
+    """
+    Returns duration and stream metadata for a media file, memoized on
+    (path, mtime, size). Raises ProbeError if the file cannot be probed.
+    """
+    memo_key = _memo_key(path)
+    with _probe_lock:
+        if memo_key in _probe_memo:
+            return _probe_memo[memo_key]
+
+    argv = tool_argv(settings.ffprobe_cmd) + ["-v", "error", "-print_format", "json"]
+    argv += ["-show_format", "-show_streams", path]
+    try:
+        result = run_command(argv, capture=True, quiet=True, check=False)
+    except OSError as e:
+        raise ProbeError(f"{path}: could not run ffprobe: {e}") from e
+    if result.returncode != 0:
+        raise ProbeError(f"{path}: {result.stderr.strip() or 'ffprobe failed'}")
+    try:
+        data = json.loads(result.stdout)
+    except ValueError as e:
+        raise ProbeError(f"{path}: unreadable ffprobe output") from e
+
+    info = parse_probe(path, data)
+    with _probe_lock:
+        _probe_memo[memo_key] = info
+    return info
+
+
+def probe_many(paths: List[Path], max_workers: Optional[int] = None) -> List[MediaInfo]:
+    """
+    Probes several files at once (ffprobe reads one input per process, so the
+    calls run in parallel) and returns results in input order.
+    """
+    return run_ordered(probe, paths, max_workers or settings.max_jobs)
+
+
+def video_packets(path: Path) -> List[Packet]:
+    """
+    (pts, dts, keyframe) of every video packet in a file, in decode order,
+    read with ffprobe so nothing is decoded. Memoized like probe().
+    """
+    memo_key = _memo_key(path)
+    with _probe_lock:
+        if memo_key in _packet_memo:
+            return _packet_memo[memo_key]
+
+    argv = tool_argv(settings.ffprobe_cmd) + ["-v", "error", "-select_streams", "v:0"]
+    argv += ["-show_entries", "packet=pts_time,dts_time,flags", "-of", "csv=p=0"]
+    argv += [path]
+    try:
+        result = run_command(argv, capture=True, quiet=True, check=False)
+    except OSError as e:
+        raise ProbeError(f"{path}: could not run ffprobe: {e}") from e
+    if result.returncode != 0:
+        raise ProbeError(f"{path}: {result.stderr.strip() or 'ffprobe failed'}")
+
+    packets = []
+    for line in result.stdout.splitlines():
+        pts, _, rest = line.partition(",")
+        dts, _, flags = rest.partition(",")
+        try:
+            packets.append((float(pts), float(dts), "K" in flags))
+        except ValueError:
+            continue
+    with _probe_lock:
+        _packet_memo[memo_key] = packets
+    return packets
+
+
+def keyframe_times(path: Path) -> List[float]:
+    """Presentation times of the video keyframes in a file, sorted."""
+    return sorted(pts for pts, _, key in video_packets(path) if key)
@@ -0,0 +1,120 @@
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from mirage.config import settings
+from mirage.encoders import EncoderProfile, get_profile
+from mirage.runner import Arg, run_command, tool_argv
+
+
+@dataclass
+class Slide:
+    image: Path
+    duration: float
+
+
+def slideshow_filter(
+    slides: List[Slide],
+    width: int,
+    height: int,
+    fade: float,
+    upload: Optional[str] = None,
+) -> str:
+    """
+    Builds a filter_complex graph that scales each looped image input to the
+    output frame, fades it in and out, and concatenates the results into [v].
+    `upload` (e.g. hwupload for VAAPI) is appended to the final chain.
+    """
+    chains = []
+    labels = ""
+    for i, slide in enumerate(slides):
+        # Ensure fade out doesn't start before fade in ends if clip is very short
+        fade_out = max(0.0, slide.duration - fade)
+        chains.append(
+            f"[{i}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+            f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1,format=yuv420p,"
+            f"fade=t=in:st=0:d={fade},fade=t=out:st={fade_out:.3f}:d={fade}[s{i}]"
+        )
+        labels += f"[s{i}]"
+    tail = f",{upload}" if upload else ""
+    chains.append(f"{labels}concat=n={len(slides)}:v=1:a=0{tail}[v]")
+    return ";".join(chains)
+
+
+def slideshow_argv(
+    slides: List[Slide],
+    output: Path,
+    audio: Optional[Path] = None,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    fps: Optional[int] = None,
+    fade: Optional[float] = None,
+    profile: Optional[EncoderProfile] = None,
+) -> List[Arg]:
+    """ffmpeg arguments that encode the slides (and optional audio) in one pass."""
+    profile = profile or get_profile()
+    width = width or settings.render_width
+    height = height or settings.render_height
+    fps = fps or settings.render_fps
+    fade = settings.render_fade if fade is None else fade
+
+    argv: List[Arg] = tool_argv(settings.ffmpeg_cmd) + ["-y"] + profile.input_args()
+    for slide in slides:
+        argv += ["-loop", "1", "-framerate", fps]
+        argv += ["-t", f"{slide.duration:.3f}", "-i", slide.image]
+    if audio is not None:
+        argv += ["-i", audio]
+
+    graph = slideshow_filter(slides, width, height, fade, profile.upload_filter())
+    argv += ["-filter_complex", graph]
+    argv += ["-map", "[v]"]
+    if audio is not None:
+        argv += ["-map", f"{len(slides)}:a", "-c:a", "copy", "-shortest"]
+    argv += profile.output_args(tune="stillimage")
+    argv += ["-r", fps, output]
+    return argv
+
+
+def render_slideshow(
+    slides: List[Slide],
+    output: Path,
+    audio: Optional[Path] = None,
+    max_inputs: Optional[int] = None,
+    quiet: bool = False,
+    profile: Optional[EncoderProfile] = None,
+) -> None:
+    """
+    Renders still images with fades into a single video, muxing the audio
+    track in the same encode. Very long slideshows are split into chunks of
+    at most max_inputs images (ffmpeg keeps every input open at once); the
+    chunks are then joined with a stream copy while the audio is muxed.
+    """
+    if not slides:
+        raise ValueError("No slides to render")
+    max_inputs = max_inputs or settings.render_max_inputs
+    profile = profile or get_profile()
+
+    if len(slides) <= max_inputs:
+        run_command(slideshow_argv(slides, output, audio, profile=profile), quiet=quiet)
+        return
+
+    with tempfile.TemporaryDirectory(dir=output.parent, prefix=".render-") as tmp:
+        tmp_dir = Path(tmp)
+        concat_list = tmp_dir / "chunks.txt"
+        lines = []
+        for n, start in enumerate(range(0, len(slides), max_inputs)):
+            chunk = tmp_dir / f"chunk_{n}.mp4"
+            chunk_slides = slides[start : start + max_inputs]
+            run_command(
+                slideshow_argv(chunk_slides, chunk, profile=profile), quiet=quiet
+            )
+            lines.append(f"file '{chunk.name}'\n")
+        concat_list.write_text("".join(lines))
+
+        argv: List[Arg] = tool_argv(settings.ffmpeg_cmd) + ["-y"]
+        argv += ["-f", "concat", "-safe", "0", "-i", concat_list]
+        if audio is not None:
+            argv += ["-i", audio, "-map", "0:v", "-map", "1:a", "-shortest"]
+        argv += ["-c", "copy", output]
+        run_command(argv, quiet=quiet)
@@ -0,0 +1,195 @@
+import os
+import resource
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Deque, List, Optional, Sequence, Tuple, Union
+
+from rich.console import Console
+
+import mirage.telemetry as telemetry
+from mirage.governor import governor
+
+console = Console()
+
+# How much trailing output to keep for error reports when not capturing
+TAIL_BYTES = 64 * 1024
+
+Arg = Union[str, Path, int, float]
+
+# How often a cancellable command checks its cancel event, in seconds
+CANCEL_POLL = 0.05
+
+
+@dataclass
+class CommandResult:
+    argv: List[str]
+    returncode: int
+    stdout: str
+    stderr: str
+
+
+def tool_argv(command: str) -> List[str]:
+    """Splits a configured tool command (e.g. settings.lumina_cmd) into argv."""
+    return shlex.split(command)
+
+
+class _StreamReader(threading.Thread):
+    """
+    Drains a child pipe as output arrives, optionally echoing it, and keeps
+    either all of it (capture) or a bounded tail for error reporting.
+    """
+
+    def __init__(self, pipe: IO[bytes], capture: bool, echo: Optional[IO[str]]):
+        super().__init__(daemon=True)
+        self.pipe = pipe
+        self.capture = capture
+        self.echo = echo
+        self.chunks: List[bytes] = []
+        self.tail: Deque[bytes] = deque()
+        self.tail_size = 0
+
+    def run(self) -> None:
+        for line in iter(self.pipe.readline, b""):
+            if self.echo is not None:
+                self.echo.write(line.decode("utf-8", errors="replace"))
+                self.echo.flush()
+            if self.capture:
+                self.chunks.append(line)
+            else:
+                self.tail.append(line)
+                self.tail_size += len(line)
+                while self.tail_size > TAIL_BYTES and len(self.tail) > 1:
+                    self.tail_size -= len(self.tail.popleft())
+        self.pipe.close()
+
+    def text(self) -> str:
+        data = b"".join(self.chunks if self.capture else self.tail)
+        return data.decode("utf-8", errors="replace")
+
+
+def _wait(
+    proc: subprocess.Popen, cancel: Optional[threading.Event] = None
+) -> Tuple[int, Optional[resource.struct_rusage]]:
+    """
+    Waits for proc and returns its exit code with its own resource usage.
+    If `cancel` is set first, proc is terminated (and still waited for).
+    """
+    flags = 0 if cancel is None else os.WNOHANG
+    try:
+        while True:
+            pid, status, usage = os.wait4(proc.pid, flags)
+            if pid:
+                break
+            # Still running (and not reaped, so the pid is still ours)
+            if cancel is not None and cancel.wait(CANCEL_POLL):
+                proc.terminate()
+                flags = 0
+    except ChildProcessError:
+        return proc.wait(), None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return proc.returncode, usage
+
+
+def run_command(
+    argv: Sequence[Arg],
+    quiet: bool = False,
+    stdin_file: Optional[Path] = None,
+    input_bytes: Optional[bytes] = None,
+    capture: bool = False,
+    check: bool = True,
+    outputs: Optional[Sequence[Path]] = None,
+    tool: Optional[str] = None,
+    cancel: Optional[threading.Event] = None,
+) -> CommandResult:
+    """
+    Runs an external tool from an argv list (no shell) and raises
+    CalledProcessError on failure when check is set.
+
+    stdin is fed directly from stdin_file or input_bytes. Output goes straight
+    to the terminal unless quiet or capture is set, in which case it is read
+    as it arrives; capture keeps all of it, quiet keeps only a tail for errors.
+
+    `tool` is the logical tool name (e.g. "lumina") used for the governor's
+    limits and the timings; it defaults to the executable's basename, which
+    is wrong for wrapped commands such as "uv run lumina".
+
+    Each call is recorded to the run's timings (see telemetry); `outputs`
+    names the files it produces, for the output size.
+
+    Setting `cancel` (from another thread) terminates the tool; the call
+    then fails like any other non-zero exit, without the error report.
+    """
+    args = [str(a) for a in argv]
+    name = tool or Path(args[0]).name
+    piped = quiet or capture
+
+    stdin_handle: Optional[IO[bytes]] = None
+    if stdin_file is not None:
+        stdin_handle = open(stdin_file, "rb")
+        stdin: Union[int, IO[bytes], None] = stdin_handle
+    elif input_bytes is not None:
+        stdin = subprocess.PIPE
+    else:
+        stdin = None
+
+    try:
+        # Waits for a free slot and rate-limit token if the tool is governed
+        with governor.slot(name):
+            started_at, start = time.time(), time.perf_counter()
+            proc = subprocess.Popen(
+                args,
+                stdin=stdin,
+                stdout=subprocess.PIPE if piped else None,
+                stderr=subprocess.PIPE if piped else None,
+            )
+            readers = []
+            if piped:
+                echo_out = None if quiet else sys.stdout
+                echo_err = None if quiet else sys.stderr
+                readers = [
+                    _StreamReader(proc.stdout, capture, echo_out),  # type: ignore[arg-type]
+                    _StreamReader(proc.stderr, capture, echo_err),  # type: ignore[arg-type]
+                ]
+                for reader in readers:
+                    reader.start()
+            if input_bytes is not None and proc.stdin is not None:
+                try:
+                    proc.stdin.write(input_bytes)
+                except BrokenPipeError:
+                    pass
+                finally:
+                    proc.stdin.close()
+            returncode, usage = _wait(proc, cancel)
+            wall = time.perf_counter() - start
+            for reader in readers:
+                reader.join()
+    finally:
+        if stdin_handle is not None:
+            stdin_handle.close()
+
+    telemetry.record_process(name, started_at, wall, usage, returncode, outputs)
+
+    stdout = readers[0].text() if readers else ""
+    stderr = readers[1].text() if readers else ""
+    result = CommandResult(args, returncode, stdout, stderr)
+
+    cancelled = cancel is not None and cancel.is_set()
+    if check and returncode != 0 and not cancelled:
+        console.print(f"[bold red]Error running command:[/bold red] {shlex.join(args)}")
+        if piped:
+            console.print("[red]Captured Stderr:[/red]")
+            console.print(stderr, markup=False)
+            console.print("[red]Captured Stdout:[/red]")
+            console.print(stdout, markup=False)
+        else:
+            console.print(f"Command exited with status {returncode}.")
+    if check and returncode != 0:
+        raise subprocess.CalledProcessError(returncode, args, stdout, stderr)
+
+    return result
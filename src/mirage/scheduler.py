@@ -0,0 +1,166 @@
+import contextvars
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import mirage.telemetry as telemetry
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class Stage:
+    """A single unit of work in a pipeline, with the stages it depends on."""
+
+    name: str
+    func: Callable[[], None]
+    deps: Sequence[str] = ()
+    duration: Optional[float] = None
+    error: Optional[BaseException] = None
+    skipped: bool = False
+
+
+class StagePipeline:
+    """
+    Runs stages concurrently as soon as their dependencies have completed.
+    A stage whose dependency failed (or was skipped) is skipped itself.
+    Stages run in a copy of the caller's context, so they are timed as
+    part of the caller's run.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self.max_workers = max_workers
+        self.stages: Dict[str, Stage] = {}
+
+    def add(
+        self, name: str, func: Callable[[], None], deps: Sequence[str] = ()
+    ) -> None:
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self.stages[name] = Stage(name=name, func=func, deps=tuple(deps))
+
+    def _run_stage(self, stage: Stage) -> None:
+        start = time.perf_counter()
+        try:
+            with telemetry.stage(stage.name):
+                stage.func()
+        finally:
+            stage.duration = time.perf_counter() - start
+
+    def run(self) -> List[Stage]:
+        """
+        Executes the pipeline and returns the stages in insertion order.
+        Re-raises the first stage error once every runnable stage has finished.
+        """
+        pending = dict(self.stages)
+        done: Dict[str, Stage] = {}
+        running: Dict[Future, Stage] = {}
+        first_error: Optional[BaseException] = None
+
+        workers = self.max_workers or max(1, len(self.stages))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if any(dep not in done for dep in stage.deps):
+                        continue
+                    del pending[name]
+                    if any(
+                        done[dep].error is not None or done[dep].skipped
+                        for dep in stage.deps
+                    ):
+                        stage.skipped = True
+                        done[name] = stage
+                        continue
+                    ctx = contextvars.copy_context()
+                    running[pool.submit(ctx.run, self._run_stage, stage)] = stage
+
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage = running.pop(future)
+                    stage.error = future.exception()
+                    if stage.error is not None and first_error is None:
+                        first_error = stage.error
+                    done[stage.name] = stage
+
+        if first_error is not None:
+            raise first_error
+        return list(self.stages.values())
+
+
+def run_ordered(
+    func: Callable[[T], R],
+    items: Sequence[T],
+    max_workers: int,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[R]:
+    """
+    Applies func to every item on a bounded worker pool and returns the
+    results in input order. on_progress(completed, total) is called as each
+    item finishes. The first exception cancels queued work and is re-raised.
+    Each call runs in a copy of the caller's context.
+    """
+    results: List[Optional[R]] = [None] * len(items)
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    try:
+        futures = {
+            pool.submit(contextvars.copy_context().run, func, item): idx
+            for idx, item in enumerate(items)
+        }
+        for completed, future in enumerate(as_completed(futures), start=1):
+            results[futures[future]] = future.result()
+            if on_progress:
+                on_progress(completed, len(items))
+    except BaseException:
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    pool.shutdown(wait=True)
+    return results  # type: ignore[return-value]
+
+
+def wait_for_stable_file(
+    path: Path,
+    finished: Callable[[], bool],
+    settle: float,
+    poll: float = 0.1,
+) -> None:
+    """
+    Blocks until `path` is non-empty and its size and mtime have not
+    changed for `settle` seconds, or until finished() reports the producer
+    has exited.
+    """
+    last: Optional[Tuple[int, int]] = None
+    stable_since = 0.0
+    while not finished():
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            last = None
+        else:
+            current = (stat.st_size, stat.st_mtime_ns)
+            now = time.monotonic()
+            if current != last:
+                last, stable_since = current, now
+            elif stat.st_size > 0 and now - stable_since >= settle:
+                return
+        time.sleep(poll)
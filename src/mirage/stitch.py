@@ -0,0 +1,514 @@
+import math
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from fractions import Fraction
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from mirage.config import settings
+from mirage.encoders import EncoderProfile, get_profile
+from mirage.probe import (
+    MediaInfo,
+    Packet,
+    keyframe_times,
+    probe_many,
+    video_packets,
+)
+from mirage.runner import Arg, run_command, tool_argv
+
+# Length of the crossfade between consecutive clips, in seconds
+DEFAULT_FADE = 0.1
+
+# Encoder for the intermediate files of multi-pass merges
+INTERMEDIATE_PROFILE = EncoderProfile(name="intermediate", preset="veryfast", crf=12)
+
+
+def compatible(infos: Sequence[MediaInfo]) -> bool:
+    """
+    True when clips can be joined with a stream copy: same video codec,
+    frame size, pixel format and rate, and the same audio codec and rate.
+    """
+    if not infos or not all(i.has_video and i.has_audio for i in infos):
+        return False
+    first = infos[0]
+    for info in infos[1:]:
+        if (
+            info.video_codec,
+            info.width,
+            info.height,
+            info.pix_fmt,
+            info.audio_codec,
+            info.sample_rate,
+        ) != (
+            first.video_codec,
+            first.width,
+            first.height,
+            first.pix_fmt,
+            first.audio_codec,
+            first.sample_rate,
+        ):
+            return False
+        if first.fps and info.fps and abs(first.fps - info.fps) > 0.01:
+            return False
+    return True
+
+
+def xfade_graph(
+    durations: Sequence[float], fade: float, video: bool = True
+) -> Tuple[str, str, str]:
+    """
+    Crossfades all inputs with xfade/acrossfade, merging neighbours pairwise
+    so the graph is a balanced tree of depth log2(n) rather than a chain of
+    n-1 filters. Returns the filter graph and the labels of the final video
+    and audio streams; without `video` only the audio is crossfaded.
+    """
+    filters: List[str] = []
+    counter = iter(range(1, len(durations)))
+
+    def merge(lo: int, hi: int) -> Tuple[str, str, float]:
+        # Returns (video label, audio label, duration) for inputs lo..hi-1
+        if hi - lo == 1:
+            return f"{lo}:v", f"{lo}:a", durations[lo]
+        mid = (lo + hi) // 2
+        left_v, left_a, left_dur = merge(lo, mid)
+        right_v, right_a, right_dur = merge(mid, hi)
+        n = next(counter)
+        if video:
+            filters.append(
+                f"[{left_v}][{right_v}]xfade=transition=fade:duration={fade}:offset={left_dur - fade:.3f}[v{n}]"
+            )
+        filters.append(f"[{left_a}][{right_a}]acrossfade=d={fade}:c1=tri:c2=tri[a{n}]")
+        return f"v{n}", f"a{n}", left_dur + right_dur - fade
+
+    v_out, a_out, _ = merge(0, len(durations))
+    return ";".join(filters), v_out if video else "", a_out
+
+
+@dataclass
+class Cut:
+    """Where a clip's stream-copied body starts and ends (both keyframes)."""
+
+    start: float
+    end: float
+
+
+def plan_cuts(
+    durations: Sequence[float], keyframes: Sequence[Sequence[float]], fade: float
+) -> Optional[List[Cut]]:
+    """
+    Picks keyframe-aligned cut points so every clip except the transition
+    windows can be copied. Clip i's body runs from its first keyframe after
+    the incoming fade to its last keyframe before the outgoing fade. Returns
+    None if some clip has no room for a body.
+    """
+    cuts = []
+    last = len(durations) - 1
+    for i, (duration, frames) in enumerate(zip(durations, keyframes)):
+        if i == 0:
+            start = 0.0
+        else:
+            start = next((t for t in frames if t >= fade), duration)
+        if i == last:
+            end = duration
+        else:
+            end = max((t for t in frames if t <= duration - fade), default=0.0)
+        if end < start:
+            return None
+        cuts.append(Cut(start, end))
+    return cuts
+
+
+def _concat_list(paths: Sequence[Path], list_file: Path) -> None:
+    list_file.write_text("".join(f"file '{p.resolve()}'\n" for p in paths))
+
+
+def concat_copy(parts: Sequence[Path], output: Path, quiet: bool = False) -> None:
+    """Joins codec-compatible clips back to back without re-encoding."""
+    with tempfile.TemporaryDirectory(dir=output.parent, prefix=".stitch-") as tmp:
+        list_file = Path(tmp) / "parts.txt"
+        _concat_list(parts, list_file)
+        run_command(
+            tool_argv(settings.ffmpeg_cmd)
+            + ["-y", "-f", "concat", "-safe", "0", "-i", list_file]
+            + ["-c", "copy", "-movflags", "+faststart", output],
+            quiet=quiet,
+        )
+
+
+def _copy_body_argv(
+    clip: Path, start: int, frames: int, fps: float, output: Path
+) -> List[Arg]:
+    """Copies `frames` video frames starting at keyframe number `start`."""
+    argv: List[Arg] = tool_argv(settings.ffmpeg_cmd) + ["-y"]
+    # Seeking half a frame past the keyframe still lands on it, whichever
+    # way its timestamp was rounded; -frames:v then stops right before the
+    # next window's keyframe (copyable() checks that those packets are
+    # exactly the body's frames)
+    argv += ["-ss", f"{(start + 0.5) / fps:.6f}", "-i", clip]
+    argv += ["-map", "0:v:0", "-c", "copy", "-frames:v", str(frames)]
+    # Carry the clip's own SPS/PPS in-band so it decodes after other pieces
+    argv += ["-bsf:v", "h264_mp4toannexb", "-avoid_negative_ts", "make_zero"]
+    argv += ["-f", "nut", output]
+    return argv
+
+
+def _transition_argv(
+    left: Path,
+    left_start: int,
+    tail: int,
+    right: Path,
+    head: int,
+    fps: float,
+    fade: float,
+    frames: int,
+    profile: EncoderProfile,
+    output: Path,
+) -> List[Arg]:
+    """
+    Re-encodes the last `tail` frames of `left` (from frame `left_start`)
+    crossfaded into the first `head` frames of `right`, as exactly `frames`
+    frames starting at timestamp zero.
+    """
+    # xfade measures its offset from the first left frame, which the seek
+    # leaves half a frame in; setpts then starts the window at zero
+    graph = (
+        f"[1:v]trim=end_frame={head}[right];"
+        f"[0:v][right]xfade=transition=fade:duration={fade}"
+        f":offset={tail / fps - fade:.6f},setpts=PTS-STARTPTS[v]"
+    )
+    v_out = "v"
+    upload = profile.upload_filter()
+    if upload:
+        graph += f";[v]{upload}[vout]"
+        v_out = "vout"
+
+    argv: List[Arg] = tool_argv(settings.ffmpeg_cmd) + ["-y"] + profile.input_args()
+    argv += ["-ss", f"{(left_start - 0.5) / fps:.6f}", "-i", left]
+    argv += ["-t", f"{(head + 0.5) / fps:.6f}", "-i", right]
+    argv += ["-filter_complex", graph, "-map", f"[{v_out}]"]
+    argv += profile.output_args() + ["-x264-params", "repeat-headers=1"]
+    # An exact rational rate, so 29.97 stays 30000/1001 through the timebases
+    rate = Fraction(fps).limit_denominator(1001)
+    argv += ["-r", str(rate), "-frames:v", str(frames), "-an"]
+    argv += ["-f", "nut", output]
+    return argv
+
+
+def _audio_argv(
+    parts: Sequence[Path],
+    durations: Sequence[float],
+    fade: float,
+    sample_rate: Optional[int],
+    output: Path,
+) -> List[Arg]:
+    """Crossfades the clips' audio exactly as the reencode path does."""
+    graph, _, a_out = xfade_graph(durations, fade, video=False)
+    argv: List[Arg] = tool_argv(settings.ffmpeg_cmd) + ["-y"]
+    for part in parts:
+        argv += ["-i", part]
+    argv += ["-filter_complex", graph, "-map", f"[{a_out}]", "-c:a", "aac"]
+    if sample_rate:
+        argv += ["-ar", sample_rate]
+    argv += [output]
+    return argv
+
+
+def copyable(packets: Sequence[Packet], start: int, frames: int, fps: float) -> bool:
+    """
+    True if the `frames` packets from keyframe number `start` on, in decode
+    order, are exactly frames start..start+frames-1, so a stream copy of
+    them needs nothing from outside (open GOPs fail this).
+    """
+    numbers = [round(pts * fps) for pts, _, _ in packets]
+    if start not in numbers:
+        return False
+    first = numbers.index(start)
+    body = numbers[first : first + frames]
+    return packets[first][2] and sorted(body) == list(range(start, start + frames))
+
+
+def joined_cleanly(path: Path, frames: int, fps: float) -> bool:
+    """
+    True if a file's video has exactly `frames` packets with strictly
+    increasing decode timestamps and presentation timestamps one frame
+    apart (no piece overlaps or leaves a gap after the previous one), and
+    decodes to that many frames without a single decoder complaint.
+    """
+    packets = video_packets(path)
+    if len(packets) != frames:
+        return False
+    dts = [d for _, d, _ in packets]
+    pts = sorted(p for p, _, _ in packets)
+    if not all(a < b for a, b in zip(dts, dts[1:])) or not all(
+        0.5 < (b - a) * fps < 1.5 for a, b in zip(pts, pts[1:])
+    ):
+        return False
+    # Timestamps can't show e.g. an open GOP that needs frames from before
+    # its cut; decoding can. framecrc prints one line per decoded frame.
+    argv = tool_argv(settings.ffmpeg_cmd) + ["-v", "error", "-i", path]
+    argv += ["-map", "0:v:0", "-f", "framecrc", "-"]
+    result = run_command(argv, capture=True, quiet=True, check=False)
+    decoded = [line for line in result.stdout.splitlines() if not line.startswith("#")]
+    return (
+        result.returncode == 0 and not result.stderr.strip() and len(decoded) == frames
+    )
+
+
+def stitch_with_transitions(
+    parts: Sequence[Path],
+    infos: Sequence[MediaInfo],
+    packets: Sequence[Sequence[Packet]],
+    cuts: Sequence[Cut],
+    output: Path,
+    fade: float,
+    profile: EncoderProfile,
+    quiet: bool = False,
+) -> bool:
+    """
+    Copies each clip's video body and re-encodes only the short windows
+    around the boundaries, from the last keyframe before each fade to the
+    first keyframe after it. Every piece is cut to a whole number of frames
+    and carries its codec headers in-band, so the pieces concatenate back to
+    back without re-encoding. The audio is crossfaded in one pass, which is
+    cheap next to video and avoids AAC frame overhang at the joins.
+
+    `packets` are each clip's video packets (see probe.video_packets).
+    Returns False, leaving no output, if a body can't be copied on its own,
+    ffmpeg fails on any piece, or the joined video doesn't come out
+    frame-exact with clean timestamps; the caller should re-encode instead.
+    """
+    fps = infos[0].fps
+    if not fps:
+        return False
+    # Frame numbers of each clip's body start and end keyframes
+    bounds = [(round(c.start * fps), round(c.end * fps)) for c in cuts]
+    if not all(
+        copyable(p, start, end - start, fps)
+        for p, (start, end) in zip(packets, bounds)
+        if end > start
+    ):
+        return False
+    drop = math.floor(fade * fps + 1e-6)
+
+    # A piece ffmpeg can't cut or encode is just another reason to re-encode
+    try:
+        with tempfile.TemporaryDirectory(dir=output.parent, prefix=".stitch-") as tmp:
+            tmp_dir = Path(tmp)
+            pieces: List[Tuple[Path, int]] = []
+            for i, (clip, (start, end)) in enumerate(zip(parts, bounds)):
+                if end > start:
+                    body = tmp_dir / f"body_{i}.nut"
+                    run_command(
+                        _copy_body_argv(clip, start, end - start, fps, body),
+                        quiet=quiet,
+                    )
+                    pieces.append((body, end - start))
+                if i + 1 < len(parts):
+                    tail = len(packets[i]) - end
+                    head = bounds[i + 1][0]
+                    # xfade drops the whole frames that fall inside the fade
+                    frames = tail + head - drop
+                    window = tmp_dir / f"transition_{i}.nut"
+                    run_command(
+                        _transition_argv(
+                            clip,
+                            end,
+                            tail,
+                            parts[i + 1],
+                            head,
+                            fps,
+                            fade,
+                            frames,
+                            profile,
+                            window,
+                        ),
+                        quiet=quiet,
+                    )
+                    pieces.append((window, frames))
+
+            audio = tmp_dir / "audio.m4a"
+            run_command(
+                _audio_argv(
+                    parts,
+                    [i.duration for i in infos],
+                    fade,
+                    infos[0].sample_rate,
+                    audio,
+                ),
+                quiet=quiet,
+            )
+
+            # Declared durations are exact frame counts, so each piece starts
+            # the frame after the previous one ends
+            list_file = tmp_dir / "pieces.txt"
+            list_file.write_text(
+                "".join(f"file '{p.name}'\nduration {n / fps:.6f}\n" for p, n in pieces)
+            )
+            run_command(
+                tool_argv(settings.ffmpeg_cmd)
+                + ["-y", "-f", "concat", "-safe", "0", "-i", list_file, "-i", audio]
+                + ["-map", "0:v", "-map", "1:a", "-c", "copy"]
+                + ["-movflags", "+faststart", output],
+                quiet=quiet,
+            )
+    except subprocess.CalledProcessError:
+        output.unlink(missing_ok=True)
+        return False
+
+    if joined_cleanly(output, sum(n for _, n in pieces), fps):
+        return True
+    output.unlink(missing_ok=True)
+    return False
+
+
+def _reencode_pass(
+    parts: Sequence[Path],
+    durations: Sequence[float],
+    output: Path,
+    fade: float,
+    crossfade: bool,
+    profile: EncoderProfile,
+    quiet: bool,
+) -> None:
+    if crossfade:
+        graph, v_out, a_out = xfade_graph(durations, fade)
+    else:
+        streams = "".join(f"[{i}:v][{i}:a]" for i in range(len(parts)))
+        graph, v_out, a_out = f"{streams}concat=n={len(parts)}:v=1:a=1[v][a]", "v", "a"
+    upload = profile.upload_filter()
+    if upload:
+        graph += f";[{v_out}]{upload}[vout]"
+        v_out = "vout"
+
+    argv: List[Arg] = tool_argv(settings.ffmpeg_cmd) + ["-y"] + profile.input_args()
+    for part in parts:
+        argv += ["-i", part]
+    argv += ["-filter_complex", graph, "-map", f"[{v_out}]", "-map", f"[{a_out}]"]
+    argv += profile.output_args() + [output]
+    run_command(argv, quiet=quiet)
+
+
+def reencode_stitch(
+    parts: Sequence[Path],
+    durations: Sequence[float],
+    output: Path,
+    fade: float,
+    crossfade: bool,
+    profile: EncoderProfile,
+    quiet: bool = False,
+    max_inputs: Optional[int] = None,
+) -> None:
+    """
+    Decodes the clips and encodes the joined result. At most max_inputs
+    clips are opened by one ffmpeg process; longer lists are merged in
+    groups into near-lossless intermediates, which are then merged the same
+    way until one pass can take them all.
+    """
+    max_inputs = max(2, max_inputs or settings.stitch_max_inputs)
+    if len(parts) <= max_inputs:
+        _reencode_pass(parts, durations, output, fade, crossfade, profile, quiet)
+        return
+
+    overlap = fade if crossfade else 0.0
+    group_count = math.ceil(len(parts) / max_inputs)
+    size = math.ceil(len(parts) / group_count)
+    with tempfile.TemporaryDirectory(dir=output.parent, prefix=".stitch-") as tmp:
+        merged: List[Path] = []
+        merged_durations: List[float] = []
+        for n, start in enumerate(range(0, len(parts), size)):
+            group = parts[start : start + size]
+            group_durations = durations[start : start + size]
+            if len(group) == 1:
+                merged.append(group[0])
+                merged_durations.append(group_durations[0])
+                continue
+            target = Path(tmp) / f"pass_{n}.mp4"
+            _reencode_pass(
+                group,
+                group_durations,
+                target,
+                fade,
+                crossfade,
+                INTERMEDIATE_PROFILE,
+                quiet,
+            )
+            merged.append(target)
+            merged_durations.append(sum(group_durations) - overlap * (len(group) - 1))
+        reencode_stitch(
+            merged,
+            merged_durations,
+            output,
+            fade,
+            crossfade,
+            profile,
+            quiet=quiet,
+            max_inputs=max_inputs,
+        )
+
+
+def stitch_clips(
+    parts: Sequence[Path],
+    output: Path,
+    fade: float = DEFAULT_FADE,
+    crossfade: bool = True,
+    profile: Optional[EncoderProfile] = None,
+    quiet: bool = False,
+) -> str:
+    """
+    Joins clips into one video, re-encoding as little as possible:
+
+    - "copy": compatible clips without crossfade are concatenated as-is
+    - "transitions": compatible clips are copied and only the crossfade
+      windows are re-encoded, if the pieces join frame-exact
+    - "reencode": anything else goes through one full filter graph
+
+    Returns the mode that was used.
+    """
+    if not parts:
+        raise ValueError("No clips to stitch")
+    profile = profile or get_profile()
+    if len(parts) == 1:
+        run_command(
+            tool_argv(settings.ffmpeg_cmd)
+            + ["-y", "-i", parts[0], "-c", "copy", output],
+            quiet=quiet,
+        )
+        return "copy"
+
+    infos = probe_many(list(parts))
+    if compatible(infos):
+        if not crossfade:
+            concat_copy(parts, output, quiet=quiet)
+            return "copy"
+        # Transition windows are re-encoded with libx264, so the copied
+        # bodies must already be H.264/AAC for the pieces to join cleanly
+        if (
+            profile.codec == "libx264"
+            and infos[0].video_codec == "h264"
+            and infos[0].audio_codec == "aac"
+        ):
+            fps = infos[0].fps or 0.0
+            packets = [video_packets(p) for p in parts]
+            cuts = plan_cuts(
+                [len(p) / fps if fps else 0.0 for p in packets],
+                [keyframe_times(p) for p in parts],
+                fade,
+            )
+            # Falls through to a full re-encode if the pieces can't be
+            # joined frame-exact
+            if cuts is not None and stitch_with_transitions(
+                parts, infos, packets, cuts, output, fade, profile, quiet=quiet
+            ):
+                return "transitions"
+
+    reencode_stitch(
+        parts,
+        [i.duration for i in infos],
+        output,
+        fade,
+        crossfade,
+        profile,
+        quiet=quiet,
+    )
+    return "reencode"
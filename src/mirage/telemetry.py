@@ -0,0 +1,289 @@
+import contextvars
+import hashlib
+import json
+import math
+import os
+import re
+import resource
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import mirage.tracing as tracing
+
+TIMINGS_NAME = "timings.jsonl"
+
+R = TypeVar("R")
+
+# Per-segment stage names (part_3, segment_12) are aggregated as one stage
+_SEGMENT_INDEX = re.compile(r"(?<=_)\d+$")
+# Span attributes that nested spans (e.g. a segment's tool calls) inherit
+_INHERITED = ("segment", "prompt_hash")
+
+
+def _span_id() -> str:
+    return os.urandom(8).hex()
+
+
+def prompt_hash(prompt: str) -> str:
+    """Short, stable identifier for a prompt, so traces don't carry the text."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class Span:
+    name: str
+    span_id: str
+    attrs: Dict[str, Any] = field(default_factory=dict)
+
+
+class RunRecorder:
+    """
+    Collects the timing records of one command run. Records made before the
+    run knows its output directory are held until attach() is called.
+
+    Every record is also a span of the run's trace: run_id is the trace id
+    and span_id the root span, which top-level stages hang from.
+    """
+
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.run_id = uuid.uuid4().hex
+        self.span_id = _span_id()
+        self.path: Optional[Path] = None
+        # (thread ident, record) of everything written, for the trace export
+        self.spans: List[Tuple[int, Dict[str, Any]]] = []
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def attach(self, output_dir: Path) -> None:
+        with self._lock:
+            self.path = output_dir / TIMINGS_NAME
+            pending, self._pending = self._pending, []
+            self._append(pending)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        record = {"run": self.run_id, "command": self.command, **record}
+        with self._lock:
+            self.spans.append((threading.get_ident(), record))
+            if self.path is None:
+                self._pending.append(record)
+            else:
+                self._append([record])
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        if not records or self.path is None:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+
+
+_run: contextvars.ContextVar[Optional[RunRecorder]] = contextvars.ContextVar(
+    "mirage_run", default=None
+)
+_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "mirage_span", default=None
+)
+
+
+def in_context(func: Callable[..., R]) -> Callable[..., R]:
+    """
+    Wraps func so that, called from a worker thread, it still sees the
+    caller's run and stage (thread pools don't propagate contextvars).
+    """
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(func, *args, **kwargs)
+
+
+@contextmanager
+def run(command: str) -> Iterator[RunRecorder]:
+    """
+    Records one command run, ending with a `run` record for its total time.
+    Once the run has an output directory its trace is exported there too.
+    """
+    recorder = RunRecorder(command)
+    token = _run.set(recorder)
+    start, started_at = time.perf_counter(), time.time()
+    ok = False
+    try:
+        yield recorder
+        ok = True
+    finally:
+        recorder.write(
+            {
+                "kind": "run",
+                "name": command,
+                "span": recorder.span_id,
+                "ts": started_at,
+                "wall": round(time.perf_counter() - start, 4),
+                "ok": ok,
+            }
+        )
+        _run.reset(token)
+        if recorder.path is not None:
+            tracing.export(recorder)
+
+
+def attach(output_dir: Path) -> None:
+    """Directs the current run's records to <output_dir>/timings.jsonl."""
+    recorder = _run.get()
+    if recorder is not None:
+        recorder.attach(output_dir)
+
+
+def _child_of(parent: Optional[Span], attrs: Dict[str, Any]) -> Dict[str, Any]:
+    """Span fields linking a new record to its parent, plus inherited attributes."""
+    recorder = _run.get()
+    root = recorder.span_id if recorder is not None else None
+    if parent is not None:
+        for key in _INHERITED:
+            if key in parent.attrs:
+                attrs.setdefault(key, parent.attrs[key])
+    return {
+        "parent": parent.name if parent else None,
+        "parent_span": parent.span_id if parent else root,
+    }
+
+
+@contextmanager
+def stage(name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Times a Python stage. Yields its attribute dict so the body can add to
+    it (e.g. cache_hit). Child CPU is taken from RUSAGE_CHILDREN, so it
+    covers every child process that finished during the stage.
+    """
+    recorder = _run.get()
+    index = _SEGMENT_INDEX.search(name)
+    if index:
+        attrs.setdefault("segment", int(index.group()))
+    span = Span(name, _span_id(), attrs)
+    links = _child_of(_span.get(), attrs)
+    token = _span.set(span)
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start, started_at = time.perf_counter(), time.time()
+    ok = False
+    try:
+        yield attrs
+        ok = True
+    finally:
+        _span.reset(token)
+        if recorder is not None:
+            after = resource.getrusage(resource.RUSAGE_CHILDREN)
+            recorder.write(
+                {
+                    "kind": "stage",
+                    "name": name,
+                    "span": span.span_id,
+                    **links,
+                    "ts": started_at,
+                    "wall": round(time.perf_counter() - start, 4),
+                    "cpu": round(
+                        (after.ru_utime - before.ru_utime)
+                        + (after.ru_stime - before.ru_stime),
+                        4,
+                    ),
+                    "ok": ok,
+                    **attrs,
+                }
+            )
+
+
+def record_process(
+    name: str,
+    started_at: float,
+    wall: float,
+    usage: Optional[resource.struct_rusage],
+    exit_code: int,
+    outputs: Optional[Sequence[Path]] = None,
+) -> None:
+    """Records one external tool call with its own rusage (from wait4)."""
+    recorder = _run.get()
+    if recorder is None:
+        return
+    output_bytes = None
+    if outputs:
+        output_bytes = sum(p.stat().st_size for p in outputs if p.exists())
+    attrs: Dict[str, Any] = {}
+    links = _child_of(_span.get(), attrs)
+    recorder.write(
+        {
+            "kind": "process",
+            "name": name,
+            "span": _span_id(),
+            **links,
+            "ts": started_at,
+            "wall": round(wall, 4),
+            "cpu": round(usage.ru_utime + usage.ru_stime, 4) if usage else None,
+            "max_rss_kb": usage.ru_maxrss if usage else None,
+            "exit_code": exit_code,
+            "output_bytes": output_bytes,
+            "ok": exit_code == 0,
+            **attrs,
+        }
+    )
+
+
+def load_records(paths: Sequence[Path]) -> List[Dict[str, Any]]:
+    records = []
+    for path in paths:
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100) of a non-empty sequence."""
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q / 100
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def aggregate(records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Per (kind, name): count, failures, p50/p95 wall time, p50 CPU, peak RSS."""
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for record in records:
+        if "wall" in record:
+            name = _SEGMENT_INDEX.sub("N", record["name"])
+            groups.setdefault((record["kind"], name), []).append(record)
+
+    rows = []
+    for (kind, name), group in sorted(groups.items()):
+        walls = [r["wall"] for r in group]
+        cpus = [r["cpu"] for r in group if r.get("cpu") is not None]
+        rss = [r["max_rss_kb"] for r in group if r.get("max_rss_kb")]
+        rows.append(
+            {
+                "kind": kind,
+                "name": name,
+                "count": len(group),
+                "failures": sum(1 for r in group if not r.get("ok", True)),
+                "p50": percentile(walls, 50),
+                "p95": percentile(walls, 95),
+                "cpu_p50": percentile(cpus, 50) if cpus else None,
+                "max_rss_kb": max(rss) if rss else None,
+            }
+        )
+    return rows
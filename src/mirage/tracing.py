@@ -0,0 +1,142 @@
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
+
+import requests  # type: ignore
+from rich.console import Console
+
+from mirage.config import settings
+
+if TYPE_CHECKING:
+    from mirage.telemetry import RunRecorder
+
+console = Console()
+
+OTLP_NAME = "trace.json"
+PERFETTO_NAME = "trace.perfetto.json"
+
+# Record fields that describe the span itself rather than being attributes
+_STRUCTURAL = {
+    "run",
+    "command",
+    "kind",
+    "name",
+    "span",
+    "parent_span",
+    "parent",
+    "ts",
+    "wall",
+    "ok",
+}
+
+# OTLP span kinds: stages are internal, external tool calls are clients
+_SPAN_KIND = {"run": 1, "stage": 1, "process": 3}
+_STATUS_ERROR = 2
+
+
+def _value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        # OTLP/JSON encodes 64-bit integers as strings
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _attributes(record: Dict[str, Any]) -> Dict[str, Any]:
+    attrs = {k: v for k, v in record.items() if k not in _STRUCTURAL and v is not None}
+    if record["kind"] == "process":
+        attrs["tool"] = record["name"]
+    return attrs
+
+
+def otlp_payload(
+    spans: List[Tuple[int, Dict[str, Any]]], trace_id: str, command: str
+) -> Dict[str, Any]:
+    """Builds an OTLP/JSON ExportTraceServiceRequest for one run."""
+    otlp_spans = []
+    for _, record in spans:
+        start = int(record["ts"] * 1e9)
+        span: Dict[str, Any] = {
+            "traceId": trace_id,
+            "spanId": record["span"],
+            "name": record["name"],
+            "kind": _SPAN_KIND.get(record["kind"], 1),
+            "startTimeUnixNano": str(start),
+            "endTimeUnixNano": str(start + int(record["wall"] * 1e9)),
+            "attributes": [
+                {"key": k, "value": _value(v)} for k, v in _attributes(record).items()
+            ],
+            "status": {} if record.get("ok", True) else {"code": _STATUS_ERROR},
+        }
+        if record.get("parent_span"):
+            span["parentSpanId"] = record["parent_span"]
+        otlp_spans.append(span)
+
+    resource = [
+        {"key": "service.name", "value": {"stringValue": "mirage"}},
+        {"key": "mirage.command", "value": {"stringValue": command}},
+    ]
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": resource},
+                "scopeSpans": [{"scope": {"name": "mirage"}, "spans": otlp_spans}],
+            }
+        ]
+    }
+
+
+def perfetto_trace(spans: List[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+    """
+    Builds a Chrome trace-event file (what Perfetto and chrome://tracing
+    load). Spans are laid out per thread, so concurrent segments show up as
+    parallel tracks under the stage that started them.
+    """
+    tids: Dict[int, int] = {}
+    events = []
+    for thread, record in spans:
+        tid = tids.setdefault(thread, len(tids) + 1)
+        events.append(
+            {
+                "name": record["name"],
+                "cat": record["kind"],
+                "ph": "X",
+                "ts": record["ts"] * 1e6,
+                "dur": record["wall"] * 1e6,
+                "pid": 1,
+                "tid": tid,
+                "args": _attributes(record),
+            }
+        )
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export(recorder: "RunRecorder") -> None:
+    """
+    Writes the run's trace next to its timings and, if an OTLP endpoint is
+    configured, sends it there. Export problems never fail the run.
+    """
+    if not settings.trace_enabled or recorder.path is None:
+        return
+    output_dir = recorder.path.parent
+    payload = otlp_payload(recorder.spans, recorder.run_id, recorder.command)
+    try:
+        (output_dir / OTLP_NAME).write_text(json.dumps(payload), encoding="utf-8")
+        (output_dir / PERFETTO_NAME).write_text(
+            json.dumps(perfetto_trace(recorder.spans)), encoding="utf-8"
+        )
+    except OSError as e:
+        console.print(f"[yellow]Warning: could not write trace: {e}[/yellow]")
+
+    if settings.trace_otlp_endpoint:
+        try:
+            response = requests.post(
+                settings.trace_otlp_endpoint,
+                json=payload,
+                timeout=settings.trace_export_timeout,
+            )
+            response.raise_for_status()
+        except requests.RequestException as e:
+            console.print(f"[yellow]Warning: trace export failed: {e}[/yellow]")
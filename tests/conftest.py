@@ -0,0 +1,28 @@
+import pytest
+
+import mirage.main
+import mirage.media
+import mirage.runner
+from mirage.cache import ArtifactCache
+from mirage.config import settings
+from mirage.governor import Governor
+
+
+@pytest.fixture(autouse=True)
+def isolated_state(tmp_path_factory, monkeypatch):
+    """
+    Points the process-wide governor and artifact cache at a scratch
+    directory, so tests never take slots or rate-limit tokens from (or
+    replay renders into) real mirage runs on this machine.
+    """
+    root = tmp_path_factory.mktemp("mirage-state")
+    monkeypatch.setattr(
+        mirage.runner,
+        "governor",
+        Governor(
+            root / "governor", settings.tool_concurrency, settings.tool_rate_limits
+        ),
+    )
+    cache = ArtifactCache(root / "cache", settings.cache_max_size_mb * 1024 * 1024)
+    monkeypatch.setattr(mirage.media, "artifact_cache", cache)
+    monkeypatch.setattr(mirage.main, "artifact_cache", cache)
@@ -0,0 +1,51 @@
+import pytest
+
+from mirage.align import align_segments, load_timings, parse_silences, save_timings
+
+SILENCEDETECT_LOG = """
+[silencedetect @ 0x5581] silence_start: -0.0123
+[silencedetect @ 0x5581] silence_end: 0.31 | silence_duration: 0.32
+[silencedetect @ 0x5581] silence_start: 4.2
+[silencedetect @ 0x5581] silence_end: 4.8 | silence_duration: 0.6
+size=N/A time=00:00:10.00 bitrate=N/A speed= 500x
+"""
+
+
+def test_parse_silences():
+    assert parse_silences(SILENCEDETECT_LOG) == [(0.0, 0.31), (4.2, 4.8)]
+
+
+def test_boundaries_snap_to_nearby_pauses():
+    # Character counts suggest a split at 5.0s; the speaker actually paused at 4.5s
+    timings = align_segments(["a" * 50, "b" * 50], 10.0, [(4.2, 4.8)])
+
+    assert [(t.start, t.end) for t in timings] == [(0.0, 4.5), (4.5, 10.0)]
+
+
+def test_drift_does_not_accumulate():
+    # Speech is slower than the character estimate for the first segment; the
+    # second boundary is estimated from where the first one actually landed.
+    narrations = ["a" * 30, "b" * 30, "c" * 30]
+    silences = [(7.3, 7.7), (15.6, 16.0)]
+
+    timings = align_segments(narrations, 20.0, silences)
+
+    assert timings[1].start == pytest.approx(7.5)
+    assert timings[2].start == pytest.approx(15.8)
+    assert timings[-1].end == 20.0
+
+
+def test_falls_back_to_estimate_without_pauses():
+    timings = align_segments(["a" * 10, "b" * 30], 8.0, [])
+
+    assert timings[0].duration == pytest.approx(2.0)
+    assert sum(t.duration for t in timings) == pytest.approx(8.0)
+
+
+def test_timings_round_trip(tmp_path):
+    timings = align_segments(["x", "y"], 2.0, [])
+    path = tmp_path / "alignment.json"
+
+    save_timings(path, timings)
+
+    assert load_timings(path) == timings
@@ -0,0 +1,57 @@
+import json
+
+import pytest
+
+from mirage.batch import job_argv, load_jobs, run_batch
+from mirage.config import settings
+from mirage.main import build_parser, run_job_argv
+
+
+def test_job_argv_maps_fields_to_flags():
+    job = {"command": "deep-news", "topic": "Fusion", "jobs": 6, "silent": True}
+    assert job_argv(job) == ["deep-news", "Fusion", "--jobs", "6", "--silent"]
+
+
+def test_job_argv_skips_false_flags_and_passes_raw_argv():
+    assert job_argv({"command": "weather", "location": "Kyoto", "video": False}) == [
+        "weather",
+        "--location",
+        "Kyoto",
+    ]
+    assert job_argv({"argv": ["story", "A tale", "--cinema"]}) == [
+        "story",
+        "A tale",
+        "--cinema",
+    ]
+
+
+def test_job_argv_rejects_unknown_commands():
+    with pytest.raises(ValueError):
+        job_argv({"command": "character", "action": "remove"})
+
+
+def test_load_jobs_reads_jsonl(tmp_path):
+    jobs_file = tmp_path / "jobs.jsonl"
+    jobs = [{"command": "weather"}, {"command": "research", "topic": "Bees"}]
+    jobs_file.write_text("\n".join(json.dumps(j) for j in jobs) + "\n\n")
+
+    assert load_jobs(jobs_file) == jobs
+
+
+def test_failed_commands_counted_as_failures(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "output_base_dir", tmp_path / "out")
+    monkeypatch.setattr(settings, "character_library_dir", tmp_path / "chars")
+    missing = str(tmp_path / "missing.txt")
+    jobs = [
+        {"command": "deep-news", "topic": "Tides", "upload": missing},
+        {"command": "summary", "topic": "Tides", "character": "ghost"},
+    ]
+
+    results = run_batch(jobs, build_parser(), 2)
+    assert "Upload file not found" in results[0].error
+    assert "Character not found" in results[1].error
+
+    # Daemon jobs exit non-zero for the same failures
+    with pytest.raises(SystemExit) as exit_info:
+        run_job_argv(["deep-news", "Tides", "--upload", missing])
+    assert exit_info.value.code == 1
@@ -0,0 +1,137 @@
+import multiprocessing
+import sys
+import time
+
+from mirage.cache import ArtifactCache
+from mirage.media import CharacterRepository, cache_key_args, run_cached
+
+
+def make_cache(tmp_path, max_bytes=1024 * 1024):
+    return ArtifactCache(tmp_path / "cache", max_bytes)
+
+
+def test_key_depends_on_args_and_input_content(tmp_path):
+    cache = make_cache(tmp_path)
+    image = tmp_path / "in.png"
+    image.write_bytes(b"one")
+
+    key_a = cache.key("vidius", ["prompt"], [image])
+    assert key_a == cache.key("vidius", ["prompt"], [image])
+    assert key_a != cache.key("vidius", ["other prompt"], [image])
+    assert key_a != cache.key("lumina", ["prompt"], [image])
+
+    image.write_bytes(b"two!")
+    assert key_a != cache.key("vidius", ["prompt"], [image])
+
+
+def test_store_then_fetch_restores_outputs(tmp_path):
+    cache = make_cache(tmp_path)
+    mp3 = tmp_path / "run1" / "news.mp3"
+    txt = tmp_path / "run1" / "news.txt"
+    mp3.parent.mkdir()
+    mp3.write_bytes(b"audio")
+    txt.write_text("script")
+
+    key = cache.key("gen-tts", ["--mode", "news"])
+    assert not cache.fetch(key, [mp3, txt])
+    cache.store(key, [mp3, txt])
+
+    out_mp3 = tmp_path / "run2" / "news.mp3"
+    out_txt = tmp_path / "run2" / "news.txt"
+    assert cache.fetch(key, [out_mp3, out_txt])
+    assert out_mp3.read_bytes() == b"audio"
+    assert out_txt.read_text() == "script"
+    assert cache.stats().entries == 1
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=10)
+    keys = []
+    for name in ["a", "b"]:
+        src = tmp_path / f"{name}.png"
+        src.write_bytes(b"x" * 6)
+        key = cache.key("lumina", [name])
+        cache.store(key, [src])
+        keys.append(key)
+
+    # Storing the second entry exceeded the cap, evicting the first
+    assert not cache.fetch(keys[0], [tmp_path / "out_a.png"])
+    assert cache.fetch(keys[1], [tmp_path / "out_b.png"])
+
+    assert cache.prune(0) == 1
+    assert cache.stats().entries == 0
+
+
+def test_writers_replace_restored_outputs_instead_of_the_cached_object(
+    tmp_path, monkeypatch
+):
+    cache = make_cache(tmp_path)
+    monkeypatch.setattr("mirage.media.artifact_cache", cache)
+    monkeypatch.setattr("mirage.media.settings.cache_enabled", True)
+    src = tmp_path / "render.png"
+    src.write_bytes(b"cached render")
+    key = cache.key("lumina", ["a harbour"])
+    cache.store(key, [src])
+
+    base = tmp_path / "run" / "base.png"
+    assert cache.fetch(key, [base]) and base.stat().st_nlink == 2
+
+    # A rerun of the tool with other arguments writes to the same path
+    script = f"open({str(base)!r}, 'wb').write(b'fresh render')"
+    run_cached([sys.executable, "-c", script], "lumina", [base])
+    assert base.read_bytes() == b"fresh render"
+
+    # So does casting a character onto a restored base image
+    assert cache.fetch(key, [base])
+    face = tmp_path / "face.png"
+    face.write_bytes(b"face")
+    repo = CharacterRepository(tmp_path / "chars")
+    repo.add("bob", face, {})
+    repo.cast("bob", base)
+    assert base.read_bytes() == b"face"
+
+    restored = tmp_path / "again.png"
+    assert cache.fetch(key, [restored])
+    assert restored.read_bytes() == b"cached render"
+
+
+def hold_shared_lock(cache, ready, hold):
+    with cache._locked(shared=True):
+        ready.write_text("held")
+        time.sleep(hold)
+
+
+def test_prune_waits_for_other_processes(tmp_path):
+    cache = make_cache(tmp_path)
+    src = tmp_path / "a.png"
+    src.write_bytes(b"x")
+    cache.store(cache.key("lumina", ["a"]), [src])
+
+    ready = tmp_path / "ready"
+    ctx = multiprocessing.get_context("fork")
+    proc = ctx.Process(target=hold_shared_lock, args=(cache, ready, 0.5))
+    proc.start()
+    deadline = time.monotonic() + 10
+    while not ready.exists() and proc.is_alive() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert ready.exists()
+    start = time.monotonic()
+    assert cache.prune(0) == 1
+    assert time.monotonic() - start > 0.3
+    proc.join()
+
+
+def test_cache_key_covers_the_command_but_not_where_files_go(tmp_path):
+    def key_args(command, run):
+        out = tmp_path / run / "voice.mp3"
+        argv = command.split() + ["--input-file", tmp_path / run / "news.md"]
+        argv += ["--output-dir", out.parent, "--filename", out.name]
+        return cache_key_args(argv, [out], [tmp_path / run / "news.md"])
+
+    assert key_args("gen-tts --mode news", "a") == key_args("gen-tts --mode news", "b")
+    assert key_args("gen-tts --mode news", "a") != key_args(
+        "gen-tts --voice x --mode news", "a"
+    )
+    assert cache_key_args(["gen-tts"], [], input_bytes=b"Tides") != cache_key_args(
+        ["gen-tts"], [], input_bytes=b"Moons"
+    )
@@ -0,0 +1,97 @@
+import sys
+import time
+
+from mirage import daemon
+from mirage.daemon import Daemon, JobStore
+
+
+def run_until(d: Daemon, predicate, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "daemon did not finish in time"
+        d.tick()
+        time.sleep(0.02)
+
+
+def test_job_store_queue_order_and_cancel(tmp_path):
+    store = JobStore(tmp_path)
+    first = store.submit(["story", "A"])
+    second = store.submit(["story", "B"])
+
+    assert store.cancel(second) == daemon.CANCELLED
+    job = store.claim()
+    assert job.id == first and job.state == daemon.RUNNING
+    assert store.claim() is None
+
+    assert store.cancel(first) == daemon.CANCELLING
+    store.fail_orphans()
+    assert store.get(first).state == daemon.FAILED
+    assert store.cancel(12345) is None
+    assert [j.id for j in store.jobs()] == [second, first]
+
+
+def test_daemon_runs_jobs_in_forked_workers(tmp_path):
+    store = JobStore(tmp_path)
+
+    def run_job(argv):
+        print("running", *argv)
+        if argv[0] == "fail":
+            raise RuntimeError("boom")
+
+    ok = store.submit(["ok", "1"])
+    bad = store.submit(["fail"])
+    d = Daemon(store, run_job, workers=2)
+    run_until(d, lambda: all(j.state in daemon.FINISHED for j in store.jobs()))
+
+    assert store.get(ok).state == daemon.DONE
+    assert store.get(bad).state == daemon.FAILED
+    assert "running ok 1" in store.log_path(ok).read_text()
+    assert "RuntimeError: boom" in store.log_path(bad).read_text()
+
+
+def test_daemon_cancels_running_job(tmp_path):
+    store = JobStore(tmp_path)
+    job_id = store.submit(["sleep"])
+    d = Daemon(store, lambda argv: time.sleep(30), workers=1)
+    d.tick()
+    assert store.get(job_id).state == daemon.RUNNING
+
+    store.cancel(job_id)
+    run_until(d, lambda: store.get(job_id).state == daemon.CANCELLED)
+    assert store.get(job_id).exit_code == 143
+
+
+def test_job_exit_status(tmp_path):
+    store = JobStore(tmp_path)
+
+    def run_job(argv):
+        if argv[0] == "exit":
+            sys.exit(*[int(a) for a in argv[1:]])
+
+    clean = store.submit(["exit"])
+    coded = store.submit(["exit", "3"])
+    d = Daemon(store, run_job, workers=2)
+    run_until(d, lambda: all(j.state in daemon.FINISHED for j in store.jobs()))
+
+    # A bare sys.exit() is success
+    assert (store.get(clean).state, store.get(clean).exit_code) == (daemon.DONE, 0)
+    assert (store.get(coded).state, store.get(coded).exit_code) == (daemon.FAILED, 3)
+
+
+def test_daemon_lock_follows_store_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon.signal, "signal", lambda *args: None)
+    store = JobStore(tmp_path / "queue")
+    other = tmp_path / "other"
+    other.mkdir()
+    d = Daemon(store, lambda argv: None, workers=1)
+    seen = []
+
+    def tick():
+        seen.append((daemon.is_running(store.root), daemon.is_running(other)))
+        d.stopping = True
+
+    d.tick = tick
+    d.serve()
+    assert seen == [(True, False)]
+    assert (store.root / "daemon.lock").exists()
+    assert not daemon.is_running(store.root)
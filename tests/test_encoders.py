@@ -0,0 +1,36 @@
+import pytest
+
+import mirage.encoders as encoders
+from mirage.encoders import EncoderProfile, get_profile
+
+
+def test_draft_profile_uses_fast_preset():
+    args = get_profile("draft").output_args(tune="stillimage")
+
+    assert args[:4] == ["-c:v", "libx264", "-preset", "ultrafast"]
+    assert "-tune" in args and args[-2:] == ["-pix_fmt", "yuv420p"]
+
+
+def test_publish_profile_enables_faststart():
+    assert "+faststart" in get_profile("publish").output_args()
+
+
+def test_vaapi_profile_uploads_frames():
+    profile = EncoderProfile(name="vaapi", codec="h264_vaapi", qp=23)
+
+    assert profile.input_args()[0] == "-vaapi_device"
+    assert profile.upload_filter() == "format=nv12,hwupload"
+    # Software-only options are left out
+    assert "-tune" not in profile.output_args(tune="stillimage")
+    assert "-pix_fmt" not in profile.output_args()
+
+
+def test_missing_hardware_falls_back_to_standard(monkeypatch):
+    monkeypatch.setattr(encoders, "hardware_available", lambda codec: False)
+
+    assert get_profile("qsv").name == "standard"
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        get_profile("ultra")
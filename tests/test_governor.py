@@ -0,0 +1,57 @@
+import multiprocessing
+import time
+
+from mirage.governor import Governor
+
+
+def hold_slot(root, log, hold):
+    governor = Governor(root, {"vidius": 2}, {})
+    with governor.slot("vidius"):
+        with open(log, "a") as f:
+            f.write(f"start {time.time()}\n")
+        time.sleep(hold)
+        with open(log, "a") as f:
+            f.write(f"end {time.time()}\n")
+
+
+def test_slots_are_shared_across_processes(tmp_path):
+    log = tmp_path / "log.txt"
+    ctx = multiprocessing.get_context("fork")
+    procs = [
+        ctx.Process(target=hold_slot, args=(tmp_path / "gov", log, 0.3))
+        for _ in range(4)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+
+    events = sorted(
+        (float(t), kind)
+        for kind, t in (line.split() for line in log.read_text().splitlines())
+    )
+    running = peak = 0
+    for _, kind in events:
+        running += 1 if kind == "start" else -1
+        peak = max(peak, running)
+    assert peak == 2
+
+
+def test_token_bucket_paces_calls(tmp_path):
+    governor = Governor(tmp_path, {"lumina": 2}, {"lumina": 600})  # 10 per second
+    start = time.monotonic()
+    for _ in range(6):
+        with governor.slot("lumina"):
+            pass
+    # Two tokens are available up front, the other four refill at 0.1s each
+    assert 0.35 < time.monotonic() - start < 1.5
+
+
+def test_unlimited_tool_and_corrupt_state(tmp_path):
+    governor = Governor(tmp_path, {}, {"gen-tts": 60})
+    (tmp_path / "gen-tts.bucket").write_text("garbage")
+    with governor.slot("gen-tts"):
+        pass
+    with governor.slot("ffmpeg"):
+        pass
+    assert not (tmp_path / "ffmpeg.bucket").exists()
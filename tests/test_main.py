@@ -0,0 +1,211 @@
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+import mirage.main as main
+from mirage.config import settings
+from mirage.main import build_parser, gather_atmos
+from mirage.probe import MediaInfo
+
+FAKE_RESEARCH = """
+import sys
+out = sys.argv[sys.argv.index("--output") + 1]
+open(out, "w").write("# Tides\\nThe moon pulls the sea.\\n")
+"""
+
+# Writes the script, then holds the audio back until planning has started
+FAKE_TTS = """
+import os, sys, time
+script = sys.argv[sys.argv.index("--script-txt-out") + 1]
+audio = sys.argv[sys.argv.index("--output-file") + 1]
+open(os.path.join(os.path.dirname(audio), "tts.pid"), "w").write(str(os.getpid()))
+open(script, "w").write("Script v1")
+go = os.path.join(os.path.dirname(audio), "planned")
+deadline = time.time() + 10
+while not os.path.exists(go) and time.time() < deadline:
+    time.sleep(0.05)
+if {rewrite}:
+    open(script, "w").write("Script v2")
+open(audio, "wb").write(b"ID3 fake audio")
+"""
+
+# Earlier queries answer last; ATMOS_FAIL names a query to fail, or "all"
+FAKE_ATMOS = """
+import os, sys, time
+kind = sys.argv[1] if len(sys.argv) > 2 else "current"
+if "--hourly" in sys.argv:
+    kind = "hourly"
+delays = {"alert": 0.4, "current": 0.3, "stars": 0.2, "forecast": 0.1}
+time.sleep(delays.get(kind, 0.0))
+if os.environ.get("ATMOS_FAIL") in (kind, "all"):
+    sys.exit("atmos: service unavailable")
+print(f"== {kind} ==")
+print(" ".join(sys.argv[1:]) + " \u2600 22\u00b0C")
+"""
+
+
+@pytest.fixture
+def deep_news(tmp_path, monkeypatch):
+    """Runs deep-news with fake tools; returns what the planner saw per call."""
+
+    def run(rewrite, fail=False):
+        research = tmp_path / "deep_research.py"
+        research.write_text(FAKE_RESEARCH)
+        tts = tmp_path / "gen_tts.py"
+        tts.write_text(textwrap.dedent(FAKE_TTS.format(rewrite=rewrite)))
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(settings, "output_base_dir", tmp_path / "out")
+        monkeypatch.setattr(
+            settings, "deep_research_cmd", f"{sys.executable} {research}"
+        )
+        monkeypatch.setattr(settings, "gen_tts_cmd", f"{sys.executable} {tts}")
+        monkeypatch.setattr(settings, "tts_script_settle", 0.1)
+
+        planned = []
+
+        def fake_plan(script):
+            if fail:
+                raise RuntimeError("planner unavailable")
+            output_dir = next((tmp_path / "out").glob("DeepNews_*"))
+            planned.append((script, (output_dir / "news.mp3").exists()))
+            (output_dir / "planned").touch()
+            return [{"visual_prompt": "Waves", "narration": script}]
+
+        def fake_image(self, output, *args, **kwargs):
+            output.write_bytes(b"png")
+            return output
+
+        def fake_slideshow(slides, output, **kwargs):
+            output.write_bytes(b"mp4")
+
+        monkeypatch.setattr(main.planner, "generate_news_plan", fake_plan)
+        monkeypatch.setattr(main.SegmentRenderer, "image", fake_image)
+        monkeypatch.setattr(main, "probe", lambda p: MediaInfo(path=p, duration=3.0))
+        monkeypatch.setattr(main, "detect_silences", lambda p: [])
+        monkeypatch.setattr(main, "render_slideshow", fake_slideshow)
+
+        args = build_parser().parse_args(["deep-news", "Tides", "--silent"])
+        args.func(args)
+        return planned
+
+    return run
+
+
+def test_deep_news_plans_while_audio_is_recorded(deep_news):
+    assert deep_news(rewrite=False) == [("Script v1", False)]
+
+
+def test_deep_news_replans_when_the_voiced_script_changed(deep_news):
+    assert deep_news(rewrite=True) == [("Script v1", False), ("Script v2", True)]
+
+
+def test_deep_news_failure_stops_the_recording(deep_news, tmp_path):
+    # The fake TTS would otherwise hold the audio back for 10 seconds
+    with pytest.raises(main.CommandError, match="planner unavailable"):
+        deep_news(rewrite=False, fail=True)
+    (pid_file,) = tmp_path.glob("out/DeepNews_*/tts.pid")
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
+    assert not list(tmp_path.glob("out/DeepNews_*/news.mp3"))
+
+
+@pytest.fixture
+def atmos(tmp_path, monkeypatch):
+    script = tmp_path / "atmos.py"
+    script.write_text(FAKE_ATMOS)
+    command = [sys.executable, str(script)]
+    monkeypatch.setattr(settings, "atmos_cmd", " ".join(command))
+    return command
+
+
+def test_gather_atmos_matches_a_serial_run(atmos, tmp_path):
+    queries = [
+        ["alert", "Oslo"],
+        ["Oslo"],
+        ["stars", "Oslo"],
+        ["forecast", "Oslo"],
+        ["forecast", "Oslo", "--hourly"],
+    ]
+    serial = b"".join(
+        subprocess.run(atmos + q, capture_output=True, check=True).stdout
+        for q in queries
+    )
+    context = tmp_path / "context.txt"
+
+    gather_atmos("Oslo", context)
+    assert context.read_bytes() == serial
+
+
+def test_gather_atmos_skips_failed_queries(atmos, tmp_path, monkeypatch):
+    context = tmp_path / "context.txt"
+    monkeypatch.setenv("ATMOS_FAIL", "stars")
+    gather_atmos("Oslo", context)
+    sections = [line for line in context.read_text().splitlines() if "==" in line]
+    assert sections == [
+        "== alert ==",
+        "== current ==",
+        "== forecast ==",
+        "== hourly ==",
+    ]
+
+    monkeypatch.setenv("ATMOS_FAIL", "all")
+    with pytest.raises(RuntimeError):
+        gather_atmos("Oslo", tmp_path / "none.txt")
+    assert not (tmp_path / "none.txt").exists()
+
+
+FAKE_SUMMARY_TTS = """
+import sys
+out = sys.argv[sys.argv.index("--script-txt-out") + 1]
+open(out, "w").write("Tides rise and fall twice a day.")
+"""
+
+
+@pytest.mark.parametrize("command", ["story", "summary"])
+def test_parts_are_stitched_in_plan_order(command, tmp_path, monkeypatch):
+    research = tmp_path / "deep_research.py"
+    research.write_text(FAKE_RESEARCH)
+    tts = tmp_path / "gen_tts.py"
+    tts.write_text(FAKE_SUMMARY_TTS)
+    monkeypatch.setattr(settings, "output_base_dir", tmp_path / "out")
+    monkeypatch.setattr(settings, "character_library_dir", tmp_path / "chars")
+    monkeypatch.setattr(settings, "deep_research_cmd", f"{sys.executable} {research}")
+    monkeypatch.setattr(settings, "gen_tts_cmd", f"{sys.executable} {tts}")
+    face = tmp_path / "face.png"
+    face.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR" + bytes(8))
+    main.CharacterRepository().add("bob", face, {})
+
+    segments = [{"narration": f"Line {i}", "visual_prompt": "Sea"} for i in range(4)]
+    monkeypatch.setattr(main.planner, "generate_story_plan", lambda *a, **k: segments)
+    monkeypatch.setattr(main.planner, "generate_news_plan", lambda script: segments)
+
+    finished = []
+
+    def fake_animate(self, output, *args, **kwargs):
+        # Later parts finish first
+        part = int(output.stem.removeprefix("part"))
+        time.sleep(0.1 * (len(segments) - part))
+        output.write_bytes(b"mp4")
+        finished.append(part)
+
+    def fake_image(self, output, *args, **kwargs):
+        output.write_bytes(b"png")
+        return output
+
+    stitched = []
+    monkeypatch.setattr(main.SegmentRenderer, "animate", fake_animate)
+    monkeypatch.setattr(main.SegmentRenderer, "image", fake_image)
+    monkeypatch.setattr(
+        main.Stitcher, "stitch", lambda self, parts, *a: stitched.extend(parts)
+    )
+
+    argv = [command, "Tides", "-c", "bob", "--cinema", "--jobs", "4", "--silent"]
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+    assert finished == [4, 3, 2, 1]
+    assert [p.name for p in stitched] == [f"part{i}.mp4" for i in range(1, 5)]
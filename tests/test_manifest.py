@@ -0,0 +1,39 @@
+from mirage.manifest import StageManifest, hash_inputs
+
+
+def test_completed_stage_is_skipped_on_reload(tmp_path):
+    artifact = tmp_path / "news.mp3"
+    calls = []
+
+    def produce():
+        calls.append(1)
+        artifact.write_bytes(b"audio")
+
+    manifest = StageManifest(tmp_path)
+    input_hash = hash_inputs("topic")
+    assert manifest.ensure("tts", input_hash, [artifact], produce) is False
+
+    resumed = StageManifest(tmp_path)
+    assert resumed.ensure("tts", input_hash, [artifact], produce) is True
+    assert calls == [1]
+
+
+def test_stage_reruns_when_inputs_change_or_artifact_missing(tmp_path):
+    artifact = tmp_path / "seg_1.mp4"
+    artifact.write_bytes(b"video")
+    manifest = StageManifest(tmp_path)
+    manifest.record("segment_1", hash_inputs("prompt", 2.5), [artifact])
+
+    assert manifest.is_complete("segment_1", hash_inputs("prompt", 2.5))
+    assert not manifest.is_complete("segment_1", hash_inputs("prompt", 3.0))
+
+    artifact.unlink()
+    assert not manifest.is_complete("segment_1", hash_inputs("prompt", 2.5))
+
+
+def test_hash_inputs_tracks_file_content(tmp_path):
+    src = tmp_path / "news.md"
+    src.write_text("v1")
+    first = hash_inputs(src)
+    src.write_text("v2 changed")
+    assert hash_inputs(src) != first
@@ -0,0 +1,149 @@
+import base64
+import json
+import shutil
+import struct
+import subprocess
+
+import pytest
+
+from mirage.config import settings
+from mirage.manifest import StageManifest
+from mirage.media import CharacterRepository, SegmentRenderer, _image_size
+from mirage.runner import tool_argv
+
+
+def png(width, height):
+    header = b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\rIHDR"
+    return header + struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+
+
+def test_character_repository_round_trip(tmp_path):
+    repo = CharacterRepository(tmp_path / "chars")
+    image = tmp_path / "face.png"
+    image.write_bytes(png(1080, 1920))
+
+    added = repo.add("bob", image, {"description": "A pilot", "voice_prompt": "Calm"})
+    assert (added.width, added.height, added.mime_type) == (1080, 1920, "image/png")
+    assert added.aspect == 1080 / 1920
+    assert base64.b64decode(added.image_b64) == image.read_bytes()
+
+    # A fresh repository answers from index.json alone
+    repo = CharacterRepository(tmp_path / "chars")
+    assert repo.names() == ["bob"]
+    assert repo.metadata("bob", quiet=True)["description"] == "A pilot"
+    assert repo.get("bob").sha256 == added.sha256
+
+    dest = tmp_path / "base.png"
+    assert repo.cast("bob", dest) is not None
+    assert dest.read_bytes() == image.read_bytes()
+
+    assert repo.remove("bob")
+    assert not repo.remove("bob")
+    assert CharacterRepository(tmp_path / "chars").names() == []
+
+
+def test_character_index_rebuilt_from_directory(tmp_path):
+    (tmp_path / "old.png").write_bytes(png(16, 9))
+    (tmp_path / "old.json").write_text(json.dumps({"voice_prompt": "Gruff"}))
+
+    repo = CharacterRepository(tmp_path)
+    assert repo.names() == ["old"]
+    assert repo.metadata("old")["voice_prompt"] == "Gruff"
+    index = json.loads((tmp_path / "index.json").read_text())
+    assert index["characters"]["old"]["width"] == 16
+
+    # An image replaced by hand is re-indexed on lookup
+    (tmp_path / "old.png").write_bytes(png(9, 16) + b"new")
+    assert repo.get("old").height == 16
+
+
+def test_character_scan_defers_derivatives(tmp_path, monkeypatch):
+    for name in ("ann", "bob"):
+        (tmp_path / f"{name}.png").write_bytes(png(16, 9))
+    rendered = []
+
+    def fake_render(self, name, image, aspect):
+        rendered.append(name)
+        return {"16:9": f"{name}.png"}, None
+
+    monkeypatch.setattr(CharacterRepository, "_render_derivatives", fake_render)
+    repo = CharacterRepository(tmp_path)
+    assert repo.names() == ["ann", "bob"]
+    assert rendered == []
+
+    # The first lookup renders once and the result is kept in the index
+    assert repo.get("bob").variants == {"16:9": "bob.png"}
+    assert CharacterRepository(tmp_path).get("bob").derived
+    assert rendered == ["bob"]
+
+    assert repo.reindex() == ["ann", "bob"]
+    assert rendered == ["bob", "ann", "bob"]
+    assert repo.reindex(["zed"]) == []
+
+
+def test_character_variants_and_thumbnail(tmp_path, monkeypatch):
+    if shutil.which("ffmpeg") is None:
+        pytest.skip("ffmpeg not installed")
+    monkeypatch.setattr(
+        settings, "character_variants", {"9:16": (36, 64), "16:9": (64, 36)}
+    )
+    monkeypatch.setattr(settings, "character_thumbnail_size", 40)
+    image = tmp_path / "face.png"
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc=size=360x640"]
+        + ["-frames:v", "1", str(image)],
+        check=True,
+    )
+
+    repo = CharacterRepository(tmp_path / "chars")
+    bob = repo.add("bob", image, {})
+    # Already portrait: the original doubles as the 9:16 variant
+    assert bob.variants["9:16"] == "bob.png"
+    assert bob.image_for("16:9") == tmp_path / "chars" / "variants" / "bob_16x9.png"
+    variant = bob.image_for("16:9")
+    assert _image_size(variant, variant.read_bytes()[:32]) == (64, 36)
+    assert bob.mime_type == "image/jpeg"
+    thumb = tmp_path / "chars" / bob.thumbnail
+    assert _image_size(thumb, thumb.read_bytes()[:32])[1] == 40
+
+    dest = tmp_path / "base.png"
+    repo.cast("bob", dest, "16:9")
+    assert dest.read_bytes() == bob.image_for("16:9").read_bytes()
+
+    repo.remove("bob")
+    assert not list((tmp_path / "chars" / "variants").iterdir())
+
+
+def test_character_metadata_defaults(tmp_path):
+    repo = CharacterRepository(tmp_path)
+    assert repo.metadata(None)["description"] == "The character"
+    assert repo.metadata("ghost")["voice_prompt"] == "Neutral narrator voice"
+    assert repo.cast(None, tmp_path / "base.png") is None
+
+
+def test_segment_renderer_skips_completed_stage(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_run_cached(argv, tool, outputs, **kwargs):
+        calls.append((tool, [str(a) for a in argv]))
+        for out in outputs:
+            out.write_bytes(b"img")
+        return False
+
+    monkeypatch.setattr("mirage.media.run_cached", fake_run_cached)
+    manifest = StageManifest(tmp_path)
+    renderer = SegmentRenderer(manifest, quiet=True)
+    out = tmp_path / "seg_1.png"
+
+    assert renderer.image(out, "a harbour", "16:9", stage="segment_1") == out
+    assert renderer.image(out, "a harbour", "16:9", stage="segment_1") == out
+    lumina = tool_argv(settings.lumina_cmd)
+    expected = ["--prompt", "a harbour", "--aspect-ratio", "16:9"]
+    expected += ["--output-dir", str(tmp_path), "--filename", "seg_1.png"]
+    assert calls == [("lumina", lumina + expected)]
+
+    clip = tmp_path / "part1.mp4"
+    renderer.animate(clip, "wave", out, aspect_ratio="9:16", extra_args=["-na"])
+    expected = ["wave", "-i", str(out), "-o", str(clip), "-ar", "9:16", "-na"]
+    assert calls[-1] == ("vidius", tool_argv(settings.vidius_cmd) + expected)
+    assert "segment_1" in json.loads((tmp_path / "manifest.json").read_text())["stages"]
@@ -0,0 +1,116 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import mirage.planner as planner
+from mirage.config import settings
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    plan = [{"narration": "Hello.", "visual_prompt": "A sunrise"}]
+
+    def do_POST(self):
+        # server.failures holds status codes to return before succeeding
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.peak = max(self.server.peak, self.server.in_flight)
+        time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.in_flight -= 1
+        if self.server.failures:
+            self.send_response(self.server.failures.pop(0))
+            self.end_headers()
+            return
+        body = json.dumps(
+            {"candidates": [{"content": {"parts": [{"text": json.dumps(self.plan)}]}}]}
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.failures = []
+    server.latency = 0.0
+    server.lock = threading.Lock()
+    server.in_flight = 0
+    server.peak = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(settings, "planner_backoff_base", 0.01)
+    monkeypatch.setattr(settings, "planner_max_retries", 2)
+    yield server
+    server.shutdown()
+
+
+def stub_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/generate"
+
+
+def test_post_json_retries_transient_errors(stub_server):
+    stub_server.failures = [503, 429]
+
+    result = planner.post_json(stub_url(stub_server), {"contents": []})
+
+    assert planner._extract_plan(result) == StubHandler.plan
+    assert stub_server.failures == []
+
+
+def test_post_json_gives_up_after_max_retries(stub_server):
+    stub_server.failures = [500, 500, 500]
+
+    with pytest.raises(Exception):
+        planner.post_json(stub_url(stub_server), {"contents": []})
+
+
+def test_batch_news_plans_run_concurrently_under_cap(stub_server, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(
+        settings,
+        "planner_base_url",
+        f"http://127.0.0.1:{stub_server.server_address[1]}/v1beta",
+    )
+    stub_server.latency = 0.2
+
+    start = time.monotonic()
+    plans = planner.generate_news_plans(
+        [f"Report {i}" for i in range(6)], concurrency=3, requests_per_minute=6000
+    )
+    elapsed = time.monotonic() - start
+
+    assert plans == [StubHandler.plan] * 6
+    assert stub_server.peak == 3
+    # Two waves of three instead of six sequential round trips
+    assert elapsed < 6 * 0.2
+
+
+def test_sync_wrapper_matches_async_result(stub_server, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(
+        settings,
+        "planner_base_url",
+        f"http://127.0.0.1:{stub_server.server_address[1]}/v1beta",
+    )
+
+    assert planner.generate_news_plan("Report") == StubHandler.plan
+
+
+def test_story_request_uses_preencoded_image(tmp_path, monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    _, payload = planner._story_request(
+        "Space", {}, image_path=tmp_path / "missing.png", image=("image/jpeg", "QUJD")
+    )
+    parts = payload["contents"][0]["parts"]
+    assert parts[1] == {"inline_data": {"mime_type": "image/jpeg", "data": "QUJD"}}
+    assert "attached image" in parts[0]["text"]
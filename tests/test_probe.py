@@ -0,0 +1,65 @@
+import shutil
+import subprocess
+
+import pytest
+
+import mirage.probe as probe_mod
+from mirage.probe import ProbeError, parse_probe, probe, probe_many
+
+FFPROBE_JSON = {
+    "streams": [
+        {
+            "codec_type": "video",
+            "codec_name": "h264",
+            "width": 1280,
+            "height": 720,
+            "avg_frame_rate": "30000/1001",
+            "pix_fmt": "yuv420p",
+        },
+        {"codec_type": "audio", "codec_name": "aac", "sample_rate": "48000"},
+    ],
+    "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "8.008000"},
+}
+
+
+def test_parse_probe_reads_stream_metadata(tmp_path):
+    info = parse_probe(tmp_path / "a.mp4", FFPROBE_JSON)
+
+    assert info.duration == pytest.approx(8.008)
+    assert (info.video_codec, info.audio_codec) == ("h264", "aac")
+    assert (info.width, info.height) == (1280, 720)
+    assert info.fps == pytest.approx(29.97, abs=0.01)
+    assert info.sample_rate == 48000
+
+
+def test_parse_probe_without_duration_is_an_error(tmp_path):
+    with pytest.raises(ProbeError):
+        parse_probe(tmp_path / "a.mp4", {"format": {}, "streams": []})
+
+
+def test_missing_file_raises(tmp_path):
+    with pytest.raises(ProbeError):
+        probe(tmp_path / "nope.mp4")
+
+
+@pytest.mark.skipif(shutil.which("ffprobe") is None, reason="ffprobe not installed")
+def test_probe_many_is_memoized(tmp_path, monkeypatch):
+    paths = []
+    for i in range(2):
+        path = tmp_path / f"{i}.mp4"
+        subprocess.run(
+            ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "testsrc=size=64x36:rate=10"]
+            + ["-t", "1", "-pix_fmt", "yuv420p", str(path)],
+            check=True,
+        )
+        paths.append(path)
+
+    infos = probe_many(paths)
+    assert [i.path for i in infos] == paths
+    assert all(i.width == 64 and i.has_video and not i.has_audio for i in infos)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("ffprobe should not run again")
+
+    monkeypatch.setattr(probe_mod, "run_command", fail)
+    assert probe(paths[0]) == infos[0]
@@ -0,0 +1,52 @@
+import shutil
+import subprocess
+
+import pytest
+
+from mirage.config import settings
+from mirage.render import Slide, render_slideshow, slideshow_argv, slideshow_filter
+
+
+def test_filter_fades_and_concats_every_slide(tmp_path):
+    slides = [Slide(tmp_path / "a.png", 2.0), Slide(tmp_path / "b.png", 0.3)]
+
+    graph = slideshow_filter(slides, 640, 360, 0.5)
+
+    assert graph.count("fade=t=in") == 2
+    assert "fade=t=out:st=1.500" in graph
+    # Short slides never fade out before they start
+    assert "fade=t=out:st=0.000" in graph
+    assert graph.endswith("[s0][s1]concat=n=2:v=1:a=0[v]")
+
+
+def test_argv_maps_audio_after_image_inputs(tmp_path):
+    slides = [Slide(tmp_path / f"{i}.png", 1.0) for i in range(3)]
+    argv = [
+        str(a) for a in slideshow_argv(slides, tmp_path / "out.mp4", tmp_path / "a.mp3")
+    ]
+
+    assert argv.count("-loop") == 3
+    assert argv[argv.index("-map", argv.index("[v]")) + 1] == "3:a"
+    assert argv[-1] == str(tmp_path / "out.mp4")
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+@pytest.mark.parametrize("max_inputs", [8, 2])
+def test_render_single_pass_and_chunked(tmp_path, monkeypatch, max_inputs):
+    monkeypatch.setattr(settings, "render_width", 64)
+    monkeypatch.setattr(settings, "render_height", 36)
+    slides = []
+    for i in range(3):
+        image = tmp_path / f"{i}.png"
+        subprocess.run(
+            ["ffmpeg", "-v", "error", "-f", "lavfi", "-i", "color=c=red:s=64x36"]
+            + ["-frames:v", "1", str(image)],
+            check=True,
+        )
+        slides.append(Slide(image, 1.0))
+    output = tmp_path / "out.mp4"
+
+    render_slideshow(slides, output, max_inputs=max_inputs, quiet=True)
+
+    assert output.exists() and output.stat().st_size > 0
+    assert not list(tmp_path.glob(".render-*"))
@@ -0,0 +1,101 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from mirage.runner import run_command, tool_argv
+
+
+def test_stdin_file_and_capture(tmp_path):
+    source = tmp_path / "in.txt"
+    source.write_text("hello 'quoted' $HOME\n")
+
+    result = run_command(
+        [sys.executable, "-c", "import sys; print(sys.stdin.read().upper(), end='')"],
+        stdin_file=source,
+        capture=True,
+        quiet=True,
+    )
+
+    assert result.returncode == 0
+    assert result.stdout == "HELLO 'QUOTED' $HOME\n"
+
+
+def test_input_bytes_and_arguments_are_not_shell_parsed():
+    result = run_command(
+        [sys.executable, "-c", "import sys; print(sys.argv[1] + sys.stdin.read())"]
+        + ["hello"],
+        input_bytes=b" world",
+        capture=True,
+        quiet=True,
+    )
+    assert result.stdout.strip() == "hello world"
+
+    result = run_command(
+        [sys.executable, "-c", "import sys; print(sys.argv[1])", 'a "b" `c`'],
+        capture=True,
+        quiet=True,
+    )
+    assert result.stdout.strip() == 'a "b" `c`'
+
+
+def test_failure_raises_with_stderr_tail():
+    with pytest.raises(subprocess.CalledProcessError) as exc:
+        run_command(
+            [sys.executable, "-c", "import sys; sys.stderr.write('boom'); sys.exit(3)"],
+            quiet=True,
+        )
+    assert exc.value.returncode == 3
+    assert "boom" in exc.value.stderr
+
+
+def test_check_false_returns_result():
+    result = run_command(
+        [sys.executable, "-c", "raise SystemExit(2)"], quiet=True, check=False
+    )
+    assert result.returncode == 2
+
+
+def test_tool_argv_splits_configured_command():
+    assert tool_argv("uv run gen-tts --fast") == ["uv", "run", "gen-tts", "--fast"]
+
+
+def test_wrapped_command_is_governed_by_tool_name(tmp_path, monkeypatch):
+    import mirage.runner as runner
+    import mirage.telemetry as telemetry
+    from mirage.governor import Governor
+
+    monkeypatch.setattr(runner, "governor", Governor(tmp_path, {"lumina": 1}, {}))
+    # Stands in for "uv run lumina": the slot must be held while it runs
+    probe = (
+        "import fcntl, os, sys\n"
+        f"fd = os.open({str(tmp_path / 'lumina.slot0')!r}, os.O_RDWR)\n"
+        "try:\n"
+        "    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)\n"
+        "except BlockingIOError:\n"
+        "    sys.exit(0)\n"
+        "sys.exit(1)\n"
+    )
+    with telemetry.run("character"):
+        telemetry.attach(tmp_path)
+        run_command([sys.executable, "-c", probe], quiet=True, tool="lumina")
+
+    records = (tmp_path / telemetry.TIMINGS_NAME).read_text()
+    assert '"name": "lumina"' in records
+    assert not list(tmp_path.glob("python*.slot*"))
+
+
+def test_cancel_terminates_the_tool():
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    start = time.monotonic()
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        run_command(
+            [sys.executable, "-c", "import time; time.sleep(30)"],
+            quiet=True,
+            cancel=cancel,
+        )
+    assert time.monotonic() - start < 10
+    assert excinfo.value.returncode < 0
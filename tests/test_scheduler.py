@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from mirage.scheduler import StagePipeline, run_ordered, wait_for_stable_file
+
+
+def test_independent_stages_run_concurrently():
+    barrier = threading.Barrier(2, timeout=2)
+    pipeline = StagePipeline()
+    pipeline.add("a", barrier.wait)
+    pipeline.add("b", barrier.wait)
+
+    stages = pipeline.run()
+
+    assert [s.name for s in stages] == ["a", "b"]
+    assert all(s.duration is not None for s in stages)
+
+
+def test_dependent_stage_waits_for_dependency():
+    order = []
+    pipeline = StagePipeline()
+    pipeline.add("image", lambda: (time.sleep(0.05), order.append("image")))
+    pipeline.add("video", lambda: order.append("video"), deps=["image"])
+
+    pipeline.run()
+
+    assert order == ["image", "video"]
+
+
+def test_failed_dependency_skips_dependents_and_reraises():
+    def boom():
+        raise RuntimeError("boom")
+
+    ran = []
+    pipeline = StagePipeline()
+    pipeline.add("image", boom)
+    pipeline.add("video", lambda: ran.append("video"), deps=["image"])
+    pipeline.add("podcast", lambda: ran.append("podcast"))
+
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+
+    assert ran == ["podcast"]
+    assert pipeline.stages["video"].skipped
+
+
+def test_unknown_dependency_rejected():
+    pipeline = StagePipeline()
+    with pytest.raises(ValueError):
+        pipeline.add("video", lambda: None, deps=["image"])
+
+
+def test_run_ordered_preserves_input_order():
+    progress = []
+
+    def work(n):
+        time.sleep(0.01 * (5 - n))
+        return n * 10
+
+    results = run_ordered(
+        work, [1, 2, 3, 4], 4, lambda done, total: progress.append(done)
+    )
+
+    assert results == [10, 20, 30, 40]
+    assert progress == [1, 2, 3, 4]
+
+
+def test_wait_for_stable_file_returns_once_writes_settle(tmp_path):
+    path = tmp_path / "news.txt"
+    done = threading.Event()
+
+    def producer():
+        path.write_text("")
+        time.sleep(0.1)
+        path.write_text("script")
+        time.sleep(1.0)
+        done.set()
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    start = time.monotonic()
+    wait_for_stable_file(path, done.is_set, settle=0.2, poll=0.02)
+    elapsed = time.monotonic() - start
+    thread.join()
+
+    assert path.read_text() == "script"
+    assert elapsed < 0.8
+
+
+def test_wait_for_stable_file_stops_when_producer_exits(tmp_path):
+    wait_for_stable_file(tmp_path / "never.txt", lambda: True, settle=5)
@@ -0,0 +1,226 @@
+import re
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import mirage.stitch as stitch
+from mirage.probe import MediaInfo, probe
+from mirage.encoders import get_profile
+from mirage.stitch import (
+    Cut,
+    compatible,
+    copyable,
+    plan_cuts,
+    reencode_stitch,
+    stitch_clips,
+    xfade_graph,
+)
+
+
+def info(**overrides):
+    fields = dict(
+        path=Path("clip.mp4"),
+        duration=8.0,
+        video_codec="h264",
+        audio_codec="aac",
+        width=1280,
+        height=720,
+        fps=24.0,
+        pix_fmt="yuv420p",
+        sample_rate=48000,
+    )
+    fields.update(overrides)
+    return MediaInfo(**fields)
+
+
+def test_compatible_requires_matching_parameters():
+    assert compatible([info(), info(duration=7.5)])
+    assert not compatible([info(), info(width=720, height=1280)])
+    assert not compatible([info(), info(audio_codec=None)])
+    assert not compatible([info(), info(fps=30.0)])
+
+
+def test_xfade_graph_is_a_balanced_tree():
+    graph, v_out, a_out = xfade_graph([8.0] * 4, 0.1)
+
+    # (0,1) and (2,3) merge first, then the two 15.9s halves
+    offsets = re.findall(r"offset=([\d.]+)", graph)
+    assert offsets == ["7.900", "7.900", "15.800"]
+    assert "[v1][v2]xfade" in graph and "[a1][a2]acrossfade" in graph
+    assert (v_out, a_out) == ("v3", "a3")
+
+
+def test_xfade_graph_depth_is_logarithmic():
+    graph, _, _ = xfade_graph([8.0] * 32, 0.1)
+    depth = {f"{i}:v": 0 for i in range(32)}
+    for chain in graph.split(";"):
+        if "xfade" in chain:
+            left, right, out = re.findall(r"\[([^\]]+)\]", chain)
+            depth[out] = max(depth[left], depth[right]) + 1
+
+    assert graph.count("xfade") == 31
+    assert max(depth.values()) == 5
+
+
+def test_plan_cuts_uses_keyframes_outside_fades():
+    keyframes = [[0.0, 2.0, 4.0, 6.0, 7.95]] * 3
+    cuts = plan_cuts([8.0, 8.0, 8.0], keyframes, 0.1)
+
+    assert cuts == [Cut(0.0, 6.0), Cut(2.0, 6.0), Cut(2.0, 8.0)]
+
+
+def test_plan_cuts_gives_up_without_room_for_a_body():
+    assert plan_cuts([2.0, 2.0, 2.0], [[0.0]] * 3, 0.1) is None
+
+
+def make_clips(tmp_path, x264_params="", rate="24"):
+    if shutil.which("ffmpeg") is None:
+        pytest.skip("ffmpeg not installed")
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"part{i}.mp4"
+        subprocess.run(
+            ["ffmpeg", "-v", "error", "-f", "lavfi"]
+            + ["-i", f"testsrc2=size=160x90:rate={rate}"]
+            + ["-f", "lavfi", "-i", f"sine=frequency={300 + 100 * i}", "-t", "2"]
+            + ["-c:v", "libx264", "-g", "12", "-pix_fmt", "yuv420p", "-c:a", "aac"]
+            + (["-x264-params", x264_params] if x264_params else [])
+            + ["-shortest", str(path)],
+            check=True,
+        )
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def clips(tmp_path):
+    return make_clips(tmp_path)
+
+
+def decoded_frames(path):
+    """Decodes a file's video, failing on any error; returns the frame pts."""
+    result = subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-i",
+            str(path),
+            "-map",
+            "0:v",
+            "-f",
+            "framecrc",
+            "-",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stderr == ""
+    lines = [line for line in result.stdout.splitlines() if not line.startswith("#")]
+    return [int(line.split(",")[2]) for line in lines]
+
+
+def packet_pts(path):
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0"]
+        + ["-show_entries", "packet=pts", "-of", "csv=p=0", str(path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return sorted(int(line) for line in result.stdout.split())
+
+
+@pytest.mark.parametrize(
+    "crossfade, mode, expected",
+    [(True, "transitions", 5.8), (False, "copy", 6.0)],
+)
+def test_stitch_modes(clips, tmp_path, crossfade, mode, expected):
+    output = tmp_path / "out.mp4"
+
+    assert stitch_clips(clips, output, crossfade=crossfade, quiet=True) == mode
+    assert probe(output).duration == pytest.approx(expected, abs=0.2)
+    assert not list(tmp_path.glob(".stitch-*"))
+
+
+def test_multi_pass_merge_caps_inputs(clips, tmp_path):
+    parts = clips + clips[:2]
+    output = tmp_path / "out.mp4"
+
+    reencode_stitch(
+        parts,
+        [2.0] * len(parts),
+        output,
+        0.1,
+        crossfade=True,
+        profile=get_profile("draft"),
+        quiet=True,
+        max_inputs=2,
+    )
+
+    assert probe(output).duration == pytest.approx(10.0 - 0.4, abs=0.2)
+
+
+@pytest.mark.parametrize("rate", ["24", "30000/1001"])
+def test_transitions_join_matches_reencode(tmp_path, rate):
+    parts = make_clips(tmp_path, rate=rate)
+    output, reference = tmp_path / "out.mp4", tmp_path / "reference.mp4"
+
+    assert stitch_clips(parts, output, quiet=True) == "transitions"
+    reencode_stitch(
+        parts,
+        [probe(p).duration for p in parts],
+        reference,
+        0.1,
+        crossfade=True,
+        profile=get_profile(),
+        quiet=True,
+    )
+
+    frames = decoded_frames(output)
+    assert all(a < b for a, b in zip(frames, frames[1:]))
+    pts = packet_pts(output)
+    assert len(set(pts)) == len(pts)
+    assert len(set(b - a for a, b in zip(pts, pts[1:]))) == 1
+    assert len(frames) == len(decoded_frames(reference))
+    assert probe(output).duration == pytest.approx(probe(reference).duration, abs=0.01)
+
+
+def test_open_gop_falls_back_to_reencode(tmp_path):
+    # Non-IDR keyframes can't start a copied body after another piece
+    parts = make_clips(tmp_path, x264_params="open-gop=1:bframes=3")
+    output = tmp_path / "out.mp4"
+
+    assert stitch_clips(parts, output, quiet=True) == "reencode"
+    assert decoded_frames(output)
+    assert not list(tmp_path.glob(".stitch-*"))
+
+
+def test_failed_piece_falls_back_to_reencode(tmp_path, monkeypatch):
+    parts = make_clips(tmp_path)
+    output = tmp_path / "out.mp4"
+    transition_argv = stitch._transition_argv
+
+    def broken_transition(*args):
+        # An option ffmpeg rejects, as a missing encoder or filter would be
+        return transition_argv(*args)[:-1] + ["-no-such-option", args[-1]]
+
+    monkeypatch.setattr(stitch, "_transition_argv", broken_transition)
+    assert stitch_clips(parts, output, quiet=True) == "reencode"
+    assert decoded_frames(output)
+    assert not list(tmp_path.glob(".stitch-*"))
+
+
+def test_copyable_rejects_bodies_needing_outside_frames():
+    # (pts, dts, keyframe) at 1 fps; frame 4 is decoded after keyframe 5
+    closed = [(0, 0, True), (1, 1, False), (2, 2, False), (3, 3, True), (4, 4, False)]
+    open_gop = [(0, 0, True), (1, 1, False), (2, 2, False), (3, 3, False)]
+    open_gop += [(5, 4, True), (4, 5, False), (6, 6, False)]
+
+    assert copyable(closed, 0, 3, 1.0)
+    assert copyable(closed, 3, 2, 1.0)
+    assert not copyable(open_gop, 0, 5, 1.0)
+    assert not copyable(open_gop, 1, 2, 1.0)
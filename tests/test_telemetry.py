@@ -0,0 +1,73 @@
+import json
+import sys
+
+import pytest
+
+import mirage.telemetry as telemetry
+from mirage.runner import run_command
+from mirage.scheduler import run_ordered
+
+
+def read(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_records_buffered_until_attach(tmp_path):
+    with telemetry.run("story") as recorder:
+        with telemetry.stage("plan"):
+            pass
+        telemetry.attach(tmp_path)
+        with pytest.raises(ValueError):
+            with telemetry.stage("stitch", skipped=False):
+                raise ValueError("boom")
+
+    records = read(tmp_path / telemetry.TIMINGS_NAME)
+    assert [(r["kind"], r["name"]) for r in records] == [
+        ("stage", "plan"),
+        ("stage", "stitch"),
+        ("run", "story"),
+    ]
+    assert {r["run"] for r in records} == {recorder.run_id}
+    assert records[1]["ok"] is False and records[1]["skipped"] is False
+    assert records[2]["ok"] is True
+
+
+def test_process_records_follow_worker_threads(tmp_path):
+    out = tmp_path / "out.bin"
+    script = f"open({str(out)!r}, 'wb').write(b'x' * 1000)"
+
+    def call(i):
+        with telemetry.stage(f"segment_{i}"):
+            run_command([sys.executable, "-c", script], quiet=True, outputs=[out])
+
+    with telemetry.run("summary"):
+        telemetry.attach(tmp_path)
+        run_ordered(call, [1, 2], 2)
+        run_command([sys.executable, "-c", "raise SystemExit(3)"], check=False)
+
+    records = read(tmp_path / telemetry.TIMINGS_NAME)
+    procs = [r for r in records if r["kind"] == "process"]
+    assert sorted(p["parent"] for p in procs[:2]) == ["segment_1", "segment_2"]
+    assert all(p["output_bytes"] == 1000 and p["max_rss_kb"] > 0 for p in procs[:2])
+    assert procs[2]["exit_code"] == 3 and procs[2]["parent"] is None
+
+
+def test_no_records_outside_a_run(tmp_path):
+    with telemetry.stage("orphan"):
+        run_command([sys.executable, "-c", "pass"], quiet=True)
+    assert not list(tmp_path.iterdir())
+
+
+def test_aggregate_percentiles():
+    records = [
+        {"kind": "process", "name": "lumina", "wall": w, "cpu": 0.1, "ok": True}
+        for w in (1.0, 2.0, 3.0, 4.0, 5.0)
+    ]
+    records.append({"kind": "process", "name": "lumina", "wall": 6.0, "ok": False})
+    records += [{"kind": "stage", "name": f"part_{i}", "wall": 1.0} for i in (1, 2)]
+    row, parts = telemetry.aggregate(records)
+    assert (parts["name"], parts["count"]) == ("part_N", 2)
+    assert row["count"] == 6 and row["failures"] == 1
+    assert row["p50"] == pytest.approx(3.5)
+    assert row["p95"] == pytest.approx(5.75)
+    assert row["cpu_p50"] == pytest.approx(0.1)
@@ -0,0 +1,77 @@
+import json
+import sys
+
+import requests
+
+import mirage.telemetry as telemetry
+import mirage.tracing as tracing
+from mirage.config import settings
+from mirage.runner import run_command
+
+
+def run_traced(tmp_path):
+    with telemetry.run("story") as recorder:
+        telemetry.attach(tmp_path)
+        with telemetry.stage("part_2", prompt_hash=telemetry.prompt_hash("waves")):
+            with telemetry.stage("vidius", tool="vidius", cache_hit=False):
+                run_command([sys.executable, "-c", "pass"], quiet=True)
+    return recorder
+
+
+def attributes(span):
+    return {a["key"]: list(a["value"].values())[0] for a in span["attributes"]}
+
+
+def test_trace_file_links_spans(tmp_path):
+    recorder = run_traced(tmp_path)
+
+    payload = json.loads((tmp_path / tracing.OTLP_NAME).read_text())
+    (resource_spans,) = payload["resourceSpans"]
+    spans = {s["name"]: s for s in resource_spans["scopeSpans"][0]["spans"]}
+    assert len(spans) == 4
+    root = spans["story"]
+    assert root["traceId"] == recorder.run_id and "parentSpanId" not in root
+    assert spans["part_2"]["parentSpanId"] == root["spanId"]
+    assert spans["vidius"]["parentSpanId"] == spans["part_2"]["spanId"]
+
+    process = next(s for s in spans.values() if s["kind"] == 3)
+    assert process["parentSpanId"] == spans["vidius"]["spanId"]
+    attrs = attributes(process)
+    # Segment and prompt are inherited from the enclosing segment stage
+    assert attrs["segment"] == "2"
+    assert attrs["prompt_hash"] == telemetry.prompt_hash("waves")
+    assert attributes(spans["vidius"])["cache_hit"] is False
+
+    events = json.loads((tmp_path / tracing.PERFETTO_NAME).read_text())["traceEvents"]
+    assert {e["name"] for e in events} == set(spans)
+
+
+def test_trace_sent_to_endpoint(tmp_path, monkeypatch):
+    sent = []
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+    def fake_post(url, json, timeout):
+        sent.append((url, json))
+        return Response()
+
+    monkeypatch.setattr(settings, "trace_otlp_endpoint", "http://collector/v1/traces")
+    monkeypatch.setattr(tracing.requests, "post", fake_post)
+    run_traced(tmp_path)
+    assert sent[0][0] == "http://collector/v1/traces"
+    assert sent[0][1] == json.loads((tmp_path / tracing.OTLP_NAME).read_text())
+
+    def unreachable(*args, **kwargs):
+        raise requests.ConnectionError("no collector")
+
+    monkeypatch.setattr(tracing.requests, "post", unreachable)
+    run_traced(tmp_path)  # export failures never fail the run
+
+
+def test_tracing_disabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "trace_enabled", False)
+    run_traced(tmp_path)
+    assert not (tmp_path / tracing.OTLP_NAME).exists()
+    assert (tmp_path / telemetry.TIMINGS_NAME).exists()